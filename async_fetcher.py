@@ -0,0 +1,68 @@
+import asyncio
+import time
+import aiohttp
+import fetch_errors
+import metrics
+from cf_client import HEADERS
+from rate_limiter import TokenBucket
+
+async def _fetch_one(session, bucket, semaphore, key, url, parse, progress, on_page):
+    """Download one page and return (key, parsed value or FetchFailure)"""
+    async with semaphore:
+        await bucket.acquire_async()
+        start = time.perf_counter()
+        html = None
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    metrics.record_request(time.perf_counter() - start, response.status)
+                    value = fetch_errors.from_status(response.status)
+                else:
+                    html = await response.text()
+                    metrics.record_request(time.perf_counter() - start, response.status)
+        except Exception as e:
+            metrics.record_request(time.perf_counter() - start, type(e).__name__)
+            value = fetch_errors.from_exception(e)
+    if html is not None:
+        fetch_errors.call_page_hook(on_page, key, html)
+        value = fetch_errors.parse_page(parse, key, html)
+    if value or not value.retryable:
+        bucket.on_success()
+    elif value.throttled:
+        bucket.on_throttle()
+    progress(key, value)
+    return key, value
+
+async def _fetch_all(jobs, parse, bucket, concurrency, timeout, on_result, on_page):
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    counter = metrics.Progress(len(jobs))
+    def progress(key, value):
+        if on_result is not None:
+            on_result(key, value)
+        counter.tick()
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                     headers=HEADERS) as session:
+        results = await asyncio.gather(*(
+            _fetch_one(session, bucket, semaphore, key, url, parse, progress, on_page)
+            for key, url in jobs
+        ))
+    return dict(results)
+
+def fetch_pages_async(jobs, parse, rate=10.0, concurrency=20, timeout=15, on_result=None,
+                      bucket=None, on_page=None):
+    """Fetch many pages concurrently and parse each one
+
+    jobs is a list of (key, url). Requests share one pooled aiohttp session,
+    at most `concurrency` are in flight, and a single token bucket caps the
+    overall request rate at `rate` requests/second (or pass a shared
+    `bucket`, which is told about every success and 429/503).
+    on_result(key, value) is called as each page finishes, and
+    on_page(key, html) with the HTML of every page that came back 200.
+    Returns {key: parse(html)}, with a FetchFailure for pages that failed.
+    """
+    bucket = bucket or TokenBucket(rate)
+    return asyncio.run(_fetch_all(jobs, parse, bucket, concurrency, timeout, on_result, on_page))
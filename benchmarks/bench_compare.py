@@ -0,0 +1,79 @@
+"""
+Group comparison: the per-row scans App.jsx does (users.filter(u => u.solved.has(id))
+for every problem) versus the NumPy matrix engine in compare_handles.py
+Usage: python benchmarks/bench_compare.py [--users 200] [--problems 5000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import compare_handles
+import dataset_builder
+
+RATINGS = list(range(1600, 3100, 100))
+
+def synthetic_group(users, problems, seed=0):
+    """Problems plus one solved set per user, from casual (5%) to very active (80%) solvers"""
+    rng = random.Random(seed)
+    dataset = [{'problemId': f'{1000 + i // 6}{"ABCDEF"[i % 6]}', 'rating': rng.choice(RATINGS)}
+               for i in range(problems)]
+    ids = [p['problemId'] for p in dataset]
+    solved_sets = [set(rng.sample(ids, int(problems * rng.uniform(0.05, 0.8)))) for _ in range(users)]
+    return dataset, solved_sets
+
+def scan_compare(problems, solved_sets, exactly=(1,)):
+    """The same statistics computed the way the app does, one problem row at a time"""
+    users = range(len(solved_sets))
+    ratings = sorted({p['rating'] for p in problems})
+    solved = [0] * len(solved_sets)
+    unique = [0] * len(solved_sets)
+    by_rating = [[0] * len(ratings) for _ in users]
+    overlap = [[0] * len(solved_sets) for _ in users]
+    histogram = [0] * (len(solved_sets) + 1)
+    for problem in problems:
+        solvers = [u for u in users if problem['problemId'] in solved_sets[u]]
+        histogram[len(solvers)] += 1
+        column = ratings.index(problem['rating'])
+        for u in solvers:
+            solved[u] += 1
+            by_rating[u][column] += 1
+            if len(solvers) == 1:
+                unique[u] += 1
+            for v in solvers:
+                overlap[u][v] += 1
+    return {'solved': solved, 'unique': unique, 'by_rating': by_rating, 'overlap': overlap,
+            'histogram': histogram}
+
+def matrix_compare(problems, solved_sets, exactly=(1,)):
+    matrix = compare_handles.solved_matrix(solved_sets, dataset_builder.problem_rows(problems), len(problems))
+    return compare_handles.compare(matrix, [p['rating'] for p in problems], exactly)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the group comparison engine')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--problems', type=int, default=5000)
+    args = parser.parse_args()
+
+    problems, solved_sets = synthetic_group(args.users, args.problems)
+    print(f"{args.users} users x {args.problems} problems, "
+          f"{sum(map(len, solved_sets)) / len(solved_sets):.0f} solved per user on average\n")
+
+    timings = {}
+    results = {}
+    for label, fn in [('row scans', scan_compare), ('numpy matrix', matrix_compare)]:
+        start = time.perf_counter()
+        results[label] = fn(problems, solved_sets)
+        timings[label] = time.perf_counter() - start
+        print(f"  {label:13s} {timings[label] * 1000:9.1f} ms")
+
+    expected, actual = results['row scans'], results['numpy matrix']
+    for key in expected:
+        assert expected[key] == actual[key].tolist(), f'engines disagree on {key}'
+    print(f"\nnumpy matrix is {timings['row scans'] / timings['numpy matrix']:.0f}x faster, same results")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Compare the streaming csv-module ingest in convert_problems.py with the old
+readlines + character-by-character parser: rows/second and peak memory
+Usage: python benchmarks/bench_csv_ingest.py [--input src/problems_raw.csv] [--copies 100]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import convert_problems
+
+def legacy_parse_csv_line(line):
+    """The parser convert_problems.py used before streaming ingest (kept for comparison)"""
+    line = line.strip().rstrip('\r')
+    parts = []
+    current = ""
+    in_quotes = False
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if char == '"':
+            if i + 1 < len(line) and line[i + 1] == '"':
+                current += '"'
+                i += 2
+                continue
+            in_quotes = not in_quotes
+            i += 1
+            continue
+        if char == ',' and not in_quotes:
+            parts.append(current)
+            current = ""
+            i += 1
+            continue
+        current += char
+        i += 1
+    parts.append(current)
+
+    if len(parts) >= 6:
+        name, rating, tags, solve_count, length, hyperlink = parts[:6]
+        url, problem_id = convert_problems.parse_hyperlink(hyperlink)
+        return {
+            'name': name,
+            'rating': int(rating) if rating else 0,
+            'tags': [tag.strip() for tag in tags.split(',')] if tags else [],
+            'solveCount': int(solve_count) if solve_count else 0,
+            'length': int(length) if length else 0,
+            'link': url,
+            'problemId': problem_id,
+        }
+    return None
+
+def legacy_read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    return [p for p in map(legacy_parse_csv_line, lines) if p]
+
+def legacy_count(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    return sum(1 for line in lines if legacy_parse_csv_line(line))
+
+def streaming_read(path):
+    return [p for batch in convert_problems.iter_problem_batches(path) for p in batch]
+
+def streaming_count(path):
+    return sum(len(batch) for batch in convert_problems.iter_problem_batches(path))
+
+def measure(count, path):
+    """(rows, seconds, peak MiB) for one pass that only counts the rows"""
+    start = time.perf_counter()
+    rows = count(path)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    count(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, seconds, peak / 2 ** 20
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare CSV ingest implementations')
+    parser.add_argument('--input', default=os.path.join(ROOT, 'src', 'problems_raw.csv'))
+    parser.add_argument('--copies', type=int, default=100,
+                        help='size of the synthetic file in copies of the input (default: 100)')
+    args = parser.parse_args()
+
+    assert streaming_read(args.input) == legacy_read(args.input), 'parsers disagree on the input'
+
+    directory = tempfile.mkdtemp()
+    try:
+        big = os.path.join(directory, f'problems_raw_x{args.copies}.csv')
+        with open(args.input, 'rb') as src, open(big, 'wb') as dst:
+            data = src.read()
+            for _ in range(args.copies):
+                dst.write(data)
+
+        for path in [args.input, big]:
+            size = os.path.getsize(path)
+            print(f"\n{os.path.basename(path)} ({size / 2 ** 20:.1f} MiB)")
+            print(f"  {'parser':10s} {'rows':>9s} {'rows/s':>10s} {'peak memory':>12s}")
+            results = {}
+            for label, count in [('legacy', legacy_count), ('streaming', streaming_count)]:
+                rows, seconds, peak = measure(count, path)
+                results[label] = rows / seconds
+                print(f"  {label:10s} {rows:9,d} {rows / seconds:10,.0f} {peak:9.1f} MiB")
+            print(f"  streaming is {results['streaming'] / results['legacy']:.1f}x faster")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
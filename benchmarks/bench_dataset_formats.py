@@ -0,0 +1,105 @@
+"""
+Compare the json and compact problems.js formats: bytes and parse time
+Usage: python benchmarks/bench_dataset_formats.py [--input src/problems.js]
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import dataset_builder
+
+NODE_SCRIPT = '''
+import { pathToFileURL } from 'node:url';
+const [file, runs] = [process.argv[2], Number(process.argv[3])];
+const url = pathToFileURL(file).href;
+const times = [];
+let problems;
+for (let i = 0; i < runs; i++) {
+  const start = performance.now();
+  ({ problems } = await import(`${url}?run=${i}`));
+  times.push(performance.now() - start);
+}
+times.sort((a, b) => a - b);
+console.log(JSON.stringify({ ms: times[Math.floor(runs / 2)], digest: JSON.stringify(problems) }));
+'''
+
+def time_python(content, output_format, runs):
+    """Median time to turn the module body back into problem objects in Python"""
+    if output_format == 'compact':
+        literal = content[content.index("JSON.parse('") + len("JSON.parse('"):content.rindex("')")]
+        payload = literal.replace("\\'", "'").replace('\\\\', '\\')
+        parse = lambda: dataset_builder.decode_compact(json.loads(payload))
+    else:
+        payload = content[content.index('= ') + 2:content.rindex(';')]
+        parse = lambda: json.loads(payload)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        problems = parse()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[runs // 2] * 1000, problems
+
+def time_node(directory, runs):
+    """Median module import time per format under Node, plus the decoded objects"""
+    runner = os.path.join(directory, 'bench.mjs')
+    with open(runner, 'w', encoding='utf-8') as f:
+        f.write(NODE_SCRIPT)
+    results = {}
+    for output_format in dataset_builder.OUTPUT_FORMATS:
+        out = subprocess.run(['node', runner, os.path.join(directory, f'{output_format}.js'), str(runs)],
+                             capture_output=True, text=True, check=True)
+        results[output_format] = json.loads(out.stdout)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare problems.js output formats')
+    parser.add_argument('--input', default=os.path.join(ROOT, 'src', 'problems.js'),
+                        help='json-format problems.js to read the dataset from')
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args()
+
+    problems = dataset_builder.load_problems_js(args.input)
+    print(f"Dataset: {len(problems)} problems\n")
+    print(f"  {'format':8s} {'bytes':>10s} {'gzip':>10s} {'python parse':>14s} {'node import':>12s}")
+
+    directory = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(directory, 'package.json'), 'w') as f:
+            f.write('{"type": "module"}')
+        shutil.copy(os.path.join(ROOT, 'src', 'problemsCodec.js'), directory)
+
+        sizes = {}
+        for output_format in dataset_builder.OUTPUT_FORMATS:
+            content = dataset_builder.render_problems_js(problems, ['benchmark'], output_format)
+            data = content.encode('utf-8')
+            with open(os.path.join(directory, f'{output_format}.js'), 'wb') as f:
+                f.write(data)
+            py_ms, decoded = time_python(content, output_format, args.runs)
+            assert decoded == problems, f'{output_format} does not round-trip'
+            sizes[output_format] = (len(data), len(gzip.compress(data)), py_ms)
+
+        node = {}
+        if shutil.which('node'):
+            node = time_node(directory, args.runs)
+            assert node['json']['digest'] == node['compact']['digest'], 'JS decoder output differs'
+
+        for output_format, (raw, gz, py_ms) in sizes.items():
+            node_ms = f"{node[output_format]['ms']:.1f} ms" if node else 'n/a'
+            print(f"  {output_format:8s} {raw:10,d} {gz:10,d} {py_ms:11.1f} ms {node_ms:>12s}")
+
+        raw_json, raw_compact = sizes['json'][0], sizes['compact'][0]
+        print(f"\n  compact is {100 * (1 - raw_compact / raw_json):.0f}% smaller "
+              f"and decodes to identical objects")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Micro-benchmark for the statement length extractors
+Usage: python benchmarks/bench_extractors.py [--pages N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import statement_extractor
+from synthetic_pages import make_problem_page
+
+def load_pages(count, fixture_dir=None):
+    """Use saved pages from fixture_dir if given, synthetic pages otherwise"""
+    if fixture_dir:
+        pages = []
+        for name in sorted(os.listdir(fixture_dir))[:count]:
+            with open(os.path.join(fixture_dir, name), 'r', encoding='utf-8') as f:
+                pages.append(f.read())
+        return pages
+    return [make_problem_page(seed) for seed in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark statement extractor backends')
+    parser.add_argument('--pages', type=int, default=300, help='number of pages (default: 300)')
+    parser.add_argument('--fixtures', help='directory of saved problem page HTML files')
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.fixtures)
+    print(f"Benchmarking {len(pages)} pages "
+          f"({sum(len(p) for p in pages) / len(pages) / 1024:.1f} KiB average)\n")
+
+    results = {}
+    for name, backend in statement_extractor.BACKENDS.items():
+        try:
+            start = time.perf_counter()
+            lengths = [backend(page) for page in pages]
+            elapsed = time.perf_counter() - start
+        except ImportError as e:
+            print(f"  {name:8s} skipped ({e})")
+            continue
+        results[name] = lengths
+        print(f"  {name:8s} {len(pages) / elapsed:10.1f} pages/s  ({elapsed * 1000 / len(pages):.3f} ms/page)")
+
+    if 'bs4' in results:
+        reference = results['bs4']
+        for name, lengths in results.items():
+            mismatches = sum(1 for a, b in zip(reference, lengths) if a != b)
+            status = 'identical to bs4' if mismatches == 0 else f'{mismatches} MISMATCHES vs bs4'
+            print(f"  {name:8s} {status}")
+
+if __name__ == "__main__":
+    main()
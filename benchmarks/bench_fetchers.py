@@ -0,0 +1,163 @@
+"""
+Sweep fetch engines, concurrency levels and extractor backends against a local
+Codeforces stand-in (benchmarks/cf_stand_in.py) and report pages/second and
+tail latency
+Usage: python benchmarks/bench_fetchers.py [--pages 400] [--concurrency 5 10 20 40]
+           [--latency 80] [--jitter 30] [--error-rate 0.01] [--throttle-rate 0.02] [--json results.json]
+"""
+import argparse
+import contextlib
+import functools
+import importlib.util
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import cf_client
+import fetch_errors
+import fetch_problems
+import metrics
+import statement_extractor
+from journal import write_atomic
+
+STAND_IN = os.path.join(ROOT, 'benchmarks', 'cf_stand_in.py')
+ENGINES = ['async', 'pipeline', 'threads']
+
+def start_stand_in(args):
+    """Run the stand-in in its own process (so it does not compete for our GIL) and return (process, url)"""
+    command = [sys.executable, STAND_IN, 'serve', '--port', '0',
+               '--latency', str(args.latency), '--jitter', str(args.jitter),
+               '--error-rate', str(args.error_rate), '--throttle-rate', str(args.throttle_rate),
+               '--seed', '0']
+    if args.rate_limit:
+        command += ['--rate-limit', str(args.rate_limit)]
+    if args.fixtures:
+        command += ['--fixtures', args.fixtures]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line:
+        raise RuntimeError('stand-in server failed to start')
+    return process, line.split()[-1]
+
+def stand_in_stats(reset=False):
+    return cf_client.get(f"{cf_client.BASE_URL}/__stats" + ('?reset=1' if reset else '')).json()
+
+def available_engines(names):
+    engines = []
+    for name in names:
+        if name == 'async' and importlib.util.find_spec('aiohttp') is None:
+            print("aiohttp is not installed, skipping the async engine")
+            continue
+        engines.append(name)
+    return engines
+
+def available_extractors(names):
+    extractors = []
+    for name in names:
+        if name == 'bs4' and importlib.util.find_spec('bs4') is None:
+            print("beautifulsoup4 is not installed, skipping the bs4 extractor")
+            continue
+        extractors.append(name)
+    return extractors
+
+def run_once(jobs, engine, concurrency, extractor, args):
+    """Fetch jobs once with fresh metrics; returns one result row"""
+    stand_in_stats(reset=True)
+    collector = metrics.enable()
+    parse = functools.partial(statement_extractor.statement_length, backend=extractor)
+    # The engines print progress and retry notices; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        with collector.stage('page fetch'):
+            results = fetch_problems.fetch_pages(jobs, parse, engine, args.rate, concurrency,
+                                                 max_retries=args.max_retries)
+    report = collector.report()
+    seconds = report['stages']['page fetch']
+    ok = sum(1 for value in results.values() if not isinstance(value, fetch_errors.FetchFailure))
+    return {
+        'engine': engine,
+        'concurrency': concurrency,
+        'extractor': extractor,
+        'pages': len(jobs),
+        'ok': ok,
+        'seconds': seconds,
+        'pages_per_second': round(ok / seconds, 1) if seconds else None,
+        'requests': report['requests']['count'],
+        'latency_ms': report['requests']['latency_ms'],
+        'statuses': report['requests']['statuses'],
+        'parse_ms': (report['work'].get('html parse') or {}).get('mean_ms'),
+        'server': stand_in_stats(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fetch engines against a local Codeforces stand-in')
+    parser.add_argument('--pages', type=int, default=400, help='problem pages per run (default: 400)')
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=ENGINES)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[5, 10, 20, 40],
+                        help='concurrency levels to sweep (the threads engine always uses its 10 threads)')
+    parser.add_argument('--extractors', nargs='+', choices=sorted(statement_extractor.BACKENDS),
+                        default=sorted(statement_extractor.BACKENDS))
+    parser.add_argument('--rate', type=float, default=1000.0,
+                        help='client token-bucket rate; high by default so the engines are the limit')
+    parser.add_argument('--max-retries', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=80.0, help='stand-in mean latency in ms (default: 80)')
+    parser.add_argument('--jitter', type=float, default=30.0, help='stand-in latency deviation in ms (default: 30)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of 5xx responses')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='fraction of 429 responses')
+    parser.add_argument('--rate-limit', type=float, help='stand-in 429s above this many requests per second')
+    parser.add_argument('--fixtures', help='recorded fixtures directory (default: synthetic pages)')
+    parser.add_argument('--json', metavar='PATH', help='also write the results as JSON')
+    args = parser.parse_args()
+
+    engines = available_engines(args.engines)
+    extractors = available_extractors(args.extractors)
+    process, url = start_stand_in(args)
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cf_client.BASE_URL = url
+        problems, _ = cf_client.load_rated_problems(cache_dir=cache_dir)
+        jobs = [(str(p['contestId']) + p['index'], cf_client.problem_url(p['contestId'], p['index']))
+                for p in problems[:args.pages]]
+        print(f"Stand-in at {url}: {len(jobs)} pages, latency {args.latency:g}+-{args.jitter:g} ms, "
+              f"errors {args.error_rate:g}, 429s {args.throttle_rate:g}"
+              + (f", limit {args.rate_limit:g}/s" if args.rate_limit else ''))
+
+        # Warm the stand-in's statement cache so no run pays for page generation
+        for key, page_url in jobs:
+            cf_client.get(page_url)
+
+        rows = []
+        print(f"\n  {'engine':9s} {'conc':>4s} {'extractor':9s} {'pages/s':>8s} {'ok':>9s} "
+              f"{'p50 ms':>7s} {'p95 ms':>7s} {'p99 ms':>7s} {'parse ms':>8s}  statuses")
+        for engine in engines:
+            for concurrency in ([10] if engine == 'threads' else args.concurrency):
+                for extractor in extractors:
+                    row = run_once(jobs, engine, concurrency, extractor, args)
+                    rows.append(row)
+                    latency = row['latency_ms']
+                    print(f"  {engine:9s} {concurrency:4d} {extractor:9s} {row['pages_per_second']:8.1f} "
+                          f"{row['ok']:4d}/{row['pages']:<4d} {latency['p50']:7.1f} {latency['p95']:7.1f} "
+                          f"{latency['p99']:7.1f} {row['parse_ms'] or 0:8.2f}  "
+                          + ', '.join(f"{status}: {n}" for status, n in row['statuses'].items()))
+
+        best = max(rows, key=lambda row: row['pages_per_second'] or 0)
+        print(f"\nFastest: {best['engine']} at concurrency {best['concurrency']} with {best['extractor']} "
+              f"({best['pages_per_second']} pages/s)")
+        if args.json:
+            config = {k: v for k, v in vars(args).items() if k != 'json'}
+            write_atomic(args.json, json.dumps({'config': config, 'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                                                'runs': rows}, indent=2) + '\n')
+            print(f"Results written to {args.json}")
+    finally:
+        process.terminate()
+        process.wait()
+        shutil.rmtree(cache_dir)
+
+if __name__ == "__main__":
+    main()
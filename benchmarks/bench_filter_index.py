@@ -0,0 +1,170 @@
+"""
+Compare filtering by linear scan (what App.jsx does) with the prebuilt
+tag/rating bitset index, on the real dataset and a synthetic larger one
+Usage: python benchmarks/bench_filter_index.py [--input src/problems.js] [--synthetic 50000]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import dataset_builder
+
+NODE_SCRIPT = '''
+import { readFileSync } from 'node:fs';
+import { createFilterIndex, matchPositions } from './filterIndex.js';
+const [problems, index, queries] = ['problems', 'index', 'queries'].map(
+  name => JSON.parse(readFileSync(`${process.argv[2]}/${name}.json`, 'utf-8')));
+const runs = Number(process.argv[3]);
+
+function linear() {
+  return queries.map(({ rating, tags }) => {
+    const out = [];
+    problems.forEach((p, i) => {
+      if (rating !== null && p.rating !== rating) return;
+      if (tags.every(tag => p.tags.includes(tag))) out.push(i);
+    });
+    return out;
+  });
+}
+
+let filterIndex;
+function indexed() {
+  return queries.map(query => matchPositions(filterIndex, query));
+}
+
+function median(fn) {
+  const times = [];
+  let result;
+  for (let i = 0; i < runs; i++) {
+    const start = performance.now();
+    result = fn();
+    times.push(performance.now() - start);
+  }
+  times.sort((a, b) => a - b);
+  return [times[Math.floor(runs / 2)], result];
+}
+
+const buildStart = performance.now();
+filterIndex = createFilterIndex(index);
+const buildMs = performance.now() - buildStart;
+const [linearMs, expected] = median(linear);
+const [indexMs, actual] = median(indexed);
+console.log(JSON.stringify({ buildMs, linearMs, indexMs, same: JSON.stringify(expected) === JSON.stringify(actual) }));
+'''
+
+def synthetic_problems(problems, count, seed=0):
+    """`count` problems drawn from the real ones with fresh ids, ratings and tag subsets"""
+    rng = random.Random(seed)
+    ratings = sorted({p['rating'] for p in problems})
+    out = []
+    for i in range(count):
+        base = rng.choice(problems)
+        tags = [tag for tag in base['tags'] if rng.random() < 0.8]
+        out.append(dict(base, rating=rng.choice(ratings), tags=tags,
+                        problemId=f'{100000 + i // 8}{"ABCDEFGH"[i % 8]}'))
+    return out
+
+def make_queries(problems, count, seed=1):
+    """A mix of rating-only, tag-only and rating+tags queries like the UI issues"""
+    rng = random.Random(seed)
+    ratings = sorted({p['rating'] for p in problems})
+    tags = sorted({tag for p in problems for tag in p['tags']})
+    queries = []
+    for i in range(count):
+        rating = rng.choice(ratings) if i % 3 else None
+        queries.append({'rating': rating, 'tags': rng.sample(tags, i % 3 if rating else 1 + i % 2)})
+    return queries
+
+def linear_scan(problems, queries):
+    return [
+        [i for i, p in enumerate(problems)
+         if (q['rating'] is None or p['rating'] == q['rating'])
+         and all(tag in p['tags'] for tag in q['tags'])]
+        for q in queries
+    ]
+
+def indexed_scan(decoded, queries):
+    return [
+        dataset_builder.bitset_positions(
+            dataset_builder.query_filter_index(decoded, q['rating'], q['tags']))
+        for q in queries
+    ]
+
+def median_time(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[runs // 2] * 1000, result
+
+def run_node(directory, problems, index, queries, runs):
+    for name, data in [('problems', problems), ('index', index), ('queries', queries)]:
+        with open(os.path.join(directory, f'{name}.json'), 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+    out = subprocess.run(['node', os.path.join(directory, 'bench.mjs'), directory, str(runs)],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+def bench(label, problems, queries, runs, directory):
+    start = time.perf_counter()
+    index = dataset_builder.build_filter_index(problems)
+    build_ms = (time.perf_counter() - start) * 1000
+    size = len(dataset_builder.render_filter_index_js(index).encode('utf-8'))
+    decoded = dataset_builder.decode_filter_index(index)
+
+    linear_ms, expected = median_time(lambda: linear_scan(problems, queries), runs)
+    index_ms, actual = median_time(lambda: indexed_scan(decoded, queries), runs)
+    assert actual == expected, f'{label}: index results differ from the linear scan'
+
+    print(f"\n{label}: {len(problems):,d} problems, {len(queries)} queries, "
+          f"index {size / 1024:.0f} KiB built in {build_ms:.0f} ms")
+    print(f"  {'runtime':8s} {'linear scan':>12s} {'bitset index':>13s} {'speedup':>8s}")
+    print(f"  {'python':8s} {linear_ms:9.1f} ms {index_ms:10.1f} ms {linear_ms / index_ms:7.1f}x")
+
+    if directory:
+        node = run_node(directory, problems, index, queries, runs)
+        assert node['same'], f'{label}: src/filterIndex.js results differ from the linear scan'
+        print(f"  {'node':8s} {node['linearMs']:9.1f} ms {node['indexMs']:10.1f} ms "
+              f"{node['linearMs'] / node['indexMs']:7.1f}x  (decode {node['buildMs']:.1f} ms)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare linear-scan filtering with the bitset index')
+    parser.add_argument('--input', default=os.path.join(ROOT, 'src', 'problems.js'),
+                        help='json-format problems.js to read the dataset from')
+    parser.add_argument('--synthetic', type=int, default=50000,
+                        help='size of the synthetic dataset (default: 50000, 0 to skip)')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    problems = dataset_builder.load_problems_js(args.input)
+    datasets = [('problems.js', problems)]
+    if args.synthetic:
+        datasets.append(('synthetic', synthetic_problems(problems, args.synthetic)))
+
+    directory = None
+    if shutil.which('node'):
+        directory = tempfile.mkdtemp()
+        with open(os.path.join(directory, 'package.json'), 'w') as f:
+            f.write('{"type": "module"}')
+        with open(os.path.join(directory, 'bench.mjs'), 'w', encoding='utf-8') as f:
+            f.write(NODE_SCRIPT)
+        shutil.copy(os.path.join(ROOT, 'src', 'filterIndex.js'), directory)
+    try:
+        for label, data in datasets:
+            bench(label, data, make_queries(data, args.queries), args.runs, directory)
+    finally:
+        if directory:
+            shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
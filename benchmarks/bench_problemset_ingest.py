@@ -0,0 +1,128 @@
+"""
+Peak memory of ingesting problemset.problems: the old json.loads + full
+statistics dict versus the streaming ingest in cf_client, as the archive grows
+Usage: python benchmarks/bench_problemset_ingest.py [--sizes 10000 100000 500000]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import cf_client
+
+TAGS = ['binary search', 'bitmasks', 'brute force', 'combinatorics', 'constructive algorithms',
+        'data structures', 'dfs and similar', 'dp', 'graphs', 'greedy', 'implementation', 'math',
+        'number theory', 'sortings', 'strings', 'trees', 'two pointers']
+
+OUT_OF_RANGE = list(range(800, 1600, 100)) + list(range(3100, 3600, 100))
+
+def write_problemset(path, count, kept=None, seed=0):
+    """A problemset.problems response with `count` problems shaped like the real one
+
+    With `kept`, at most that many problems are rated 1600-3000 and the
+    rest fall outside the range, so only the archive size varies.
+    """
+    rng = random.Random(seed)
+    problems = []
+    stats = []
+    in_range = 0
+    for i in range(count):
+        contest_id, index = 1 + i // 6, 'ABCDEF'[i % 6]
+        problem = {
+            'contestId': contest_id,
+            'index': index,
+            'name': ' '.join(rng.choice(['Array', 'Tree', 'Game', 'Strings', 'Queries', 'Paths'])
+                             for _ in range(rng.randint(1, 4))),
+            'type': 'PROGRAMMING',
+            'tags': rng.sample(TAGS, rng.randint(0, 4)),
+        }
+        if rng.random() < 0.85:
+            problem['points'] = 500.0 * (i % 6 + 1)
+            problem['rating'] = rng.randrange(800, 3600, 100)
+            if 1600 <= problem['rating'] <= 3000:
+                in_range += 1
+                if kept is not None and in_range > kept:
+                    problem['rating'] = rng.choice(OUT_OF_RANGE)
+        problems.append(problem)
+        stats.append({'contestId': contest_id, 'index': index, 'solvedCount': rng.randint(0, 60000)})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'status': 'OK', 'result': {'problems': problems, 'problemStatistics': stats}}, f)
+
+def ingest_loads(path):
+    """What fetch_codeforces_problems did before: decode everything, index every statistic"""
+    with open(path, 'rb') as f:
+        data = json.loads(f.read())
+    problem_stats = {}
+    for stat in data['result']['problemStatistics']:
+        problem_stats[str(stat['contestId']) + stat['index']] = stat
+    problems = [p for p in data['result']['problems'] if 1600 <= p.get('rating', 0) <= 3000]
+    return problems, {str(p['contestId']) + p['index']: problem_stats.get(str(p['contestId']) + p['index'])
+                      for p in problems}
+
+def ingest_stream(path):
+    items = cf_client.iter_json_arrays(cf_client._iter_file(path), {'problems', 'problemStatistics'})
+    return cf_client.collect_rated_problems(items)
+
+MODES = {'json.loads': ingest_loads, 'streaming': ingest_stream}
+
+def child(mode, path):
+    """Run one ingest in this fresh process and report peak RSS above the baseline"""
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    problems, stats = MODES[mode](path)
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'seconds': seconds, 'peak_kib': peak, 'delta_kib': peak - baseline,
+                      'kept': len(problems), 'stats': len(stats)}))
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3])
+        return
+    if len(sys.argv) == 5 and sys.argv[1] == '--write':
+        write_problemset(sys.argv[4], int(sys.argv[2]), int(sys.argv[3]) or None)
+        return
+
+    parser = argparse.ArgumentParser(description='Compare problemset.problems ingest memory')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 500000],
+                        help='archive sizes in problems (the real archive has about 10k)')
+    parser.add_argument('--kept', type=int, default=5000,
+                        help='problems rated 1600-3000 in the fixed-window runs (default: 5000)')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        for title, kept in [('Rated problems grow with the archive', 0),
+                            (f'{args.kept:,d} rated problems, archive grows around them', args.kept)]:
+            print(f"\n{title}")
+            print(f"  {'problems':>9s} {'body':>9s} {'mode':11s} {'peak RSS':>9s} {'ingest':>10s} "
+                  f"{'time':>8s} {'kept':>8s}")
+            for size in args.sizes:
+                path = os.path.join(directory, f'problemset-{size}.json')
+                # Generated and measured in child processes: ru_maxrss survives fork/exec,
+                # so a parent holding the synthetic archive would inflate every reading
+                subprocess.run([sys.executable, __file__, '--write', str(size), str(kept), path], check=True)
+                body = os.path.getsize(path) / 2 ** 20
+                results = {}
+                for mode in MODES:
+                    out = subprocess.run([sys.executable, __file__, '--child', mode, path],
+                                         capture_output=True, text=True, check=True)
+                    results[mode] = result = json.loads(out.stdout)
+                    print(f"  {size:9,d} {body:6.1f} MiB {mode:11s} {result['peak_kib'] / 1024:5.0f} MiB "
+                          f"{result['delta_kib'] / 1024:+6.0f} MiB {result['seconds']:6.2f} s "
+                          f"{result['kept']:8,d}")
+                assert all(results['json.loads'][k] == results['streaming'][k] for k in ('kept', 'stats'))
+                os.remove(path)
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Recommender cost: blocked top-k neighbour precomputation and per-handle
+ranking, versus scoring every candidate against every solved problem on the fly.
+With node available, src/recommendations.js is timed too and must rank exactly
+like recommender.py
+Usage: python benchmarks/bench_recommender.py [--problems 5000 20000] [--users 50]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import dataset_builder
+import recommender
+
+NODE_SCRIPT = '''
+import { readFileSync } from 'node:fs';
+import { decodeNeighbours, recommendRows } from './recommendations.js';
+const [data, ratings, users] = ['neighbours', 'ratings', 'users'].map(
+  name => JSON.parse(readFileSync(`${process.argv[2]}/${name}.json`, 'utf-8')));
+
+const neighbours = decodeNeighbours(data);
+const times = [];
+const results = users.map(solved => {
+  const start = performance.now();
+  const rows = recommendRows(neighbours, ratings, solved, Number(process.argv[3]));
+  times.push(performance.now() - start);
+  return rows;
+});
+times.sort((a, b) => a - b);
+console.log(JSON.stringify({ median: times[Math.floor(times.length / 2)], results }));
+'''
+
+def synthetic_problems(problems, count, seed=0):
+    """`count` problems drawn from the real ones with fresh ids and jittered stats"""
+    rng = random.Random(seed)
+    out = []
+    for i in range(count):
+        base = rng.choice(problems)
+        out.append(dict(base, rating=min(3000, max(1600, base['rating'] + rng.choice([-100, 0, 100]))),
+                        solveCount=int(base['solveCount'] * rng.uniform(0.5, 1.5)),
+                        length=int(base['length'] * rng.uniform(0.8, 1.2)),
+                        problemId=f'{100000 + i // 8}{"ABCDEFGH"[i % 8]}'))
+    return out
+
+def solved_sets(ratings, users, seed=1):
+    """Solved rows per user, mostly below a personal level like real histories"""
+    rng = np.random.default_rng(seed)
+    sets = []
+    for _ in range(users):
+        level = rng.uniform(1700, 2600)
+        pool = np.flatnonzero(ratings <= level)
+        sets.append(set(rng.choice(pool, min(len(pool), int(rng.uniform(50, 800))), replace=False).tolist()))
+    return sets
+
+def on_the_fly(features, ratings, solved_rows, count=20):
+    """Score every problem against every solved problem, no precomputation"""
+    solved = np.asarray(sorted(solved_rows))
+    scores = (features @ features[solved].T).clip(0, None).sum(axis=1)
+    scores *= recommender.rating_damping(ratings, recommender.target_rating(ratings, solved))
+    scores[solved] = 0
+    return np.argsort(-scores, kind='stable')[:count]
+
+def run_node(data, ratings, users, count):
+    """(median ms, ranked rows per user) from src/recommendations.js"""
+    directory = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(directory, 'package.json'), 'w') as f:
+            f.write('{"type": "module"}')
+        with open(os.path.join(directory, 'bench.mjs'), 'w', encoding='utf-8') as f:
+            f.write(NODE_SCRIPT)
+        shutil.copy(os.path.join(ROOT, 'src', 'recommendations.js'), directory)
+        for name, value in [('neighbours', data), ('ratings', ratings), ('users', users)]:
+            with open(os.path.join(directory, f'{name}.json'), 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+        out = subprocess.run(['node', os.path.join(directory, 'bench.mjs'), directory, str(count)],
+                             capture_output=True, text=True, check=True)
+    finally:
+        shutil.rmtree(directory)
+    result = json.loads(out.stdout)
+    return result['median'], result['results']
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return (time.perf_counter() - start) * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark neighbour precomputation and per-handle ranking')
+    parser.add_argument('--input', default=os.path.join(ROOT, 'src', 'problems.js'))
+    parser.add_argument('--problems', type=int, nargs='+', default=[5000, 20000])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('-k', type=int, default=recommender.DEFAULT_K)
+    parser.add_argument('--count', type=int, default=20, help='recommendations per user (default: 20)')
+    args = parser.parse_args()
+    node = shutil.which('node')
+
+    real = dataset_builder.load_problems_js(args.input)
+    print(f"{'problems':>9s} {'features':>9s} {'top-k':>9s} {'rank p50':>9s} {'rank max':>9s} "
+          f"{'on the fly':>11s} {'shipped':>8s}" + (f" {'node p50':>9s}" if node else ''))
+    for count in args.problems:
+        problems = real if count == len(real) else synthetic_problems(real, count)
+        ratings = np.array([p['rating'] for p in problems], dtype=np.float32)
+        features_ms, features = timed(lambda: recommender.feature_matrix(problems))
+        top_k_ms, (rows, weights) = timed(lambda: recommender.top_k_neighbours(features, args.k))
+        data = recommender.neighbours_json(problems, rows, weights)
+        size = len(recommender.render_neighbours_js(data))
+
+        users = solved_sets(ratings, args.users)
+        ranked = [timed(lambda: recommender.recommend(rows, weights, ratings, solved, args.count))
+                  for solved in users]
+        rank_ms = sorted(ms for ms, _ in ranked)
+        fly_ms = sorted(timed(lambda: on_the_fly(features, ratings, solved))[0] for solved in users)
+        line = (f"{count:9d} {features_ms:6.0f} ms {top_k_ms:6.0f} ms {rank_ms[len(rank_ms) // 2]:6.2f} ms "
+                f"{rank_ms[-1]:6.2f} ms {fly_ms[len(fly_ms) // 2]:8.1f} ms {size / 1024:5.0f} KiB")
+        if node:
+            node_ms, node_ranked = run_node(data, [p['rating'] for p in problems],
+                                            [sorted(solved) for solved in users], args.count)
+            mismatches = sum(best.tolist() != js for (_, (best, _)), js in zip(ranked, node_ranked))
+            assert not mismatches, f'src/recommendations.js ranked {mismatches}/{len(users)} users differently'
+            line += f" {node_ms:6.2f} ms"
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Compare looking problems up by name / partial ID / tag with a substring scan
+over every problem against the trigram search index, per keystroke
+Usage: python benchmarks/bench_search_index.py [--input src/problems.js] [--queries 300]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import dataset_builder
+
+NODE_SCRIPT = '''
+import { readFileSync } from 'node:fs';
+import { createSearchIndex, scanPositions, searchPositions } from './problemSearch.js';
+const [problems, index, queries] = ['problems', 'index', 'queries'].map(
+  name => JSON.parse(readFileSync(`${process.argv[2]}/${name}.json`, 'utf-8')));
+
+function perQuery(fn) {
+  const times = [];
+  const results = queries.map(query => {
+    const start = performance.now();
+    const result = fn(query);
+    times.push(performance.now() - start);
+    return result;
+  });
+  times.sort((a, b) => a - b);
+  return [times[Math.floor(times.length / 2)], times[Math.floor(times.length * 0.99)], results];
+}
+
+const buildStart = performance.now();
+const searchIndex = createSearchIndex(index);
+const buildMs = performance.now() - buildStart;
+const [scanMedian, scanP99, expected] = perQuery(query => scanPositions(problems, query));
+const [indexMedian, indexP99, actual] = perQuery(query => searchPositions(searchIndex, query));
+console.log(JSON.stringify({ buildMs, scanMedian, scanP99, indexMedian, indexP99,
+                             same: JSON.stringify(expected) === JSON.stringify(actual) }));
+'''
+
+def make_queries(problems, count, seed=1):
+    """What users type while looking a problem up: every prefix of a name
+    fragment, a full or partial problemId, or a tag"""
+    rng = random.Random(seed)
+    tags = sorted({tag for p in problems for tag in p['tags']})
+    queries = []
+    while len(queries) < count:
+        problem = rng.choice(problems)
+        kind = rng.random()
+        if kind < 0.6:
+            words = problem['name'].split()
+            start = rng.randrange(len(words))
+            text = ' '.join(words[start:start + 2])
+        elif kind < 0.85:
+            text = problem['problemId'] if rng.random() < 0.5 else problem['problemId'][:-1]
+        else:
+            text = rng.choice(tags)
+        queries += [text[:end] for end in range(1, len(text) + 1)]
+    return queries[:count]
+
+def scan(problems, query):
+    """Ascending positions by checking every problem's tokens"""
+    terms = set(dataset_builder.search_tokens(query))
+    return [
+        i for i, problem in enumerate(problems)
+        if all(any(token.startswith(term) if len(term) < 3 else term in token
+                   for token in dataset_builder.problem_search_tokens(problem))
+               for term in terms)
+    ]
+
+def per_query(fn, queries):
+    times = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(fn(query))
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times[len(times) // 2], times[int(len(times) * 0.99)], results
+
+def run_node(directory, problems, index, queries):
+    for name, data in [('problems', problems), ('index', index), ('queries', queries)]:
+        with open(os.path.join(directory, f'{name}.json'), 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+    out = subprocess.run(['node', os.path.join(directory, 'bench.mjs'), directory],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare substring scans with the search index')
+    parser.add_argument('--input', default=os.path.join(ROOT, 'src', 'problems.js'),
+                        help='problems.js to read the dataset from')
+    parser.add_argument('--queries', type=int, default=300)
+    args = parser.parse_args()
+
+    problems = dataset_builder.load_problems_js(args.input)
+    queries = make_queries(problems, args.queries)
+
+    start = time.perf_counter()
+    index = dataset_builder.build_search_index(problems)
+    build_ms = (time.perf_counter() - start) * 1000
+    source = dataset_builder.render_search_index_js(index).encode('utf-8')
+    decoded = dataset_builder.decode_search_index(index)
+
+    scan_median, scan_p99, expected = per_query(lambda q: scan(problems, q), queries)
+    index_median, index_p99, actual = per_query(
+        lambda q: dataset_builder.query_search_index(decoded, q), queries)
+    assert actual == expected, 'index results differ from the scan'
+
+    print(f"{len(problems):,d} problems, {len(queries)} keystroke queries; index built in {build_ms:.0f} ms, "
+          f"{len(source) / 1024:.0f} KiB ({len(gzip.compress(source)) / 1024:.0f} KiB gzipped)")
+    print(f"  {'runtime':8s} {'scan p50/p99':>16s} {'index p50/p99':>16s}")
+    print(f"  {'python':8s} {scan_median:6.2f} /{scan_p99:6.2f} ms {index_median:6.3f} /{index_p99:6.3f} ms")
+
+    if shutil.which('node'):
+        directory = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(directory, 'package.json'), 'w') as f:
+                f.write('{"type": "module"}')
+            with open(os.path.join(directory, 'bench.mjs'), 'w', encoding='utf-8') as f:
+                f.write(NODE_SCRIPT)
+            shutil.copy(os.path.join(ROOT, 'src', 'problemSearch.js'), directory)
+            node = run_node(directory, problems, index, queries)
+        finally:
+            shutil.rmtree(directory)
+        assert node['same'], 'src/problemSearch.js results differ from the scan'
+        print(f"  {'node':8s} {node['scanMedian']:6.2f} /{node['scanP99']:6.2f} ms "
+              f"{node['indexMedian']:6.3f} /{node['indexP99']:6.3f} ms  (setup {node['buildMs']:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""
+Local stand-in for codeforces.com: serves problemset.problems, contest.list,
+contest.standings and problem/contest pages from recorded fixtures, with configurable latency, 5xx
+errors and 429 throttling, so the fetchers can be benchmarked offline
+Usage: python benchmarks/cf_stand_in.py serve [--port 8765] [--fixtures DIR]
+           [--latency 80] [--jitter 30] [--error-rate 0.02] [--throttle-rate 0.05] [--rate-limit 50]
+           [--just-finished 1927 ...]
+       python benchmarks/cf_stand_in.py record DIR [--pages 200] [--contests 20]
+Point a fetcher at it with --base-url http://127.0.0.1:8765 (or CF_BASE_URL).
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import parse_qs, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import cf_client
+import dataset_builder
+from journal import write_atomic
+from synthetic_pages import make_statement, wrap_contest_page, wrap_problem_page
+
+DEFAULT_DATASET = os.path.join(ROOT, 'src', 'problems.js')
+DEFAULT_PORT = 8765
+PROBLEM_ID_RE = re.compile(r'(\d+)(\w+)')
+PROBLEM_PATH_RE = re.compile(r'/(?:problemset/problem/(\d+)/(\w+)|contest/(\d+)/problem/(\w+))/?')
+CONTEST_PATH_RE = re.compile(r'/contest/(\d+)/problems/?')
+ERROR_STATUSES = [500, 502, 504]
+# Synthetic contest.list timing: two-hour rounds, one every CONTEST_SPACING
+# seconds going back from the newest, which ended an hour before startup
+CONTEST_DURATION = 2 * 60 * 60
+CONTEST_SPACING = 3 * 24 * 60 * 60
+
+def synthetic_contest_list(contest_ids, just_finished=(), now=None):
+    """A contest.list body for the given contests, newest id first
+
+    Contests are spaced CONTEST_SPACING apart, the newest ending an hour
+    ago; contests in `just_finished` all ended an hour ago, so a watcher
+    treats them as new (python fetch_problems.py --watch).
+    """
+    last_end = int(now if now is not None else time.time()) - 60 * 60
+    contests = []
+    for age, contest_id in enumerate(sorted(contest_ids, reverse=True)):
+        end = last_end if contest_id in just_finished else last_end - age * CONTEST_SPACING
+        contests.append({'id': contest_id, 'name': f'Codeforces Round {contest_id}', 'type': 'CF',
+                         'phase': 'FINISHED', 'startTimeSeconds': end - CONTEST_DURATION,
+                         'durationSeconds': CONTEST_DURATION})
+    return json.dumps({'status': 'OK', 'result': contests}).encode('utf-8')
+
+def synthetic_problemset(dataset_path=DEFAULT_DATASET):
+    """A problemset.problems body built from a json-format problems.js"""
+    problems = []
+    stats = []
+    for problem in dataset_builder.load_problems_js(dataset_path):
+        contest_id, index = PROBLEM_ID_RE.fullmatch(problem['problemId']).groups()
+        contest_id = int(contest_id)
+        problems.append({'contestId': contest_id, 'index': index, 'name': problem['name'],
+                         'type': 'PROGRAMMING', 'rating': problem['rating'], 'tags': problem['tags']})
+        stats.append({'contestId': contest_id, 'index': index, 'solvedCount': problem['solveCount']})
+    body = {'status': 'OK', 'result': {'problems': problems, 'problemStatistics': stats}}
+    return json.dumps(body).encode('utf-8')
+
+class Fixtures:
+    """What the stand-in serves
+
+    Responses recorded into `directory` (see record()) are served as they
+    are: problemset.problems.json, contest.list.json, pages/<problemId>.html
+    and contests/<contestId>.html. Anything not recorded is synthesized:
+    the problemset from the dataset in problems.js, the contest list from
+    its contests (see synthetic_contest_list), and pages from a statement
+    generated per problem, so a problem page and its contest page always
+    agree on the statement.
+    """
+
+    def __init__(self, directory=None, dataset_path=DEFAULT_DATASET, just_finished=()):
+        self.directory = directory
+        self.problemset = self._read('problemset.problems.json') or synthetic_problemset(dataset_path)
+        self.contest_problems = {}
+        for problem in json.loads(self.problemset)['result']['problems']:
+            self.contest_problems.setdefault(problem['contestId'], []).append(problem)
+        for problems in self.contest_problems.values():
+            problems.sort(key=lambda p: p['index'])
+        self.indices = {contest_id: [p['index'] for p in problems]
+                        for contest_id, problems in self.contest_problems.items()}
+        self.contest_list = (self._read('contest.list.json')
+                             or synthetic_contest_list(self.indices, set(just_finished)))
+        self._statements = {}
+
+    def standings(self, contest_id):
+        """A contest.standings body without rows: the contest's problems from the problemset"""
+        problems = self.contest_problems.get(contest_id)
+        if problems is None:
+            return None
+        return json.dumps({'status': 'OK', 'result': {'contest': {'id': contest_id, 'phase': 'FINISHED'},
+                                                      'problems': problems, 'rows': []}}).encode('utf-8')
+
+    def _read(self, *parts):
+        if self.directory is None:
+            return None
+        try:
+            with open(os.path.join(self.directory, *parts), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def statement(self, contest_id, index):
+        problem_id = f'{contest_id}{index}'
+        statement = self._statements.get(problem_id)
+        if statement is None:
+            rng = random.Random(zlib.crc32(problem_id.encode()))
+            statement = self._statements.setdefault(problem_id, make_statement(rng, index))
+        return statement
+
+    def problem_page(self, contest_id, index):
+        recorded = self._read('pages', f'{contest_id}{index}.html')
+        if recorded is not None:
+            return recorded
+        if index not in self.indices.get(contest_id, ()):
+            return None
+        return wrap_problem_page(self.statement(contest_id, index), index, contest_id).encode('utf-8')
+
+    def contest_page(self, contest_id):
+        recorded = self._read('contests', f'{contest_id}.html')
+        if recorded is not None:
+            return recorded
+        if contest_id not in self.indices:
+            return None
+        statements = [(index, self.statement(contest_id, index)) for index in self.indices[contest_id]]
+        return wrap_contest_page(statements, contest_id).encode('utf-8')
+
+class StandInServer(ThreadingHTTPServer):
+    """Serves Fixtures with injected latency, failures and throttling
+
+    Every request first waits latency +- jitter seconds (normally
+    distributed, never negative). It is then answered 429 with probability
+    throttle_rate, or whenever more than rate_limit requests arrived in the
+    last second, and 500/502/504 with probability error_rate. Requests to
+    /__stats are exempt and return the status counts so far
+    (/__stats?reset=1 also clears them).
+    """
+
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, fixtures, latency=0.0, jitter=0.0, error_rate=0.0,
+                 throttle_rate=0.0, rate_limit=None, seed=None):
+        super().__init__(address, StandInHandler)
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.rng = random.Random(seed)
+        self.lock = Lock()
+        self.window = deque()
+        self.statuses = {}
+        self.bytes_sent = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def delay(self):
+        with self.lock:
+            return max(0.0, self.rng.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+
+    def injected_status(self):
+        """429/5xx to answer instead of the real response, or None"""
+        with self.lock:
+            if self.rate_limit:
+                now = time.monotonic()
+                while self.window and now - self.window[0] >= 1.0:
+                    self.window.popleft()
+                if len(self.window) >= self.rate_limit:
+                    return 429
+                self.window.append(now)
+            roll = self.rng.random()
+            if roll < self.throttle_rate:
+                return 429
+            if roll < self.throttle_rate + self.error_rate:
+                return self.rng.choice(ERROR_STATUSES)
+        return None
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections at the end of a run are expected
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+    def record(self, status, size):
+        with self.lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.bytes_sent += size
+
+    def stats(self, reset=False):
+        with self.lock:
+            stats = {'requests': sum(self.statuses.values()), 'bytes': self.bytes_sent,
+                     'statuses': {str(status): n for status, n in sorted(self.statuses.items())}}
+            if reset:
+                self.statuses = {}
+                self.bytes_sent = 0
+        return stats
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real site
+    disable_nagle_algorithm = True  # headers and body go out separately; avoid delayed-ACK stalls
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/__stats':
+            reset = parse_qs(url.query).get('reset') == ['1']
+            self._send(200, json.dumps(self.server.stats(reset)).encode('utf-8'), 'application/json',
+                       record=False)
+            return
+
+        delay = self.server.delay()
+        if delay:
+            time.sleep(delay)
+        status = self.server.injected_status()
+        if status is not None:
+            headers = {'Retry-After': '1'} if status == 429 else {}
+            self._send(status, f'<html><body>{status}</body></html>'.encode('utf-8'), headers=headers)
+            return
+
+        fixtures = self.server.fixtures
+        if url.path.startswith('/api/'):
+            method = url.path[len('/api/'):]
+            body = {'problemset.problems': fixtures.problemset, 'contest.list': fixtures.contest_list}.get(method)
+            if method == 'contest.standings':
+                contest_id = parse_qs(url.query).get('contestId', [''])[-1]
+                body = fixtures.standings(int(contest_id)) if contest_id.isdigit() else None
+                if body is None:
+                    failed = {'status': 'FAILED', 'comment': f'contestId: Contest with id {contest_id} not found'}
+                    self._send(400, json.dumps(failed).encode('utf-8'), 'application/json')
+                    return
+            if body is None:
+                failed = {'status': 'FAILED', 'comment': f'method {method} is not served by the stand-in'}
+                self._send(400, json.dumps(failed).encode('utf-8'), 'application/json')
+            else:
+                self._send_api(body)
+            return
+
+        page = None
+        match = PROBLEM_PATH_RE.fullmatch(url.path)
+        if match:
+            contest_id, index = [group for group in match.groups() if group]
+            page = fixtures.problem_page(int(contest_id), index)
+        else:
+            match = CONTEST_PATH_RE.fullmatch(url.path)
+            if match:
+                page = fixtures.contest_page(int(match.group(1)))
+        if page is None:
+            self._send(404, b'<html><body>Not Found</body></html>')
+        else:
+            self._send(200, page)
+
+    def _send_api(self, body):
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, b'', headers={'ETag': etag})
+        else:
+            self._send(200, body, 'application/json', headers={'ETag': etag})
+
+    def _send(self, status, body, content_type='text/html; charset=utf-8', headers=None, record=True):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        if record:
+            self.server.record(status, len(body))
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(fixtures=None, host='127.0.0.1', port=0, **options):
+    """Run a stand-in on a background thread and return it (server.url, server.shutdown())"""
+    server = StandInServer((host, port), fixtures or Fixtures(), **options)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def record(directory, pages=200, contests=20, delay=1.0, min_rating=1600, max_rating=3000, seed=0):
+    """Save real Codeforces responses as fixtures for the stand-in
+
+    Downloads both API bodies and a random sample of problem pages (and the
+    contest pages of the first sampled contests), one request per `delay`
+    seconds. Files that already exist are kept, so an interrupted recording
+    can simply be restarted.
+    """
+    for method in ('problemset.problems', 'contest.list'):
+        response = cf_client.get(cf_client.api_url(method), timeout=60)
+        response.raise_for_status()
+        write_atomic(os.path.join(directory, f'{method}.json'), response.content)
+        print(f"Recorded {method} ({len(response.content) / 2 ** 20:.1f} MiB)")
+        time.sleep(delay)
+
+    with open(os.path.join(directory, 'problemset.problems.json'), 'rb') as f:
+        problems = [p for p in json.loads(f.read())['result']['problems']
+                    if min_rating <= p.get('rating', 0) <= max_rating]
+    sample = random.Random(seed).sample(problems, min(pages, len(problems)))
+    contest_ids = list(dict.fromkeys(p['contestId'] for p in sample))[:contests]
+    targets = [(os.path.join(directory, 'pages', f"{p['contestId']}{p['index']}.html"),
+                cf_client.problem_url(p['contestId'], p['index'])) for p in sample]
+    targets += [(os.path.join(directory, 'contests', f'{contest_id}.html'),
+                 cf_client.contest_problems_url(contest_id)) for contest_id in contest_ids]
+
+    for n, (path, url) in enumerate(targets, 1):
+        if os.path.exists(path):
+            continue
+        response = cf_client.get(url, timeout=30)
+        if response.status_code == 200:
+            write_atomic(path, response.content)
+        else:
+            print(f"  {url}: HTTP {response.status_code}, skipped")
+        if n % 25 == 0:
+            print(f"  Recorded {n}/{len(targets)} pages...")
+        time.sleep(delay)
+    print(f"Fixtures written to {directory}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Local Codeforces stand-in for offline benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve', help='serve fixtures over HTTP')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT, help='0 picks a free port')
+    serve.add_argument('--fixtures', help='directory written by the record command (default: synthetic)')
+    serve.add_argument('--dataset', default=DEFAULT_DATASET,
+                       help='problems.js to synthesize problemset.problems from when not recorded')
+    serve.add_argument('--latency', type=float, default=0.0, help='mean added latency in ms (default: 0)')
+    serve.add_argument('--jitter', type=float, default=0.0, help='latency standard deviation in ms')
+    serve.add_argument('--error-rate', type=float, default=0.0, help='fraction answered 500/502/504')
+    serve.add_argument('--throttle-rate', type=float, default=0.0, help='fraction answered 429')
+    serve.add_argument('--rate-limit', type=float,
+                       help='answer 429 above this many requests per second, like the real site')
+    serve.add_argument('--seed', type=int, help='seed for latency and failure injection')
+    serve.add_argument('--just-finished', type=int, nargs='+', default=[], metavar='CONTEST_ID',
+                       help='synthetic contest.list: these contests ended an hour ago, '
+                            'for trying out fetch_problems.py --watch')
+
+    rec = commands.add_parser('record', help='record real responses into a fixtures directory')
+    rec.add_argument('directory')
+    rec.add_argument('--pages', type=int, default=200, help='problem pages to sample (default: 200)')
+    rec.add_argument('--contests', type=int, default=20, help='contest pages to record (default: 20)')
+    rec.add_argument('--delay', type=float, default=1.0, help='seconds between requests (default: 1)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.command == 'record':
+        record(args.directory, args.pages, args.contests, args.delay)
+        return
+
+    server = StandInServer((args.host, args.port), Fixtures(args.fixtures, args.dataset, args.just_finished),
+                           latency=args.latency / 1000, jitter=args.jitter / 1000,
+                           error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                           rate_limit=args.rate_limit, seed=args.seed)
+    print(f"Serving Codeforces stand-in on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import random
+
+WORDS = (
+    'array integer query segment tree graph vertex edge permutation string '
+    'prefix suffix maximum minimum answer test case output input given find '
+    'number of operations such that each and the is a you are'
+).split()
+
+PAGE_HEAD = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Problem - Codeforces</title>
+<link rel="stylesheet" href="/s/style.css" type="text/css">
+<script type="text/javascript">
+  window.standaloneContest = false;
+  var x = "<div class=\\"problem-statement\\">not this one</div>";
+</script>
+</head>
+<body>
+<div id="header"><a href="/"><img src="/logo.png" alt="Codeforces"></a>
+<div class="lang-chooser"><a href="?locale=en">English</a> | <a href="?locale=ru">Russian</a></div></div>
+<div class="menu-box"><ul>{menu}</ul></div>
+<div id="sidebar">{sidebar}</div>
+<div id="pageContent" class="content-with-sidebar">
+'''
+
+PAGE_TAIL = '''
+</div>
+<!-- footer -->
+<div id="footer">Codeforces (c) Copyright 2010-2025 Mike Mirzayanov</div>
+<script type="text/javascript" src="/s/scripts.js"></script>
+</body>
+</html>
+'''
+
+def _sentence(rng, words=12):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text.capitalize() + f' $$$1 \\le n \\le 10^{rng.randint(3, 6)}$$$ &amp; more.'
+
+def make_statement(rng, index='A', paragraphs=None):
+    """Return one Codeforces-style problem statement block"""
+    paragraphs = paragraphs or rng.randint(3, 8)
+    body = ''.join(f'<p>{_sentence(rng, rng.randint(8, 30))}</p>\n' for _ in range(paragraphs))
+    tests = ''.join(
+        f'<div class="input"><div class="title">Input</div><pre>\n{rng.randint(1, 99)} {rng.randint(1, 99)}\n</pre></div>'
+        f'<div class="output"><div class="title">Output</div><pre>\n{rng.randint(1, 999)}\n</pre></div>'
+        for _ in range(rng.randint(1, 3))
+    )
+    return f'''<div class="problem-statement">
+<div class="header"><div class="title">{index}. {' '.join(rng.choice(WORDS) for _ in range(3)).title()}</div>
+<div class="time-limit"><div class="property-title">time limit per test</div>2 seconds</div>
+<div class="memory-limit"><div class="property-title">memory limit per test</div>256 megabytes</div>
+<div class="input-file"><div class="property-title">input</div>standard input</div>
+<div class="output-file"><div class="property-title">output</div>standard output</div></div>
+<div>{body}</div>
+<div class="input-specification"><div class="section-title">Input</div><p>{_sentence(rng)}</p></div>
+<div class="output-specification"><div class="section-title">Output</div><p>{_sentence(rng)}</p></div>
+<div class="sample-tests"><div class="section-title">Examples</div><div class="sample-test">{tests}</div></div>
+<div class="note"><div class="section-title">Note</div><p>{_sentence(rng)}<!-- editorial link --></p></div>
+</div>'''
+
+def _chrome(rng):
+    menu = ''.join(f'<li><a href="/m{i}">{rng.choice(WORDS)}</a></li>' for i in range(10))
+    sidebar = ''.join(
+        f'<div class="roundbox sidebox"><div class="caption">{rng.choice(WORDS)}</div>'
+        f'<table>{"".join(f"<tr><td>{rng.choice(WORDS)}</td><td>{rng.randint(1, 3000)}</td></tr>" for _ in range(20))}</table></div>'
+        for _ in range(4)
+    )
+    return PAGE_HEAD.format(menu=menu, sidebar=sidebar)
+
+def make_problem_page(seed, index='A'):
+    """Return a synthetic /problemset/problem/{contest}/{index} page"""
+    rng = random.Random(seed)
+    return (_chrome(rng)
+            + f'<div class="problemindexholder" problemindex="{index}"><div class="ttypography">'
+            + make_statement(rng, index)
+            + '</div></div>' + PAGE_TAIL)
+
+def make_contest_page(seed, indices='ABCDEF'):
+    """Return a synthetic /contest/{id}/problems page with every statement"""
+    rng = random.Random(seed)
+    holders = ''.join(
+        f'<div class="problemindexholder" problemindex="{index}" data-uuid="ps_{seed}{index}">'
+        f'<div class="ttypography">{make_statement(rng, index)}</div></div>\n'
+        for index in indices
+    )
+    return _chrome(rng) + '<div class="problem-frames">' + holders + '</div>' + PAGE_TAIL
+
+def wrap_problem_page(statement, index='A', seed=0):
+    """Put a prepared statement into a /problemset/problem page"""
+    return (_chrome(random.Random(seed))
+            + f'<div class="problemindexholder" problemindex="{index}"><div class="ttypography">'
+            + statement + '</div></div>' + PAGE_TAIL)
+
+def wrap_contest_page(statements, seed=0):
+    """Put prepared (index, statement) pairs into a /contest/{id}/problems page"""
+    holders = ''.join(
+        f'<div class="problemindexholder" problemindex="{index}">'
+        f'<div class="ttypography">{statement}</div></div>\n'
+        for index, statement in statements
+    )
+    return _chrome(random.Random(seed)) + '<div class="problem-frames">' + holders + '</div>' + PAGE_TAIL
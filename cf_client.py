@@ -0,0 +1,261 @@
+import codecs
+import hashlib
+import json
+import os
+import re
+import requests
+from requests.adapters import HTTPAdapter
+from threading import Lock
+import metrics
+from journal import write_atomic
+
+# CF_BASE_URL points every fetcher somewhere else, e.g. benchmarks/cf_stand_in.py
+BASE_URL = os.environ.get('CF_BASE_URL', 'https://codeforces.com').rstrip('/')
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+DEFAULT_RESPONSE_CACHE = '.cache/http'
+POOL_SIZE = 32
+CHUNK_SIZE = 64 * 1024
+# Codeforces documents one API call per two seconds; allow a short burst so a
+# handful of calls (a "Check Solved" over a few handles, a watch poll) is not
+# serialised
+API_RATE = 0.5
+API_BURST = 5
+
+_session = None
+_session_lock = Lock()
+
+def get_session():
+    """Return the shared keep-alive session used for every Codeforces request"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(HEADERS)
+            _session = session
+        return _session
+
+def get(url, timeout=15, **kwargs):
+    """GET a URL over the pooled session"""
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+def problem_url(contest_id, index):
+    return f"{BASE_URL}/problemset/problem/{contest_id}/{index}"
+
+def contest_problem_url(contest_id, index):
+    return f"{BASE_URL}/contest/{contest_id}/problem/{index}"
+
+def contest_problems_url(contest_id):
+    return f"{BASE_URL}/contest/{contest_id}/problems"
+
+def api_url(method):
+    return f"{BASE_URL}/api/{method}"
+
+class APIError(Exception):
+    """The Codeforces API answered with a non-OK status"""
+
+def _cache_paths(url, cache_dir):
+    key = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+    base = os.path.join(cache_dir, key)
+    return base + '.body.meta.json', base + '.body.json'
+
+def _load_meta(meta_path, data_path):
+    if os.path.exists(meta_path) and os.path.exists(data_path):
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def _conditional_headers(meta):
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+    return headers
+
+def _write_meta(meta_path, url, response):
+    write_atomic(meta_path, json.dumps({
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }).encode('utf-8'))
+
+def get_api(method, cache_dir=DEFAULT_RESPONSE_CACHE, timeout=30):
+    """Call a Codeforces API method and return the decoded JSON
+
+    The raw body of the last OK response is kept on disk together with its
+    ETag and Last-Modified headers, in the same cache stream_api uses.
+    Later calls revalidate with If-None-Match / If-Modified-Since; on 304
+    the cached body is decoded instead of downloaded again.
+    """
+    url = api_url(method)
+    meta_path, data_path = _cache_paths(url, cache_dir)
+
+    meta = _load_meta(meta_path, data_path)
+    response = get(url, timeout=timeout, headers=_conditional_headers(meta))
+
+    if response.status_code == 304 and meta:
+        print(f"  {method}: not modified, using cached response")
+        with open(data_path, 'rb') as f:
+            return json.loads(f.read())
+
+    data = response.json()
+
+    if data.get('status') == 'OK' and (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+        write_atomic(data_path, response.content)
+        _write_meta(meta_path, url, response)
+
+    return data
+
+ARRAY_KEY_RE = re.compile(r'"(\w+)"\s*:\s*\[')
+STATUS_RE = re.compile(r'"status"\s*:\s*"(\w+)"')
+
+def iter_json_arrays(chunks, names):
+    """Yield (name, element) for every element of the named arrays in a JSON stream
+
+    `chunks` is any iterable of bytes. Elements are decoded one at a time,
+    so memory holds a single element plus one chunk no matter how long
+    the arrays are. Only the text between arrays is searched for keys,
+    which is enough for API envelopes like {"status": ..., "result": {...}}.
+    Raises APIError if the envelope's status is not OK.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buf = ''
+    pos = 0
+    current = None  # array being walked, None between arrays
+    seen_array = False
+    done = False
+
+    while True:
+        if current is None:
+            match = ARRAY_KEY_RE.search(buf, pos)
+            if match:
+                pos = match.end()
+                if match.group(1) in names:
+                    if not seen_array:
+                        status = STATUS_RE.search(buf, 0, match.start())
+                        if status and status.group(1) != 'OK':
+                            raise APIError(status.group(1))
+                        seen_array = True
+                    current = match.group(1)
+                continue
+        else:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf):
+                if buf[pos] == ']':
+                    current = None
+                    pos += 1
+                    continue
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if done:
+                        raise
+                else:
+                    # A number ending at the buffer edge may continue in the next chunk
+                    if end < len(buf) or done:
+                        yield current, item
+                        pos = end
+                        continue
+
+        if done:
+            break
+        chunk = next(chunks, None)
+        done = chunk is None
+        if not seen_array:
+            keep = 0  # the envelope head is small; keep it to read the status
+        elif current is None:
+            keep = max(pos, len(buf) - 64)  # a key may straddle two chunks
+        else:
+            keep = pos
+        buf = buf[keep:] + utf8.decode(chunk or b'', final=done)
+        pos -= keep
+
+    if current is not None:
+        raise json.JSONDecodeError(f'Unterminated array {current!r}', buf, pos)
+    if not seen_array:
+        data = json.loads(buf) if buf.strip() else {}
+        if data.get('status') != 'OK':
+            raise APIError(data.get('comment') or data.get('status') or 'empty response')
+
+def _iter_file(path):
+    with open(path, 'rb') as f:
+        yield from iter(lambda: f.read(CHUNK_SIZE), b'')
+
+def _iter_response(response, data_path, meta_path, url):
+    """Yield body chunks while teeing them into the cache, committed only when complete"""
+    cacheable = bool(response.headers.get('ETag') or response.headers.get('Last-Modified'))
+    tmp_path = f"{data_path}.{os.getpid()}.tmp"
+    if cacheable:
+        os.makedirs(os.path.dirname(data_path) or '.', exist_ok=True)
+    out = open(tmp_path, 'wb') if cacheable else None
+    try:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            if out is not None:
+                out.write(chunk)
+            yield chunk
+        if out is not None:
+            out.close()
+            os.replace(tmp_path, data_path)
+            _write_meta(meta_path, url, response)
+            out = None
+    finally:
+        response.close()
+        if out is not None:
+            out.close()
+            os.remove(tmp_path)
+
+def stream_api(method, arrays, cache_dir=DEFAULT_RESPONSE_CACHE, timeout=30):
+    """Stream the elements of the named result arrays of a Codeforces API method
+
+    Yields (array name, element) without ever holding the whole response.
+    Like get_api the raw body is cached with its ETag/Last-Modified, and a
+    304 replays it from disk. Raises APIError on a non-OK status.
+    """
+    url = api_url(method)
+    meta_path, data_path = _cache_paths(url, cache_dir)
+    meta = _load_meta(meta_path, data_path)
+    with metrics.stage('api download'):
+        response = get(url, timeout=timeout, headers=_conditional_headers(meta), stream=True)
+
+    if response.status_code == 304 and meta:
+        response.close()
+        print(f"  {method}: not modified, using cached response")
+        chunks = _iter_file(data_path)
+    else:
+        response.raise_for_status()
+        chunks = _iter_response(response, data_path, meta_path, url)
+    yield from iter_json_arrays(metrics.timed_iter(chunks, 'api download'), set(arrays))
+
+def collect_rated_problems(items, min_rating=1600, max_rating=3000):
+    """Keep problems rated in range and only their statistics from streamed problemset items
+
+    `items` are (array name, element) pairs as yielded by stream_api.
+    Problems come before problemStatistics in the response, so the filter
+    is applied while streaming and every other statistic is dropped on
+    sight. Returns (problems, {problemId: statistics}).
+    """
+    problems = []
+    stats = {}
+    kept = set()
+    for name, item in items:
+        problem_id = str(item.get('contestId')) + item['index']
+        if name == 'problems':
+            if min_rating <= item.get('rating', 0) <= max_rating:
+                problems.append(item)
+                kept.add(problem_id)
+        elif problem_id in kept:
+            stats[problem_id] = item
+    return problems, stats
+
+def load_rated_problems(min_rating=1600, max_rating=3000, cache_dir=DEFAULT_RESPONSE_CACHE):
+    """Stream problemset.problems into (rated problems in range, their statistics)"""
+    items = stream_api('problemset.problems', ('problems', 'problemStatistics'), cache_dir)
+    return collect_rated_problems(metrics.timed_iter(items, 'json decode'), min_rating, max_rating)
@@ -0,0 +1,201 @@
+import argparse
+import base64
+import json
+import time
+import numpy as np
+import requests
+import cf_client
+import dataset_builder
+import metrics
+from journal import write_atomic
+from solved_proxy import DEFAULT_DATASET, DEFAULT_MIN_INTERVAL, DEFAULT_STORE_PATH, SolvedService, SolvedStore
+
+DEFAULT_OUTPUT = 'public/data/compare.json'
+COMPARE_VERSION = 1
+
+def solved_matrix(solved_sets, rows, count):
+    """Boolean users x problems matrix from one set of solved problemIds per user
+
+    `rows` maps problemIds (and mirror aliases) to dataset rows, see
+    dataset_builder.problem_rows; solves outside the dataset are ignored.
+    """
+    matrix = np.zeros((len(solved_sets), count), dtype=bool)
+    for user, solved in enumerate(solved_sets):
+        matrix[user, [rows[p] for p in solved if p in rows]] = True
+    return matrix
+
+def mask_bitset(mask):
+    """encode_bitset() of a boolean row mask, packed by NumPy instead of via a Python int"""
+    packed = np.packbits(mask, bitorder='little').tobytes()
+    return base64.b64encode(packed + bytes(-len(packed) % 4)).decode('ascii')
+
+def compare(matrix, ratings, exactly=(1,)):
+    """Group statistics of a users x problems solved matrix, all as whole-array operations
+
+    - solved / unique: problems each user solved, and solved by nobody else
+    - by_rating: users x ratings solve counts
+    - overlap: users x users count of problems solved by both
+    - solvers: how many users solved each problem, and its histogram
+    - nobody / exactly[k]: row masks of problems solved by 0 / exactly k users
+    The 0/1 products run in float32, which is exact far beyond 5k problems.
+    """
+    users, count = matrix.shape
+    rating_values, rating_codes = np.unique(np.asarray(ratings), return_inverse=True)
+    one_hot = np.zeros((count, len(rating_values)), dtype=np.float32)
+    one_hot[np.arange(count), rating_codes] = 1
+
+    as_float = matrix.astype(np.float32)
+    solvers = matrix.sum(axis=0)
+    nobody = solvers == 0
+    return {
+        'ratings': rating_values,
+        'problems_by_rating': np.bincount(rating_codes, minlength=len(rating_values)),
+        'solved': matrix.sum(axis=1),
+        'unique': matrix[:, solvers == 1].sum(axis=1),
+        'by_rating': np.rint(as_float @ one_hot).astype(np.int64),
+        'overlap': np.rint(as_float @ as_float.T).astype(np.int64),
+        'solvers': solvers,
+        'histogram': np.bincount(solvers, minlength=users + 1),
+        'nobody': nobody,
+        'nobody_by_rating': np.bincount(rating_codes[nobody], minlength=len(rating_values)),
+        'exactly': {k: solvers == k for k in exactly},
+    }
+
+def jaccard(overlap, solved):
+    union = solved[:, None] + solved[None, :] - overlap
+    return np.divide(overlap, union, out=np.zeros(overlap.shape), where=union > 0)
+
+def report_json(handles, stats, fingerprint):
+    """The comparison as JSON for the UI; problem sets are bitsets over problems.js rows"""
+    return {
+        'version': COMPARE_VERSION,
+        'dataset': fingerprint,
+        'rows': len(stats['solvers']),
+        'handles': handles,
+        'ratings': stats['ratings'].tolist(),
+        'problemsByRating': stats['problems_by_rating'].tolist(),
+        'users': [
+            {'handle': handle, 'solved': int(solved), 'unique': int(unique), 'byRating': by_rating}
+            for handle, solved, unique, by_rating in zip(
+                handles, stats['solved'], stats['unique'], stats['by_rating'].tolist())
+        ],
+        'overlap': stats['overlap'].tolist(),
+        'solverHistogram': stats['histogram'].tolist(),
+        'nobody': {
+            'count': int(stats['nobody'].sum()),
+            'byRating': stats['nobody_by_rating'].tolist(),
+            'bits': mask_bitset(stats['nobody']),
+        },
+        'exactly': {
+            str(k): {'count': int(mask.sum()), 'bits': mask_bitset(mask)}
+            for k, mask in stats['exactly'].items()
+        },
+    }
+
+def load_solved(handles, store, dataset_path=DEFAULT_DATASET, offline=False,
+                min_interval=DEFAULT_MIN_INTERVAL):
+    """(handles found, their solved sets), refreshed through solved_proxy's incremental store
+
+    With offline=True only the store is read; handles never checked before
+    are skipped.
+    """
+    service = SolvedService(store, dataset_path, min_interval)
+    progress = metrics.Progress(len(handles), every=10, label='handles')
+    found = []
+    solved_sets = []
+    for handle in handles:
+        if offline:
+            if store.state(handle.casefold())[1] is None:
+                print(f"  {handle}: not in the store, skipped (run once without --offline)")
+                continue
+            solved = store.solved(handle.casefold())
+        else:
+            try:
+                solved, _ = service.refresh(handle)
+            except (requests.RequestException, cf_client.APIError) as e:
+                print(f"  {handle}: {e}, skipped")
+                continue
+            progress.tick()
+        found.append(handle)
+        solved_sets.append(solved)
+    return found, solved_sets
+
+def read_handles(args):
+    handles = list(args.handles)
+    if args.handles_file:
+        with open(args.handles_file, 'r', encoding='utf-8') as f:
+            handles += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    # Codeforces handles are case-insensitive; keep the first spelling of each
+    unique = {}
+    for handle in handles:
+        unique.setdefault(handle.casefold(), handle)
+    return list(unique.values())
+
+def print_summary(handles, stats, seconds, top=5):
+    users, count = len(handles), len(stats['solvers'])
+    print(f"\nCompared {users} handles x {count} problems in {1000 * seconds:.1f} ms")
+    order = np.argsort(-stats['solved'], kind='stable')
+    for user in order[:top]:
+        print(f"  {handles[user]:24s} {stats['solved'][user]:5d} solved, {stats['unique'][user]:4d} by nobody else")
+    print(f"  solved by nobody: {int(stats['nobody'].sum())}")
+    for k, mask in stats['exactly'].items():
+        print(f"  solved by exactly {k}: {int(mask.sum())}")
+    if users > 1:
+        similarity = jaccard(stats['overlap'], stats['solved'])
+        first, second = np.triu_indices(users, k=1)
+        best = np.argsort(-similarity[first, second], kind='stable')[:top]
+        print("  most similar pairs:")
+        for i in best:
+            a, b = first[i], second[i]
+            print(f"    {handles[a]} / {handles[b]}: {stats['overlap'][a, b]} shared "
+                  f"(Jaccard {similarity[a, b]:.2f})")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compare the solved problems of a group of handles')
+    parser.add_argument('handles', nargs='*', help='Codeforces handles')
+    parser.add_argument('--handles-file', help='file with one handle per line (# starts a comment)')
+    parser.add_argument('--dataset', default=DEFAULT_DATASET,
+                        help=f'problems.js to compare over (default: {DEFAULT_DATASET})')
+    parser.add_argument('--store-path', default=DEFAULT_STORE_PATH,
+                        help=f'solved-set store shared with solved_proxy.py (default: {DEFAULT_STORE_PATH})')
+    parser.add_argument('--offline', action='store_true',
+                        help='use stored solved sets only, without calling Codeforces')
+    parser.add_argument('--min-interval', type=float, default=DEFAULT_MIN_INTERVAL,
+                        help='reuse solved sets checked this many seconds ago '
+                             f'(default: {DEFAULT_MIN_INTERVAL})')
+    parser.add_argument('--exactly', type=int, nargs='+', default=[1],
+                        help='also report problems solved by exactly these numbers of users (default: 1)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT,
+                        help=f'JSON report for the UI (default: {DEFAULT_OUTPUT})')
+    args = parser.parse_args()
+    if not args.handles and not args.handles_file:
+        parser.error('give handles or --handles-file')
+    return args
+
+def main():
+    args = parse_args()
+    handles = read_handles(args)
+    problems = dataset_builder.load_problems_js(args.dataset)
+
+    store = SolvedStore(args.store_path)
+    try:
+        print(f"Loading solved problems of {len(handles)} handles...")
+        handles, solved_sets = load_solved(handles, store, args.dataset, args.offline, args.min_interval)
+    finally:
+        store.close()
+    if not handles:
+        print("No handles to compare")
+        return
+
+    start = time.perf_counter()
+    matrix = solved_matrix(solved_sets, dataset_builder.problem_rows(problems), len(problems))
+    stats = compare(matrix, [p['rating'] for p in problems], args.exactly)
+    seconds = time.perf_counter() - start
+
+    report = report_json(handles, stats, dataset_builder.dataset_fingerprint(problems))
+    write_atomic(args.output, json.dumps(report, separators=(',', ':')) + '\n')
+    print_summary(handles, stats, seconds)
+    print(f"\nReport written to {args.output}")
+
+if __name__ == "__main__":
+    main()
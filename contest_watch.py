@@ -0,0 +1,207 @@
+import os
+import sqlite3
+import time
+import cf_client
+import dataset_builder
+import mirrors
+
+DEFAULT_STATE_PATH = '.cache/contest_watch.sqlite'
+DEFAULT_INTERVAL = 300  # seconds between contest.list polls
+# Rating range of the dataset (fetch_problems.py)
+MIN_RATING = 1600
+MAX_RATING = 3000
+# Ratings usually appear a day or two after a contest; contests still
+# unrated after this long (or already this old when first seen) are dropped
+MAX_WAIT_DAYS = 14
+# Contest statuses: already in the dataset when first seen, waiting for
+# ratings, patched into the dataset, or given up on
+COVERED, PENDING, INGESTED, EXPIRED = 'covered', 'pending', 'ingested', 'expired'
+
+class ContestState:
+    """On-disk record of every finished contest the watcher has seen and what became of it"""
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS contests ('
+            ' contest_id INTEGER PRIMARY KEY,'
+            ' status TEXT NOT NULL,'
+            ' finished_at REAL NOT NULL,'
+            ' problems INTEGER NOT NULL DEFAULT 0,'
+            ' updated_at REAL NOT NULL)'
+        )
+        self.conn.commit()
+
+    def known(self):
+        return {contest_id for (contest_id,) in self.conn.execute('SELECT contest_id FROM contests')}
+
+    def pending(self):
+        """{contestId: finished_at} of contests still waiting for ratings"""
+        return dict(self.conn.execute('SELECT contest_id, finished_at FROM contests WHERE status = ?',
+                                      (PENDING,)))
+
+    def counts(self):
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM contests GROUP BY status'))
+
+    def add(self, contests):
+        """Record newly seen contests as [(contestId, status, finished_at)]"""
+        now = time.time()
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO contests (contest_id, status, finished_at, updated_at) VALUES (?, ?, ?, ?)',
+            [(contest_id, status, finished_at, now) for contest_id, status, finished_at in contests]
+        )
+        self.conn.commit()
+
+    def mark(self, problem_counts, status):
+        """Move contests to `status`, given as {contestId: problems ingested}"""
+        now = time.time()
+        self.conn.executemany(
+            'UPDATE contests SET status = ?, problems = ?, updated_at = ? WHERE contest_id = ?',
+            [(status, count, now, contest_id) for contest_id, count in problem_counts.items()]
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+def finished_contests():
+    """[contest] from contest.list that are over, with their end time as 'finishedAt'
+
+    finishedAt is None for a contest listed without startTimeSeconds.
+    """
+    data = cf_client.get_api('contest.list')
+    if data.get('status') != 'OK':
+        raise cf_client.APIError(data.get('comment') or data.get('status'))
+    contests = []
+    for contest in data['result']:
+        if contest.get('phase') == 'FINISHED':
+            finished_at = None
+            if 'startTimeSeconds' in contest:
+                finished_at = contest['startTimeSeconds'] + contest.get('durationSeconds', 0)
+            contests.append(dict(contest, finishedAt=finished_at))
+    return contests
+
+def contest_problems(contest_id, bucket=None, timeout=30):
+    """A contest's problems from a one-row contest.standings page, with 'rating' once assigned"""
+    if bucket is not None:
+        bucket.acquire()
+    response = cf_client.get(cf_client.api_url('contest.standings'), timeout=timeout,
+                             params={'contestId': contest_id, 'from': 1, 'count': 1})
+    try:
+        data = response.json()
+    except ValueError:
+        raise cf_client.APIError(f'contest.standings answered HTTP {response.status_code}')
+    if data.get('status') != 'OK':
+        raise cf_client.APIError(data.get('comment') or f'contest.standings answered HTTP {response.status_code}')
+    return data['result']['problems']
+
+def contest_of(problem_id):
+    return int(dataset_builder.PROBLEM_ID_RE.match(problem_id).group(1))
+
+def dataset_contests(problems):
+    """Contest ids with a problem (or a mirror alias) in the dataset"""
+    return {
+        contest_of(problem_id)
+        for problem in problems
+        for problem_id in [problem['problemId'], *problem.get('aliases', [])]
+    }
+
+def record_new_contests(state, contests, covered):
+    """Add contests the state has not seen yet
+
+    Contests with problems in the dataset are already covered by the full
+    fetch it came from, and contests that ended more than MAX_WAIT_DAYS
+    ago would never be waited for; everything else starts out pending. A
+    contest without a known end time is waited for from when it is first
+    seen. Returns the newly pending contest ids.
+    """
+    known = state.known()
+    now = time.time()
+    cutoff = now - MAX_WAIT_DAYS * 24 * 60 * 60
+    new = []
+    for contest in contests:
+        if contest['id'] in known:
+            continue
+        finished_at = contest['finishedAt'] if contest['finishedAt'] is not None else now
+        if contest['id'] in covered:
+            status = COVERED
+        elif finished_at < cutoff:
+            status = EXPIRED
+        else:
+            status = PENDING
+        new.append((contest['id'], status, finished_at))
+    state.add(new)
+    return [contest_id for contest_id, status, _ in new if status == PENDING]
+
+def rated_contests(state, bucket=None):
+    """Pending contests whose problems all have ratings now
+
+    Each pending contest costs one small contest.standings call. Contests
+    that ran out of time are marked expired. Returns {contestId: problemIds
+    rated in the dataset's range}.
+    """
+    cutoff = time.time() - MAX_WAIT_DAYS * 24 * 60 * 60
+    expired = {}
+    ready = {}
+    for contest_id, finished_at in sorted(state.pending().items()):
+        if finished_at < cutoff:
+            expired[contest_id] = 0
+            continue
+        try:
+            problems = contest_problems(contest_id, bucket)
+        except Exception as e:
+            print(f"  contest {contest_id}: standings unavailable ({e}), will retry")
+            continue
+        if problems and all('rating' in p for p in problems):
+            ready[contest_id] = {
+                mirrors.problem_id(p) for p in problems
+                if MIN_RATING <= p['rating'] <= MAX_RATING
+            }
+    if expired:
+        print(f"  {len(expired)} contests still unrated after {MAX_WAIT_DAYS} days, no longer watched")
+        state.mark(expired, EXPIRED)
+    return ready
+
+class ContestPoll:
+    """What one poll found: contests ready to ingest and the problemset entries for them"""
+
+    def __init__(self, new=(), ready=None, problems=(), stats=None, rounds=None):
+        self.new = list(new)
+        self.ready = ready or {}
+        self.problems = list(problems)
+        self.stats = stats or {}
+        self.rounds = rounds
+
+def poll(state, covered, bucket=None):
+    """Check contest.list once and collect newly rated contests
+
+    `covered` is the set of contest ids the dataset already has. Only when
+    some pending contest is fully rated is problemset.problems downloaded
+    (for the problems' tags and solve counts); a rated contest whose
+    problems are not in the problemset yet stays pending for the next poll.
+    """
+    if bucket is not None:
+        bucket.acquire()
+    contests = finished_contests()
+    new = record_new_contests(state, contests, covered)
+    ready = rated_contests(state, bucket)
+    if not ready:
+        return ContestPoll(new)
+
+    wanted = set().union(*ready.values())
+    problems, stats = cf_client.load_rated_problems(MIN_RATING, MAX_RATING)
+    problems = [p for p in problems if mirrors.problem_id(p) in wanted]
+    found = {mirrors.problem_id(p) for p in problems}
+    for contest_id, problem_ids in list(ready.items()):
+        if not problem_ids <= found:
+            print(f"  contest {contest_id}: rated, but not in problemset.problems yet")
+            del ready[contest_id]
+    problems = [p for p in problems if p['contestId'] in ready]
+    return ContestPoll(new, ready, problems, {pid: stats[pid] for pid in found if pid in stats},
+                       mirrors.contest_rounds(contests))
@@ -1,9 +1,18 @@
 import re
-import json
+import csv
+import argparse
+from itertools import islice
+import dataset_builder
+from journal import write_atomic
+
+DEFAULT_INPUT = 'src/problems_raw.csv'
+DEFAULT_OUTPUT = 'src/problems.js'
+BATCH_SIZE = 4096
+HYPERLINK_RE = re.compile(r'https://codeforces\.com/contest/(\d+)/problem/([A-Z]\d*)')
 
 def parse_hyperlink(hyperlink_str):
     """Extract URL and problem ID from HYPERLINK formula"""
-    match = re.search(r'https://codeforces\.com/contest/(\d+)/problem/([A-Z]\d*)', hyperlink_str)
+    match = HYPERLINK_RE.search(hyperlink_str)
     if match:
         contest_id, problem_letter = match.groups()
         problem_id = f"{contest_id}{problem_letter}"
@@ -11,91 +20,89 @@ def parse_hyperlink(hyperlink_str):
         return url, problem_id
     return "", ""
 
-def parse_csv_line(line):
-    """Parse a single CSV line handling quoted fields"""
-    # Remove trailing \r
-    line = line.strip().rstrip('\r')
-    
-    # Split by comma, but respect quoted fields
-    parts = []
-    current = ""
-    in_quotes = False
-    
-    i = 0
-    while i < len(line):
-        char = line[i]
-        
-        if char == '"':
-            if i + 1 < len(line) and line[i + 1] == '"':
-                # Double quote escape
-                current += '"'
-                i += 2
-                continue
-            else:
-                in_quotes = not in_quotes
-                i += 1
-                continue
-        
-        if char == ',' and not in_quotes:
-            parts.append(current)
-            current = ""
-            i += 1
-            continue
-        
-        current += char
-        i += 1
-    
-    parts.append(current)
-    
-    if len(parts) >= 6:
-        name = parts[0]
-        rating = parts[1]
-        tags = parts[2]
-        solve_count = parts[3]
-        length = parts[4]
-        hyperlink = parts[5]
-        
-        url, problem_id = parse_hyperlink(hyperlink)
-        
-        # Clean up tags
-        if tags:
-            tags_list = [tag.strip() for tag in tags.split(',')]
-        else:
-            tags_list = []
-        
-        return {
+def _int_column(column):
+    return [int(value) if value else 0 for value in column]
+
+def _tags_column(column):
+    return [[tag.strip() for tag in tags.split(',')] if tags else [] for tags in column]
+
+def convert_batch(rows):
+    """Turn a batch of CSV rows into problem dicts, one column at a time
+
+    Rows are name, rating, tags, solveCount, length, =HYPERLINK(...);
+    rows with fewer than six fields are skipped and extra fields ignored.
+    """
+    rows = [row for row in rows if len(row) >= 6]
+    if not rows:
+        return []
+    names, ratings, tags, solve_counts, lengths, links = list(zip(*rows))[:6]
+    links = [parse_hyperlink(link) for link in links]
+    return [
+        {
             'name': name,
-            'rating': int(rating) if rating else 0,
-            'tags': tags_list,
-            'solveCount': int(solve_count) if solve_count else 0,
-            'length': int(length) if length else 0,
+            'rating': rating,
+            'tags': tag_list,
+            'solveCount': solve_count,
+            'length': length,
             'link': url,
-            'problemId': problem_id
+            'problemId': problem_id,
         }
-    
-    return None
+        for name, rating, tag_list, solve_count, length, (url, problem_id) in zip(
+            names, _int_column(ratings), _tags_column(tags),
+            _int_column(solve_counts), _int_column(lengths), links)
+    ]
+
+def iter_problem_batches(path, batch_size=BATCH_SIZE):
+    """Stream the CSV in batches of converted problems
+
+    Only `batch_size` rows are held at a time, so memory does not grow
+    with the size of the input file.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        while True:
+            rows = list(islice(reader, batch_size))
+            if not rows:
+                return
+            yield convert_batch(rows)
+
+def read_problems(path, min_rating=1600, max_rating=3000, batch_size=BATCH_SIZE):
+    """Problems in the rating range, in file order"""
+    problems = []
+    for batch in iter_problem_batches(path, batch_size):
+        problems.extend(p for p in batch if min_rating <= p['rating'] <= max_rating)
+    return problems
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Convert problems_raw.csv into src/problems.js')
+    parser.add_argument('--input', default=DEFAULT_INPUT,
+                        help=f'CSV export to read (default: {DEFAULT_INPUT})')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT,
+                        help=f'problems.js to write (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--format', choices=dataset_builder.OUTPUT_FORMATS, default='json',
+                        help='problems.js layout (default: json)')
+    dataset_builder.add_output_arguments(parser)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    problems = read_problems(args.input)
 
-# Read the CSV file
-with open('/Users/md.monowarjahansaif/Downloads/CP/Mock_P/cf-tracker/src/problems_raw.csv', 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+    # Sort by length (ascending), ties by problemId so the output is reproducible
+    dataset_builder.sort_problems(problems)
 
-problems = []
-for line in lines:
-    problem = parse_csv_line(line)
-    if problem and problem['rating'] >= 1600 and problem['rating'] <= 3000:
-        problems.append(problem)
+    print(f"Total problems parsed: {len(problems)}")
+    print(f"Sorted by length (ascending)")
 
-# Sort by length (ascending)
-problems.sort(key=lambda x: x['length'])
+    # Write JavaScript file
+    content = dataset_builder.render_problems_js(
+        problems, dataset_builder.header_lines(problems, 'Problem data extracted from Codeforces'), args.format)
+    write_atomic(args.output, content)
 
-print(f"Total problems parsed: {len(problems)}")
-print(f"Sorted by length (ascending)")
+    print(f"Written {len(problems)} problems to {args.output}")
 
-# Write JavaScript file
-with open('/Users/md.monowarjahansaif/Downloads/CP/Mock_P/cf-tracker/src/problems.js', 'w', encoding='utf-8') as f:
-    f.write('// Problem data extracted from Codeforces\n')
-    f.write('export const problems = ')
-    f.write(json.dumps(problems, indent=2))
-    f.write(';\n')
+    dataset_builder.write_outputs(problems, args)
 
-print(f"Written {len(problems)} problems to problems.js")
+if __name__ == "__main__":
+    main()
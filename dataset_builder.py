@@ -0,0 +1,584 @@
+import base64
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from journal import write_atomic
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPACT_VERSION = 1
+OUTPUT_FORMATS = ['json', 'compact']
+PROBLEM_ID_RE = re.compile(r'(\d+)(.*)')
+JS_ESCAPE_RE = re.compile(r'\\(.)', re.S)
+
+def problem_link(problem_id):
+    """Rebuild the problem URL from its problemId (e.g. 1927F -> .../contest/1927/problem/F)"""
+    contest_id, index = PROBLEM_ID_RE.match(problem_id).groups()
+    return f"https://codeforces.com/contest/{contest_id}/problem/{index}"
+
+def load_problems_js(path='src/problems.js'):
+    """Read the problem list back out of a generated problems.js (either format)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    if 'decodeProblems(JSON.parse(' in content:
+        start = content.index("JSON.parse('") + len("JSON.parse('")
+        literal = content[start:content.rindex("'))")]
+        return decode_compact(json.loads(JS_ESCAPE_RE.sub(r'\1', literal)))
+    start = content.index('export const problems = ') + len('export const problems = ')
+    return json.loads(content[start:content.rindex(';')])
+
+def problem_order_key(problem):
+    """Dataset order: by length, ties broken by contest id and index so every build sorts identically"""
+    contest_id, index = PROBLEM_ID_RE.match(problem['problemId']).groups()
+    return problem['length'], int(contest_id), index
+
+def sort_problems(problems):
+    problems.sort(key=problem_order_key)
+    return problems
+
+def merge_problems(problems, updates):
+    """Dataset with `updates` added, replacing any problem they share a problemId or alias with, sorted"""
+    replaced = {problem_id for p in updates for problem_id in [p['problemId'], *p.get('aliases', [])]}
+    merged = [p for p in problems
+              if p['problemId'] not in replaced and replaced.isdisjoint(p.get('aliases', []))]
+    return sort_problems(merged + list(updates))
+
+def header_lines(problems, source='Problem data extracted from Codeforces API'):
+    """Comment lines for the top of problems.js; no timestamp, so unchanged data gives identical bytes"""
+    return [source, f'Version: {dataset_version(problems)}', f'Total problems: {len(problems)}']
+
+def release_record(problem):
+    """A problem without its derived fields (the link is rebuilt from problemId)"""
+    return {key: value for key, value in problem.items() if key != 'link'}
+
+def dataset_version(problems):
+    """Content hash of a dataset: 16 hex digits of sha256 over its records, in order
+
+    Key order and the link format do not matter, so the same data always
+    gets the same version whichever script or output format produced it.
+    """
+    canonical = json.dumps([release_record(p) for p in problems], sort_keys=True,
+                           ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+def problem_rows(problems):
+    """{problemId: row} over the dataset order, with mirror aliases mapped to their representative's row"""
+    rows = {}
+    for row, problem in enumerate(problems):
+        rows[problem['problemId']] = row
+        for alias in problem.get('aliases', []):
+            rows[alias] = row
+    return rows
+
+def dataset_fingerprint(problems):
+    """32-bit FNV-1a of the comma-joined problemIds, as 8 hex digits
+
+    Identifies a dataset order; datasetFingerprint in src/problemsCodec.js
+    computes the same value so a bitset sent by solved_proxy.py can be
+    checked against the problems.js the app was built with.
+    """
+    h = 0x811c9dc5
+    for byte in ','.join(p['problemId'] for p in problems).encode('utf-8'):
+        h = ((h ^ byte) * 0x01000193) & 0xffffffff
+    return f'{h:08x}'
+
+def encode_compact(problems):
+    """Encode problems as columns with an interned tag dictionary
+
+    Every key name appears once, each tag string is stored once and
+    referenced by integer id, and links are dropped because they can be
+    rebuilt from problemId. Mirror aliases are rare, so they are stored
+    sparsely as {row: [problemIds]}.
+    """
+    tags = sorted({tag for p in problems for tag in p['tags']})
+    tag_ids = {tag: i for i, tag in enumerate(tags)}
+    data = {
+        'version': COMPACT_VERSION,
+        'tags': tags,
+        'name': [p['name'] for p in problems],
+        'rating': [p['rating'] for p in problems],
+        'tagIds': [[tag_ids[tag] for tag in p['tags']] for p in problems],
+        'solveCount': [p['solveCount'] for p in problems],
+        'length': [p['length'] for p in problems],
+        'problemId': [p['problemId'] for p in problems],
+    }
+    aliases = {str(i): p['aliases'] for i, p in enumerate(problems) if p.get('aliases')}
+    if aliases:
+        data['aliases'] = aliases
+    return data
+
+def decode_compact(data):
+    """Rebuild the problem objects App.jsx expects (mirror of src/problemsCodec.js)"""
+    tags = data['tags']
+    problems = [
+        {
+            'name': data['name'][i],
+            'rating': data['rating'][i],
+            'tags': [tags[t] for t in data['tagIds'][i]],
+            'solveCount': data['solveCount'][i],
+            'length': data['length'][i],
+            'link': problem_link(problem_id),
+            'problemId': problem_id,
+        }
+        for i, problem_id in enumerate(data['problemId'])
+    ]
+    for row, aliases in data.get('aliases', {}).items():
+        problems[int(row)]['aliases'] = aliases
+    return problems
+
+def _dump_json(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+def _js_string(text):
+    """Quote text as a single-quoted JS string literal"""
+    return "'" + text.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+def render_problems_js(problems, header_lines, output_format='json'):
+    """Return the source of src/problems.js in the requested format
+
+    'json' is the original pretty-printed array literal. 'compact' stores the
+    columnar encoding inside JSON.parse('...'), which engines parse much
+    faster than an object literal, and decodes it with src/problemsCodec.js,
+    so `import { problems } from './problems.js'` keeps working unchanged.
+    """
+    header = ''.join(f'// {line}\n' for line in header_lines)
+    if output_format == 'compact':
+        payload = _dump_json(encode_compact(problems))
+        return (header
+                + "import { decodeProblems } from './problemsCodec.js';\n"
+                + f"export const problems = decodeProblems(JSON.parse({_js_string(payload)}));\n")
+    return (header
+            + 'export const problems = '
+            + json.dumps(problems, indent=2, ensure_ascii=False)
+            + ';\n')
+
+DEFAULT_SHARD_DIR = 'public/data/problems'
+
+def write_rating_shards(problems, out_dir=DEFAULT_SHARD_DIR, bucket_size=100):
+    """Write one compact shard per rating bucket plus a manifest.json
+
+    Each shard keeps the dataset order and uses the compact encoding
+    (decode with decodeProblems from src/problemsCodec.js). The manifest
+    lists every shard with its rating range, problem count, tag list and
+    sha256, so a client can fetch only the bucket it is filtering on.
+    Shards are written before the manifest, and shards no longer listed are
+    removed afterwards, so the manifest never points at a missing file.
+    Returns the manifest.
+    """
+    buckets = {}
+    for problem in problems:
+        low = problem['rating'] // bucket_size * bucket_size
+        buckets.setdefault(low, []).append(problem)
+
+    shards = []
+    for low in sorted(buckets):
+        bucket = buckets[low]
+        data = _dump_json(encode_compact(bucket)).encode('utf-8')
+        name = f'rating-{low}.json' if bucket_size == 100 else f'rating-{low}-{low + bucket_size - 1}.json'
+        write_atomic(os.path.join(out_dir, name), data)
+        shards.append({
+            'file': name,
+            'minRating': low,
+            'maxRating': low + bucket_size - 1,
+            'count': len(bucket),
+            'tags': sorted({tag for p in bucket for tag in p['tags']}),
+            'bytes': len(data),
+            'sha256': hashlib.sha256(data).hexdigest(),
+        })
+
+    manifest = {
+        'version': COMPACT_VERSION,
+        'total': len(problems),
+        'bucketSize': bucket_size,
+        'shards': shards,
+    }
+    write_atomic(os.path.join(out_dir, 'manifest.json'), json.dumps(manifest, indent=2) + '\n')
+
+    listed = {shard['file'] for shard in shards}
+    for name in os.listdir(out_dir):
+        if name.startswith('rating-') and name.endswith('.json') and name not in listed:
+            os.remove(os.path.join(out_dir, name))
+
+    return manifest
+
+def print_shard_summary(manifest, out_dir=DEFAULT_SHARD_DIR):
+    largest = max((s['bytes'] for s in manifest['shards']), default=0)
+    total = sum(s['bytes'] for s in manifest['shards'])
+    print(f"Written {len(manifest['shards'])} rating shards to {out_dir} "
+          f"({total / 1024:.0f} KiB total, largest {largest / 1024:.0f} KiB)")
+
+INDEX_ORDER_KEYS = ['length', 'solveCount', 'rating']
+
+def encode_bitset(bits, count):
+    """Serialise an int bitset over `count` problems as base64 of 32-bit little-endian words"""
+    size = (count + 31) // 32 * 4
+    return base64.b64encode(bits.to_bytes(size, 'little')).decode('ascii')
+
+def decode_bitset(text):
+    return int.from_bytes(base64.b64decode(text), 'little')
+
+def build_filter_index(problems):
+    """Precompute the filter structures App.jsx otherwise rebuilds every render
+
+    Positions refer to the order of `problems` (i.e. problems.js):
+    - tags / tagBits: sorted tag vocabulary and one bitset per tag
+    - ratings / ratingBits: sorted ratings and one bitset per rating
+    - order: ascending permutations by length, solveCount and rating
+    - dataset: dataset_fingerprint, so the app ignores an index built for
+      another problems.js
+    Filtering by rating and tags is then an AND over a few bitsets.
+    """
+    tag_bits = {}
+    rating_bits = {}
+    for i, problem in enumerate(problems):
+        bit = 1 << i
+        rating_bits[problem['rating']] = rating_bits.get(problem['rating'], 0) | bit
+        for tag in problem['tags']:
+            tag_bits[tag] = tag_bits.get(tag, 0) | bit
+
+    count = len(problems)
+    tags = sorted(tag_bits)
+    ratings = sorted(rating_bits)
+    return {
+        'version': COMPACT_VERSION,
+        'dataset': dataset_fingerprint(problems),
+        'count': count,
+        'tags': tags,
+        'tagBits': [encode_bitset(tag_bits[tag], count) for tag in tags],
+        'ratings': ratings,
+        'ratingBits': [encode_bitset(rating_bits[rating], count) for rating in ratings],
+        'order': {
+            key: sorted(range(count), key=lambda i: problems[i][key])
+            for key in INDEX_ORDER_KEYS
+        },
+    }
+
+def decode_filter_index(index):
+    """Decode every bitset once into ints (mirror of createFilterIndex in src/filterIndex.js)"""
+    return {
+        'count': index['count'],
+        'tags': dict(zip(index['tags'], map(decode_bitset, index['tagBits']))),
+        'ratings': dict(zip(index['ratings'], map(decode_bitset, index['ratingBits']))),
+        'order': index['order'],
+    }
+
+def query_filter_index(decoded, rating=None, tags=()):
+    """Return the bitset of problems matching a rating (if given) and every tag"""
+    bits = (1 << decoded['count']) - 1
+    if rating is not None:
+        bits &= decoded['ratings'].get(rating, 0)
+    for tag in tags:
+        bits &= decoded['tags'].get(tag, 0)
+    return bits
+
+def bitset_positions(bits):
+    """Ascending positions of the set bits"""
+    digits = bin(bits)[:1:-1]  # least significant bit first, '0b' dropped
+    positions = []
+    i = digits.find('1')
+    while i >= 0:
+        positions.append(i)
+        i = digits.find('1', i + 1)
+    return positions
+
+def render_filter_index_js(index):
+    """Source of src/problemIndex.js (query it with src/filterIndex.js)"""
+    return ('// Filter index for src/problems.js, generated by dataset_builder.py\n'
+            f'export const problemIndex = JSON.parse({_js_string(_dump_json(index))});\n')
+
+DEFAULT_INDEX_PATH = 'src/problemIndex.js'
+
+def write_filter_index(problems, path=DEFAULT_INDEX_PATH):
+    """Build the filter index for `problems` (in problems.js order) and write it as a JS module"""
+    index = build_filter_index(problems)
+    source = render_filter_index_js(index)
+    write_atomic(path, source)
+    print(f"Written filter index to {path} ({len(index['tags'])} tags, "
+          f"{len(index['ratings'])} ratings, {len(source.encode('utf-8')) / 1024:.0f} KiB)")
+    return index
+
+SEARCH_TOKEN_RE = re.compile(r'[0-9a-z]+')
+
+def search_tokens(text):
+    """Lowercase, strip accents, split into [0-9a-z] runs (mirror of searchTokens in src/problemSearch.js)"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return SEARCH_TOKEN_RE.findall(''.join(c for c in decomposed if not unicodedata.category(c).startswith('M')))
+
+def problem_search_tokens(problem):
+    """Distinct tokens of a problem's name, problemId, mirror aliases and tags"""
+    fields = [problem['name'], problem['problemId'], *problem.get('aliases', ()), *problem['tags']]
+    return set(search_tokens(' '.join(fields)))
+
+def trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+def encode_postings(positions):
+    """Ascending positions as base64 of varint-coded gaps (one byte for gaps below 128)"""
+    out = bytearray()
+    previous = 0
+    for position in positions:
+        gap = position - previous
+        previous = position
+        while gap >= 0x80:
+            out.append(gap & 0x7f | 0x80)
+            gap >>= 7
+        out.append(gap)
+    return base64.b64encode(bytes(out)).decode('ascii')
+
+def decode_postings(text):
+    positions = []
+    position = gap = shift = 0
+    for byte in base64.b64decode(text):
+        gap |= (byte & 0x7f) << shift
+        shift += 7
+        if byte < 0x80:
+            position += gap
+            positions.append(position)
+            gap = shift = 0
+    return positions
+
+def build_search_index(problems):
+    """Postings for looking problems up by name, problemId or tag as the user types
+
+    Positions refer to the order of `problems` (i.e. problems.js):
+    - tokens / postings: the sorted vocabulary of name, problemId, alias and
+      tag tokens, and the problems containing each token
+    - trigrams / trigramTokens: every 3-character substring of a token and
+      the vocabulary ids of the tokens containing it
+    A term of 3+ characters finds its tokens by intersecting trigram lists
+    (then checks them, since a token may hold the trigrams apart); a
+    shorter term is a range of the sorted vocabulary. Either way the
+    matching problems are the union of those tokens' postings.
+    All lists are encode_postings() strings, decoded lazily per lookup.
+    dataset is the dataset_fingerprint the positions belong to.
+    """
+    token_postings = {}
+    for i, problem in enumerate(problems):
+        for token in problem_search_tokens(problem):
+            token_postings.setdefault(token, []).append(i)
+    tokens = sorted(token_postings)
+
+    trigram_tokens = {}
+    for token_id, token in enumerate(tokens):
+        for gram in trigrams(token):
+            trigram_tokens.setdefault(gram, []).append(token_id)
+    grams = sorted(trigram_tokens)
+    return {
+        'version': COMPACT_VERSION,
+        'count': len(problems),
+        'dataset': dataset_fingerprint(problems),
+        'tokens': tokens,
+        'postings': [encode_postings(token_postings[token]) for token in tokens],
+        'trigrams': grams,
+        'trigramTokens': [encode_postings(trigram_tokens[gram]) for gram in grams],
+    }
+
+def decode_search_index(index):
+    """Decode every list once (src/problemSearch.js decodes them lazily instead)"""
+    return {
+        'count': index['count'],
+        'tokens': index['tokens'],
+        'postings': [decode_postings(p) for p in index['postings']],
+        'trigrams': dict(zip(index['trigrams'], map(decode_postings, index['trigramTokens']))),
+    }
+
+def search_term_tokens(decoded, term):
+    """Vocabulary ids of the tokens a term matches: containing it (3+
+    characters, e.g. 'perm' -> 'permutation', '1927' -> '1927f') or
+    starting with it (shorter terms)"""
+    tokens = decoded['tokens']
+    if len(term) < 3:
+        start = bisect.bisect_left(tokens, term)
+        end = start
+        while end < len(tokens) and tokens[end].startswith(term):
+            end += 1
+        return range(start, end)
+    lists = sorted((decoded['trigrams'].get(gram, ()) for gram in trigrams(term)), key=len)
+    found = set(lists[0]).intersection(*lists[1:])
+    return [token_id for token_id in sorted(found) if term in tokens[token_id]]
+
+def query_search_index(decoded, query):
+    """Ascending positions of the problems matching every term of `query`"""
+    terms = set(search_tokens(query))
+    if not terms:
+        return list(range(decoded['count']))
+    matches = None
+    for term in sorted(terms, key=len, reverse=True):
+        found = set()
+        for token_id in search_term_tokens(decoded, term):
+            found.update(decoded['postings'][token_id])
+        matches = found if matches is None else matches & found
+        if not matches:
+            return []
+    return sorted(matches)
+
+def render_search_index_js(index):
+    """Source of src/searchIndex.js (query it with src/problemSearch.js)"""
+    return ('// Search index for src/problems.js, generated by dataset_builder.py\n'
+            f'export const searchIndex = JSON.parse({_js_string(_dump_json(index))});\n')
+
+DEFAULT_SEARCH_INDEX_PATH = 'src/searchIndex.js'
+# Written by recommender.write_neighbours, which needs NumPy
+DEFAULT_NEIGHBOURS_PATH = 'src/problemNeighbours.js'
+
+def write_search_index(problems, path=DEFAULT_SEARCH_INDEX_PATH):
+    """Build the search index for `problems` (in problems.js order) and write it as a JS module"""
+    index = build_search_index(problems)
+    source = render_search_index_js(index).encode('utf-8')
+    write_atomic(path, source)
+    postings = sum(len(base64.b64decode(p)) for p in index['postings'] + index['trigramTokens'])
+    print(f"Written search index to {path} ({len(index['tokens'])} tokens, "
+          f"{len(index['trigrams'])} trigrams, {postings / 1024:.0f} KiB of postings; "
+          f"{len(source) / 1024:.0f} KiB, {len(gzip.compress(source)) / 1024:.0f} KiB gzipped)")
+    return index
+
+def write_neighbours(problems, path=DEFAULT_NEIGHBOURS_PATH):
+    """recommender.write_neighbours, skipped with a note when NumPy is not installed"""
+    try:
+        import recommender
+    except ImportError:
+        print("numpy is not installed, skipping problem neighbours (pip install numpy)")
+        return None
+    return recommender.write_neighbours(problems, path)
+
+DEFAULT_ARTIFACT_DIR = 'public/data/dataset'
+ARTIFACT_MANIFEST = 'current.json'
+
+def precompress(data):
+    """{suffix: bytes} of the precompressed variants static hosts can serve as-is
+
+    gzip is written with mtime 0 so the same input always gives the same
+    bytes; brotli (quality 11) needs the brotli package and is skipped
+    without it.
+    """
+    variants = {'gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    return variants
+
+def write_artifact(name, data, out_dir=DEFAULT_ARTIFACT_DIR):
+    """Write data as <name>.<hash>.json plus .gz/.br siblings; returns its manifest entry
+
+    The file name carries the first 12 hex digits of the content's sha256,
+    so a file that already exists is never rewritten.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    entry = {'file': f'{name}.{digest[:12]}.json', 'sha256': digest, 'bytes': len(data), 'encodings': {}}
+    path = os.path.join(out_dir, entry['file'])
+    if not os.path.exists(path):
+        write_atomic(path, data)
+    for suffix, compressed in precompress(data).items():
+        variant = entry['file'] + '.' + suffix
+        if not os.path.exists(os.path.join(out_dir, variant)):
+            write_atomic(os.path.join(out_dir, variant), compressed)
+        entry['encodings']['gzip' if suffix == 'gz' else suffix] = {'file': variant, 'bytes': len(compressed)}
+    return entry
+
+def _artifact_files(manifest):
+    return {name for entry in manifest.get('artifacts', {}).values()
+            for name in [entry['file']] + [e['file'] for e in entry['encodings'].values()]}
+
+def write_dataset_artifacts(problems, out_dir=DEFAULT_ARTIFACT_DIR, with_index=False, with_search=False):
+    """Write the dataset (and optionally its filter and search indexes) as content-addressed files
+
+    problems.<hash>.json holds the compact encoding (decode with
+    decodeProblems), problemIndex.<hash>.json the filter index and
+    searchIndex.<hash>.json the search index. current.json
+    names the files of the current dataset; it is the only file that must
+    not be cached for long, everything else can be served immutable.
+    Files of the previous manifest are kept, so pages loaded before a
+    refresh can still fetch theirs; older ones are removed.
+    Returns the manifest.
+    """
+    manifest_path = os.path.join(out_dir, ARTIFACT_MANIFEST)
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+
+    artifacts = {'problems': write_artifact('problems', _dump_json(encode_compact(problems)).encode('utf-8'),
+                                            out_dir)}
+    if with_index:
+        artifacts['problemIndex'] = write_artifact(
+            'problemIndex', _dump_json(build_filter_index(problems)).encode('utf-8'), out_dir)
+    if with_search:
+        artifacts['searchIndex'] = write_artifact(
+            'searchIndex', _dump_json(build_search_index(problems)).encode('utf-8'), out_dir)
+    manifest = {
+        'version': COMPACT_VERSION,
+        'dataset': dataset_version(problems),
+        'count': len(problems),
+        'artifacts': artifacts,
+    }
+    write_atomic(manifest_path, json.dumps(manifest, indent=2) + '\n')
+
+    keep = _artifact_files(manifest) | _artifact_files(previous) | {ARTIFACT_MANIFEST}
+    for name in os.listdir(out_dir):
+        if name not in keep and name.endswith(('.json', '.json.gz', '.json.br')):
+            os.remove(os.path.join(out_dir, name))
+    return manifest
+
+def print_artifact_summary(manifest, out_dir=DEFAULT_ARTIFACT_DIR):
+    for entry in manifest['artifacts'].values():
+        sizes = ', '.join(f"{encoding} {variant['bytes'] / 1024:.0f} KiB"
+                          for encoding, variant in entry['encodings'].items())
+        print(f"Written {out_dir}/{entry['file']} ({entry['bytes'] / 1024:.0f} KiB; {sizes})")
+    if brotli is None:
+        print("  (pip install brotli to also write .br variants)")
+
+DEFAULT_RELEASE_DIR = 'public/data/releases'
+
+def add_output_arguments(parser):
+    """Add the options for the extra outputs write_outputs can produce"""
+    parser.add_argument('--shards', action='store_true',
+                        help='also write one shard per rating plus a manifest for lazy loading')
+    parser.add_argument('--shard-dir', default=DEFAULT_SHARD_DIR,
+                        help=f'where to write rating shards (default: {DEFAULT_SHARD_DIR})')
+    parser.add_argument('--index', action='store_true',
+                        help='also write tag/rating bitsets and sort orders for fast filtering')
+    parser.add_argument('--index-path', default=DEFAULT_INDEX_PATH,
+                        help=f'where to write the filter index (default: {DEFAULT_INDEX_PATH})')
+    parser.add_argument('--search-index', action='store_true',
+                        help='also write trigram postings for looking problems up by name, ID or tag')
+    parser.add_argument('--search-index-path', default=DEFAULT_SEARCH_INDEX_PATH,
+                        help=f'where to write the search index (default: {DEFAULT_SEARCH_INDEX_PATH})')
+    parser.add_argument('--neighbours', action='store_true',
+                        help='also precompute each problem\'s most similar problems for "try next" (needs numpy)')
+    parser.add_argument('--neighbours-path', default=DEFAULT_NEIGHBOURS_PATH,
+                        help=f'where to write them (default: {DEFAULT_NEIGHBOURS_PATH})')
+    parser.add_argument('--artifacts', action='store_true',
+                        help='also write content-hashed, precompressed dataset files plus a manifest')
+    parser.add_argument('--artifact-dir', default=DEFAULT_ARTIFACT_DIR,
+                        help=f'where to write them (default: {DEFAULT_ARTIFACT_DIR})')
+    parser.add_argument('--release', action='store_true',
+                        help='also publish a content-hashed release with a delta from the previous one')
+    parser.add_argument('--release-dir', default=DEFAULT_RELEASE_DIR,
+                        help=f'where to write releases (default: {DEFAULT_RELEASE_DIR})')
+
+def write_outputs(problems, args):
+    """Write every extra output requested with add_output_arguments' options
+
+    Called once problems.js itself has been written.
+    """
+    if args.shards:
+        manifest = write_rating_shards(problems, args.shard_dir)
+        print_shard_summary(manifest, args.shard_dir)
+    if args.index:
+        write_filter_index(problems, args.index_path)
+    if args.search_index:
+        write_search_index(problems, args.search_index_path)
+    if args.neighbours:
+        write_neighbours(problems, args.neighbours_path)
+    if args.artifacts:
+        manifest = write_dataset_artifacts(problems, args.artifact_dir, args.index, args.search_index)
+        print_artifact_summary(manifest, args.artifact_dir)
+    if args.release:
+        import releases  # releases builds on this module
+        releases.write_release(problems, args.release_dir)
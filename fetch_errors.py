@@ -0,0 +1,87 @@
+import random
+import metrics
+
+# Statuses worth retrying; 429/503 also mean "slow down"
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504, 520, 521, 522, 523, 524}
+THROTTLE_STATUS = {429, 503}
+
+class FetchFailure:
+    """Why a page could not be measured
+
+    Falsy, so it can stand in for the old `0 = failed` convention wherever
+    results are only checked for truthiness.
+    """
+
+    __slots__ = ('reason', 'retryable', 'status')
+
+    def __init__(self, reason, retryable, status=None):
+        self.reason = reason
+        self.retryable = retryable
+        self.status = status
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        kind = 'retryable' if self.retryable else 'permanent'
+        return f"FetchFailure({self.reason!r}, {kind})"
+
+    @property
+    def throttled(self):
+        return self.status in THROTTLE_STATUS
+
+def from_status(status):
+    """Classify a non-200 HTTP response"""
+    return FetchFailure(f"HTTP {status}", status in RETRYABLE_STATUS, status)
+
+def from_exception(error):
+    """Classify a network-level error (timeouts, resets, DNS): always retryable"""
+    return FetchFailure(type(error).__name__, True)
+
+NO_STATEMENT = FetchFailure('no statement found', False)
+
+def call_page_hook(on_page, key, html):
+    """Hand a fetched page to on_page(key, html), if given, without letting it fail the fetch
+
+    The hook is a side channel (the page archive): an error there, such as
+    a full disk, is reported and the page is still parsed and counted once.
+    """
+    if on_page is None:
+        return
+    try:
+        on_page(key, html)
+    except Exception as e:
+        print(f"  Error storing page {key}: {type(e).__name__}: {e}")
+
+def parse_page(parse, key, html):
+    """Parse a fetched page, mapping parser errors and empty results to NO_STATEMENT
+
+    A page that cannot be parsed will not parse any better when fetched
+    again, so this is a permanent failure in every engine.
+    """
+    try:
+        value = metrics.timed_call('html parse', parse, html)
+    except Exception as e:
+        print(f"  Error parsing {key}: {str(e)}")
+        value = 0
+    return value or NO_STATEMENT
+
+def backoff_delay(attempt, base=2.0, cap=60.0):
+    """Exponential backoff with full jitter for the given retry attempt (1, 2, ...)"""
+    return random.uniform(0, 1) * min(cap, base * 2 ** (attempt - 1))
+
+def print_failure_report(failures, limit=10):
+    """Print what still failed after all retries, grouped by reason"""
+    if not failures:
+        return
+    by_reason = {}
+    for key, failure in failures.items():
+        if not isinstance(failure, FetchFailure):
+            failure = FetchFailure('not fetched', False)
+        by_reason.setdefault((failure.reason, failure.retryable), []).append(str(key))
+
+    print(f"\nStill failing after retries: {len(failures)}")
+    for (reason, retryable), keys in sorted(by_reason.items(), key=lambda item: -len(item[1])):
+        kind = 'gave up retrying' if retryable else 'permanent'
+        sample = ', '.join(sorted(keys)[:limit]) + (', ...' if len(keys) > limit else '')
+        print(f"  {reason} ({kind}): {len(keys)}  [{sample}]")
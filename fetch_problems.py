@@ -1,69 +1,120 @@
 import requests
-import json
 import os
 import time
-from bs4 import BeautifulSoup
+import random
+import argparse
+import functools
 import concurrent.futures
-from threading import Lock
+import cf_client
+import contest_watch
+import dataset_builder
+import fetch_errors
+import metrics
+import mirrors
+import statement_extractor
+from journal import Journal, write_atomic
+from length_cache import LengthCache, DEFAULT_CACHE_PATH, DEFAULT_MAX_AGE_DAYS
+from page_archive import PageArchive, DEFAULT_ARCHIVE_DIR
+from rate_limiter import AdaptiveTokenBucket, TokenBucket
 
-# Global variables for progress tracking
-processed_count = 0
-total_count = 0
-lock = Lock()
+DEFAULT_JOURNAL_PATH = '.cache/fetch_journal.ndjson'
+DEFAULT_DATASET_PATH = 'src/problems.js'
 
-def get_problem_statement_length(contest_id, index):
-    """Fetch the actual problem statement length from the problem page"""
+# Progress of the running thread-pool pass
+progress = None
+
+def fetch_page(job, parse, on_result=None, on_page=None):
+    """Fetch a single page and parse it (thread pool worker)"""
+    key, url = job
+    start = time.perf_counter()
+    html = None
     try:
-        url = f"https://codeforces.com/problemset/problem/{contest_id}/{index}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        response = requests.get(url, timeout=15, headers=headers)
-        
+        response = cf_client.get(url, timeout=15)
+        metrics.record_request(time.perf_counter() - start, response.status_code)
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Try multiple selectors
-            problem_statement = soup.find('div', class_='problem-statement')
-            
-            if not problem_statement:
-                # Try alternate selector
-                problem_statement = soup.find('div', {'class': 'problemindexholder'})
-            
-            if problem_statement:
-                # Get text content and calculate length
-                text = problem_statement.get_text(separator=' ', strip=True)
-                length = len(text)
-                if length > 100:  # Valid problem statement should be at least 100 chars
-                    return length
-        
-        return 0
+            html = response.text
+        else:
+            value = fetch_errors.from_status(response.status_code)
     except Exception as e:
-        print(f"  Error fetching {contest_id}{index}: {str(e)}")
-        return 0
-
-def fetch_problem_with_length(problem_data):
-    """Fetch a single problem with its statement length"""
-    global processed_count
-    
-    problem, stats = problem_data
-    contest_id = problem['contestId']
-    index = problem['index']
-    problem_id = str(contest_id) + index
-    stat = stats.get(problem_id, {})
+        metrics.record_request(time.perf_counter() - start, type(e).__name__)
+        value = fetch_errors.from_exception(e)
+    if html is not None:
+        fetch_errors.call_page_hook(on_page, key, html)
+        value = fetch_errors.parse_page(parse, key, html)
     
-    # Get actual problem statement length
-    length = get_problem_statement_length(contest_id, index)
+    if on_result is not None:
+        on_result(key, value)
     
-    with lock:
-        global processed_count
-        processed_count += 1
-        if processed_count % 100 == 0:
-            print(f"  Processed {processed_count}/{total_count} problems...")
+    progress.tick()
     
     # Small delay to avoid rate limiting
     time.sleep(0.2)
     
+    return key, value
+
+def fetch_pages_threaded(jobs, parse, on_result=None, on_page=None):
+    """Fetch pages with the 10-thread pool (fallback engine)"""
+    global progress
+    progress = metrics.Progress(len(jobs))
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+        worker = functools.partial(fetch_page, parse=parse, on_result=on_result, on_page=on_page)
+        return dict(executor.map(worker, jobs))
+
+def run_engine(jobs, parse, engine, bucket, concurrency, on_result, on_page):
+    """Run one pass of the selected engine over jobs"""
+    if engine == 'async':
+        from async_fetcher import fetch_pages_async
+        return fetch_pages_async(jobs, parse, concurrency=concurrency, on_result=on_result, bucket=bucket,
+                                 on_page=on_page)
+    if engine == 'pipeline':
+        from pipeline import run_pipeline
+        return run_pipeline(jobs, parse, io_workers=concurrency, on_result=on_result, bucket=bucket,
+                            on_page=on_page)
+    return fetch_pages_threaded(jobs, parse, on_result, on_page)
+
+def fetch_pages(jobs, parse, engine='async', rate=10.0, concurrency=20, on_result=None,
+                max_retries=4, on_page=None):
+    """Fetch and parse (key, url) jobs with the selected engine
+
+    engine is 'async' (shared token-bucket rate limit), 'pipeline' (I/O
+    threads + process pool for parsing) or 'threads'.
+    Pages that fail with a retryable error (network errors, 429, 5xx) go
+    back into a retry queue that is re-run after an exponential backoff
+    with jitter, up to max_retries times. The async and pipeline engines
+    share one AIMD token bucket, so the request rate drops when Codeforces
+    answers 429/503 and recovers as requests succeed again.
+    on_result(key, value) is called as soon as each page is done, and
+    on_page(key, html) with the HTML of every page that came back 200.
+    Returns {key: parse(html)}, with a FetchFailure for pages that failed.
+    """
+    results = {}
+    bucket = AdaptiveTokenBucket(rate)
+    pending = list(jobs)
+    for attempt in range(max_retries + 1):
+        if not pending:
+            break
+        if attempt:
+            delay = fetch_errors.backoff_delay(attempt)
+            print(f"  Retrying {len(pending)} pages in {delay:.1f}s "
+                  f"(attempt {attempt + 1}/{max_retries + 1}, rate {bucket.rate:.1f}/s)")
+            time.sleep(delay)
+            random.shuffle(pending)
+        
+        results.update(run_engine(pending, parse, engine, bucket, concurrency, on_result, on_page))
+        pending = [
+            job for job in pending
+            if isinstance(results[job[0]], fetch_errors.FetchFailure) and results[job[0]].retryable
+        ]
+    
+    if bucket.throttled:
+        print(f"  Server throttled {bucket.throttled} requests; final rate {bucket.rate:.1f}/s")
+    return results
+
+def build_problem(problem, stat, length):
+    """Build the output record for a problem"""
+    contest_id = problem['contestId']
+    index = problem['index']
     return {
         'name': problem['name'],
         'rating': problem['rating'],
@@ -71,68 +122,178 @@ def fetch_problem_with_length(problem_data):
         'solveCount': stat.get('solvedCount', 0),
         'length': length,
         'link': f"https://codeforces.com/contest/{contest_id}/problem/{index}",
-        'problemId': problem_id
+        'problemId': str(contest_id) + index
     }
 
-def fetch_codeforces_problems():
-    """Fetch all problems from Codeforces API"""
+def fetch_lengths_by_contest(to_fetch, extractor, engine, rate, concurrency, journal=None,
+                             max_retries=4, archive=None):
+    """Measure statements from one /contest/{id}/problems page per contest
+
+    Returns ({problemId: length}, problems that still need a per-problem
+    fetch because their contest page failed or lacked their statement).
+    """
+    contests = {}
+    for problem in to_fetch:
+        contests.setdefault(problem['contestId'], []).append(problem)
+    
+    print(f"Fetching {len(contests)} contest pages for {len(to_fetch)} problems...")
+    jobs = [(contest_id, cf_client.contest_problems_url(contest_id)) for contest_id in contests]
+    parse = functools.partial(statement_extractor.statement_lengths_by_index, backend=extractor)
+    
+    on_result = None
+    if journal is not None:
+        def on_result(contest_id, found):
+            for index, length in (found or {}).items():
+                journal.record(str(contest_id) + index, length)
+    
+    on_page = archive.put_contest if archive is not None else None
+    pages = fetch_pages(jobs, parse, engine, rate, concurrency, on_result, max_retries, on_page)
+    
+    lengths = {}
+    remaining = []
+    for contest_id, problems in contests.items():
+        found = pages.get(contest_id) or {}
+        for problem in problems:
+            length = found.get(problem['index'], 0)
+            if length:
+                lengths[str(contest_id) + problem['index']] = length
+            else:
+                remaining.append(problem)
+    
+    if remaining:
+        print(f"Falling back to problem pages for {len(remaining)} problems")
+    return lengths, remaining
+
+def fetch_statement_lengths(to_fetch, extractor, engine, rate, concurrency, by_contest=False,
+                            journal=None, max_retries=4, archive=None):
+    """Return {problemId: length} for the given API problems (0 = failed)
+
+    If a Journal is given every length is appended to it as soon as it is known.
+    If a PageArchive is given every fetched page is stored in it.
+    """
+    lengths = {}
+    remaining = to_fetch
+    if by_contest:
+        lengths, remaining = fetch_lengths_by_contest(to_fetch, extractor, engine, rate, concurrency,
+                                                      journal, max_retries, archive)
+    
+    jobs = [
+        (str(p['contestId']) + p['index'], cf_client.problem_url(p['contestId'], p['index']))
+        for p in remaining
+    ]
+    parse = functools.partial(statement_extractor.statement_length, backend=extractor)
+    on_result = None
+    if journal is not None:
+        def on_result(problem_id, length):
+            journal.record(problem_id, length or 0)
+    on_page = archive.put_problem if archive is not None else None
+    lengths.update(fetch_pages(jobs, parse, engine, rate, concurrency, on_result, max_retries, on_page))
+    return lengths
+
+def fetch_codeforces_problems(cache=None, engine='async', rate=10.0, concurrency=20,
+                              extractor=statement_extractor.DEFAULT_BACKEND, by_contest=False,
+                              journal=None, max_retries=4, dedupe=True, archive=None):
+    """Fetch all problems from Codeforces API
+
+    If a LengthCache is given, only problems missing from it (or stale) are
+    scraped; the rest reuse their cached statement length.
+    engine is 'async' (shared token-bucket rate limit), 'pipeline' (I/O
+    threads + process pool for parsing) or 'threads'.
+    extractor names the statement_extractor backend used to measure pages.
+    by_contest fetches one /contest/{id}/problems page per contest instead
+    of one page per problem.
+    journal, if given, records each length as it completes; problems it
+    already holds (from a resumed run) are not fetched again.
+    max_retries bounds how often a retryable failure is re-queued.
+    dedupe scrapes one copy of each Div.1/Div.2 mirror problem and lists
+    the other IDs under the representative's 'aliases'.
+    archive, a page_archive.PageArchive, keeps the HTML of every fetched page.
+    """
     print("Fetching problems from Codeforces API...")
-    url = "https://codeforces.com/api/problemset.problems"
     
     try:
-        response = requests.get(url, timeout=30)
-        data = response.json()
-        
-        if data['status'] != 'OK':
-            print("Error: API returned non-OK status")
-            return []
-        
-        problems = []
-        problem_stats = {}
-        
-        # Create a mapping of problem ID to statistics
-        for stat in data['result']['problemStatistics']:
-            problem_id = str(stat['contestId']) + stat['index']
-            problem_stats[problem_id] = stat
-        
-        # Filter problems first
-        filtered_problems = []
-        for problem in data['result']['problems']:
-            # Skip problems without rating
-            if 'rating' not in problem:
-                continue
-            
-            rating = problem['rating']
-            
-            # Filter for ratings between 1600 and 3000
-            if rating < 1600 or rating > 3000:
-                continue
-            
-            filtered_problems.append(problem)
-        
-        global total_count, processed_count
-        total_count = len(filtered_problems)
-        processed_count = 0
-        
-        print(f"Fetching problem statement lengths for {total_count} problems...")
-        print("This may take a while (approximately 10-15 minutes)...")
-        
-        # Prepare data for parallel processing
-        problem_data_list = [(p, problem_stats) for p in filtered_problems]
-        
-        # Use ThreadPoolExecutor for parallel fetching
-        problems = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            problems = list(executor.map(fetch_problem_with_length, problem_data_list))
-        
-        # Remove problems with length 0 (failed to fetch)
-        problems = [p for p in problems if p['length'] > 0]
-        
-        print(f"\nSuccessfully fetched lengths for {len(problems)} problems")
-        print(f"Failed to fetch: {total_count - len(problems)} problems")
-        
-        # Sort by length ascending
-        problems.sort(key=lambda x: x['length'])
+        with metrics.stage('filter'):
+            # Streamed: only problems rated 1600-3000 and their statistics are kept
+            filtered_problems, problem_stats = cf_client.load_rated_problems(1600, 3000)
+            solved_counts = {problem_id: stat.get('solvedCount', 0) for problem_id, stat in problem_stats.items()}
+        
+        # Scrape one copy of each Div.1/Div.2 mirror pair
+        aliases = {}
+        if dedupe:
+            with metrics.stage('contest list'):
+                rounds = mirrors.load_contest_rounds()
+            with metrics.stage('mirror dedupe'):
+                filtered_problems, aliases = mirrors.dedupe_mirrors(filtered_problems, solved_counts, rounds)
+        
+        with metrics.stage('cache lookup'):
+            # Reuse cached lengths where possible
+            cached_lengths = {}
+            if cache is not None:
+                cached_lengths = cache.get_fresh(
+                    [str(p['contestId']) + p['index'] for p in filtered_problems]
+                    + [alias for alias_ids in aliases.values() for alias in alias_ids])
+            if journal is not None and journal.completed():
+                print(f"Resuming: {len(journal.completed())} problems already in the journal")
+                for problem_id, entry in journal.completed().items():
+                    cached_lengths[problem_id] = entry['length']
+            # A copy measured earlier under another ID stands in for its representative
+            for problem_id, alias_ids in aliases.items():
+                for alias in alias_ids:
+                    if problem_id not in cached_lengths and alias in cached_lengths:
+                        cached_lengths[problem_id] = cached_lengths[alias]
+        
+            problems = []
+            to_fetch = []
+            for problem in filtered_problems:
+                problem_id = str(problem['contestId']) + problem['index']
+                if problem_id in cached_lengths:
+                    stat = problem_stats.get(problem_id, {})
+                    problems.append(build_problem(problem, stat, cached_lengths[problem_id]))
+                else:
+                    to_fetch.append(problem)
+        
+        metrics.count('problems cached', len(problems))
+        metrics.count('problems to fetch', len(to_fetch))
+        if problems:
+            print(f"Using cached lengths for {len(problems)} problems")
+        
+        print(f"Fetching problem statement lengths for {len(to_fetch)} problems...")
+        if len(to_fetch) > 1000 and not by_contest:
+            print("This may take a while (approximately 10-15 minutes)...")
+        
+        with metrics.stage('page fetch'):
+            lengths = fetch_statement_lengths(to_fetch, extractor, engine, rate, concurrency, by_contest,
+                                              journal, max_retries, archive)
+        
+        # Remove problems that failed to fetch
+        fetched = []
+        failures = {}
+        for problem in to_fetch:
+            problem_id = str(problem['contestId']) + problem['index']
+            if lengths.get(problem_id):
+                stat = problem_stats.get(problem_id, {})
+                fetched.append(build_problem(problem, stat, lengths[problem_id]))
+            else:
+                failures[problem_id] = lengths.get(problem_id)
+        
+        if cache is not None:
+            lengths = {p['problemId']: p['length'] for p in fetched}
+            for problem_id, length in list(lengths.items()):
+                lengths.update(dict.fromkeys(aliases.get(problem_id, ()), length))
+            cache.put_many(lengths)
+        
+        metrics.count('problems fetched', len(fetched))
+        metrics.count('problems failed', len(failures))
+        print(f"\nSuccessfully fetched lengths for {len(fetched)} problems")
+        print(f"Failed to fetch: {len(to_fetch) - len(fetched)} problems")
+        fetch_errors.print_failure_report(failures)
+        
+        problems.extend(fetched)
+        mirrors.attach_aliases(problems, aliases, solved_counts)
+        
+        # Sort by length ascending (ties by problemId, so the order is reproducible)
+        with metrics.stage('sort'):
+            dataset_builder.sort_problems(problems)
         
         print(f"Successfully fetched {len(problems)} problems (rating 1600-3000)")
         return problems
@@ -140,39 +301,235 @@ def fetch_codeforces_problems():
     except requests.RequestException as e:
         print(f"Error fetching data: {e}")
         return []
+    except cf_client.APIError as e:
+        print(f"Error: API returned non-OK status ({e})")
+        return []
     except Exception as e:
         print(f"Unexpected error: {e}")
         return []
 
-def save_problems(problems):
+def save_problems(problems, output_format='json'):
     """Save problems to problems.js file"""
-    output_path = 'src/problems.js'
+    output_path = DEFAULT_DATASET_PATH
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('// Problem data extracted from Codeforces API\n')
-            f.write(f'// Last updated: {__import__("datetime").datetime.now().strftime("%Y-%m-%d %H:%M:%S")}\n')
-            f.write('// Total problems: ' + str(len(problems)) + '\n')
-            f.write('export const problems = ')
-            f.write(json.dumps(problems, indent=2, ensure_ascii=False))
-            f.write(';\n')
-        
-        print(f"Successfully written {len(problems)} problems to {output_path}")
+        content = dataset_builder.render_problems_js(problems, dataset_builder.header_lines(problems),
+                                                     output_format)
+        write_atomic(output_path, content)
+        
+        print(f"Successfully written {len(problems)} problems to {output_path} "
+              f"({output_format} format, {len(content.encode('utf-8')) / 1024:.0f} KiB)")
         return True
         
     except Exception as e:
         print(f"Error writing file: {e}")
         return False
 
-def main():
+def ingest_contests(found, args, engine, cache=None, archive=None):
+    """Fetch the problems of newly rated contests and patch them into problems.js
+
+    `found` is a contest_watch.ContestPoll. Only these contests' pages are
+    fetched (one contest page each, problem pages where that fails), and
+    the dataset on disk is patched rather than rebuilt. Returns
+    ({contestId: problems added} for contests that are done, contest ids
+    to retry on the next poll).
+    """
+    solved_counts = {problem_id: stat.get('solvedCount', 0) for problem_id, stat in found.stats.items()}
+    aliases = {}
+    problems = found.problems
+    if not args.keep_mirrors:
+        problems, aliases = mirrors.dedupe_mirrors(problems, solved_counts, found.rounds)
+    
+    lengths = cache.get_fresh([mirrors.problem_id(p) for p in problems]) if cache is not None else {}
+    to_fetch = [p for p in problems if mirrors.problem_id(p) not in lengths]
+    if to_fetch:
+        lengths.update(fetch_statement_lengths(to_fetch, args.extractor, engine, args.rate, args.concurrency,
+                                               True, None, args.max_retries, archive))
+    
+    added = []
+    failures = {}
+    retry = set()
+    for problem in problems:
+        problem_id = mirrors.problem_id(problem)
+        if lengths.get(problem_id):
+            added.append(build_problem(problem, found.stats.get(problem_id, {}), lengths[problem_id]))
+        else:
+            failures[problem_id] = lengths.get(problem_id)
+            retry.update(contest_watch.contest_of(copy) for copy in [problem_id, *aliases.get(problem_id, ())])
+    fetch_errors.print_failure_report(failures)
+    mirrors.attach_aliases(added, aliases, solved_counts)
+    
+    if cache is not None:
+        cached = {p['problemId']: p['length'] for p in added}
+        for problem in added:
+            cached.update(dict.fromkeys(problem.get('aliases', ()), problem['length']))
+        cache.put_many(cached)
+    
+    if added:
+        try:
+            current = dataset_builder.load_problems_js(DEFAULT_DATASET_PATH)
+        except FileNotFoundError:
+            current = []
+        merged = dataset_builder.merge_problems(current, added)
+        if not save_problems(merged, args.format):
+            return {}, set(found.ready)
+        dataset_builder.write_outputs(merged, args)
+    
+    counts = {}
+    for problem in added:
+        for problem_id in [problem['problemId'], *problem.get('aliases', [])]:
+            contest_id = contest_watch.contest_of(problem_id)
+            counts[contest_id] = counts.get(contest_id, 0) + 1
+    return {contest_id: counts.get(contest_id, 0) for contest_id in found.ready if contest_id not in retry}, retry
+
+def watch(args, engine):
+    """Poll contest.list every --watch-interval seconds and ingest contests as they get rated
+
+    Every finished contest is recorded in the --watch-state store, so a
+    restart picks up where it left off. A poll with nothing new costs one
+    contest.list call plus one small contest.standings call per contest
+    still waiting for ratings.
+    """
+    state = contest_watch.ContestState(args.watch_state)
+    cache = None if args.no_cache else LengthCache(args.cache_path, args.max_age_days)
+    archive = PageArchive(args.archive_dir) if args.archive else None
+    bucket = TokenBucket(cf_client.API_RATE, cf_client.API_BURST)
+    print(f"Watching contest.list every {args.watch_interval:g}s (state in {args.watch_state}, Ctrl+C to stop)")
+    try:
+        while True:
+            try:
+                current = dataset_builder.load_problems_js(DEFAULT_DATASET_PATH)
+            except FileNotFoundError:
+                current = []
+            try:
+                found = contest_watch.poll(state, contest_watch.dataset_contests(current), bucket)
+            except (requests.RequestException, cf_client.APIError) as e:
+                print(f"Poll failed ({e}), trying again in {args.watch_interval:g}s")
+            else:
+                if found.new:
+                    print(f"Watching {len(found.new)} newly finished contests: "
+                          f"{', '.join(map(str, sorted(found.new)))}")
+                if found.ready:
+                    print(f"\nIngesting rated contests {', '.join(map(str, sorted(found.ready)))} "
+                          f"({len(found.problems)} problems rated {contest_watch.MIN_RATING}-"
+                          f"{contest_watch.MAX_RATING})")
+                    done, retry = ingest_contests(found, args, engine, cache, archive)
+                    state.mark(done, contest_watch.INGESTED)
+                    for contest_id, count in sorted(done.items()):
+                        print(f"  contest {contest_id}: {count} problems added")
+                    if retry:
+                        print(f"  contests {', '.join(map(str, sorted(retry)))} will be retried on the next poll")
+                counts = state.counts()
+                print(f"[{time.strftime('%H:%M:%S')}] {counts.get(contest_watch.PENDING, 0)} contests waiting "
+                      f"for ratings, {counts.get(contest_watch.INGESTED, 0)} ingested so far")
+            time.sleep(args.watch_interval)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        state.close()
+        if cache is not None:
+            cache.close()
+        if archive is not None:
+            archive.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Fetch Codeforces problems with statement lengths')
+    parser.add_argument('--cache-path', default=DEFAULT_CACHE_PATH,
+                        help=f'statement length cache (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--max-age-days', type=float, default=DEFAULT_MAX_AGE_DAYS,
+                        help=f're-fetch cached lengths older than this (default: {DEFAULT_MAX_AGE_DAYS})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='ignore the cache and scrape every problem')
+    parser.add_argument('--engine', choices=['async', 'pipeline', 'threads'], default='async',
+                        help='page fetch engine; pipeline parses on a process pool, '
+                             'threads is the old 10-worker pool (default: async)')
+    parser.add_argument('--rate', type=float, default=10.0,
+                        help='async/pipeline: maximum requests per second; lowered automatically '
+                             'while Codeforces answers 429/503 (default: 10)')
+    parser.add_argument('--concurrency', type=int, default=20,
+                        help='async/pipeline: maximum requests in flight (default: 20)')
+    parser.add_argument('--extractor', choices=sorted(statement_extractor.BACKENDS),
+                        default=statement_extractor.DEFAULT_BACKEND,
+                        help=f'statement length extractor (default: {statement_extractor.DEFAULT_BACKEND})')
+    parser.add_argument('--by-contest', action='store_true',
+                        help='fetch one /contest/{id}/problems page per contest, '
+                             'falling back to problem pages where it fails')
+    parser.add_argument('--format', choices=dataset_builder.OUTPUT_FORMATS, default='json',
+                        help='problems.js layout: json (array of objects) or compact '
+                             '(columnar, interned tags, decoded by src/problemsCodec.js) (default: json)')
+    dataset_builder.add_output_arguments(parser)
+    parser.add_argument('--keep-mirrors', action='store_true',
+                        help='keep Div.1/Div.2 mirror copies as separate problems instead of merging them')
+    parser.add_argument('--base-url', default=cf_client.BASE_URL,
+                        help='where to fetch from, e.g. a local benchmarks/cf_stand_in.py server '
+                             '(default: %(default)s, or $CF_BASE_URL)')
+    parser.add_argument('--archive', action='store_true',
+                        help='keep the HTML of every fetched page in a compressed archive, '
+                             'so lengths can be re-extracted offline (page_archive.py re-extract)')
+    parser.add_argument('--archive-dir', default=DEFAULT_ARCHIVE_DIR,
+                        help=f'page archive directory (default: {DEFAULT_ARCHIVE_DIR})')
+    parser.add_argument('--max-retries', type=int, default=4,
+                        help='retry rounds for network errors, 429 and 5xx responses (default: 4)')
+    parser.add_argument('--metrics', nargs='?', const='', metavar='PATH',
+                        help='record stage timings, request latency percentiles and status counts '
+                             f'into a JSON report (default path: {metrics.DEFAULT_METRICS_DIR}/fetch-<time>.json)')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='run under cProfile and write the stats to PATH (main thread only)')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='trace Python allocations and report peak memory and top allocation sites')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running: poll contest.list and patch newly rated contests into '
+                             'the dataset instead of fetching everything once')
+    parser.add_argument('--watch-interval', type=float, default=contest_watch.DEFAULT_INTERVAL,
+                        help=f'--watch: seconds between polls (default: {contest_watch.DEFAULT_INTERVAL})')
+    parser.add_argument('--watch-state', default=contest_watch.DEFAULT_STATE_PATH,
+                        help=f'--watch: which contests were seen and ingested '
+                             f'(default: {contest_watch.DEFAULT_STATE_PATH})')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue an interrupted run, skipping problems already in the journal')
+    parser.add_argument('--journal-path', default=DEFAULT_JOURNAL_PATH,
+                        help=f'checkpoint journal of finished problems (default: {DEFAULT_JOURNAL_PATH})')
+    return parser.parse_args()
+
+def run(args):
+    """Fetch, report and save the dataset for parsed command-line arguments"""
     print("=" * 60)
     print("Codeforces Problem Fetcher")
     print("=" * 60)
     
+    engine = args.engine
+    if engine == 'async':
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:
+            print("aiohttp is not installed, falling back to the thread pool engine")
+            print("  (pip install aiohttp to enable the async engine)")
+            engine = 'threads'
+    
+    if args.watch:
+        watch(args, engine)
+        return
+    
+    cache = None
+    if not args.no_cache:
+        cache = LengthCache(args.cache_path, args.max_age_days)
+    
+    journal = Journal(args.journal_path, resume=args.resume)
+    archive = PageArchive(args.archive_dir) if args.archive else None
+    
     # Fetch problems
-    problems = fetch_codeforces_problems()
+    try:
+        problems = fetch_codeforces_problems(cache, engine, args.rate, args.concurrency, args.extractor,
+                                             args.by_contest, journal, args.max_retries,
+                                             not args.keep_mirrors, archive)
+    finally:
+        if cache is not None:
+            cache.close()
+        if archive is not None:
+            archive.close()
     
     if not problems:
+        journal.close()
         print("No problems fetched. Exiting.")
         return
     
@@ -191,15 +548,36 @@ def main():
     
     # Save to file
     print("\n" + "=" * 60)
-    if save_problems(problems):
+    with metrics.stage('write'):
+        saved = save_problems(problems, args.format)
+        if saved:
+            dataset_builder.write_outputs(problems, args)
+    if saved:
+        journal.discard()
         print("\n✅ Update complete! Your problem dataset is now up to date.")
         print("\nNext steps:")
         print("  1. Test the application locally")
         print("  2. Commit and push changes: git add -A && git commit -m 'Update problems dataset' && git push")
     else:
+        journal.close()
         print("\n❌ Failed to save problems.")
+        print(f"  Finished problems are kept in {args.journal_path}; rerun with --resume")
     
     print("=" * 60)
 
+def main():
+    args = parse_args()
+    cf_client.BASE_URL = args.base_url.rstrip('/')
+    collector = metrics.enable() if args.metrics is not None else None
+    
+    with metrics.hooks(args.profile, args.tracemalloc) as hook_results:
+        run(args)
+    
+    if collector is not None:
+        report_path = args.metrics or metrics.default_report_path('fetch')
+        report = collector.write(report_path, {'config': vars(args), **hook_results})
+        collector.print_summary(report)
+        print(f"  report written to {report_path}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,75 @@
+import json
+import os
+from threading import Lock
+
+def write_atomic(path, data):
+    """Write str or bytes to path via a temp file and an atomic rename
+
+    Readers (and a crash mid-write) only ever see the old file or the
+    complete new one, never a truncated mix.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f'.{os.path.basename(path)}.{os.getpid()}.tmp')
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    encoding = None if isinstance(data, bytes) else 'utf-8'
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class Journal:
+    """Append-only NDJSON log of finished problems for crash-safe resume
+
+    Every completed problem is appended as one JSON line and flushed right
+    away, so a run that dies halfway keeps everything it finished. A torn
+    last line from a crash is ignored on load.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.entries = {}
+        self.lock = Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if resume and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.entries[entry['problemId']] = entry
+
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def completed(self):
+        """Return {problemId: entry} for journaled problems that succeeded"""
+        return {pid: e for pid, e in self.entries.items() if e.get('length', 0) > 0}
+
+    def record(self, problem_id, length, **extra):
+        """Append one finished problem (length 0 = failed, retried on resume)"""
+        entry = dict(problemId=problem_id, length=length, **extra)
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self.lock:
+            self.entries[problem_id] = entry
+            self.file.write(line)
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def discard(self):
+        """Close and delete the journal once its results are safely saved"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
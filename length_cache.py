@@ -0,0 +1,50 @@
+import os
+import sqlite3
+import time
+
+DEFAULT_CACHE_PATH = '.cache/lengths.sqlite'
+DEFAULT_MAX_AGE_DAYS = 90
+
+class LengthCache:
+    """On-disk cache of extracted problem statement lengths keyed by problemId"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.path = path
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS lengths ('
+            ' problem_id TEXT PRIMARY KEY,'
+            ' length INTEGER NOT NULL,'
+            ' fetched_at REAL NOT NULL)'
+        )
+        self.conn.commit()
+
+    def get_fresh(self, problem_ids):
+        """Return {problemId: length} for every cached entry newer than the max age"""
+        cutoff = time.time() - self.max_age_seconds
+        wanted = set(problem_ids)
+        fresh = {}
+        for problem_id, length in self.conn.execute(
+            'SELECT problem_id, length FROM lengths WHERE fetched_at >= ?', (cutoff,)
+        ):
+            if problem_id in wanted:
+                fresh[problem_id] = length
+        return fresh
+
+    def put_many(self, lengths):
+        """Store {problemId: length} with the current timestamp"""
+        now = time.time()
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO lengths (problem_id, length, fetched_at) VALUES (?, ?, ?)',
+            [(problem_id, length, now) for problem_id, length in lengths.items()]
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,251 @@
+import bisect
+import cProfile
+import json
+import math
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from threading import Lock
+from journal import write_atomic
+
+DEFAULT_METRICS_DIR = '.cache/metrics'
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+class Metrics:
+    """Timings and counters for one fetch run (see enable())
+
+    Stages are timed on the main thread and nest: a stage's time excludes
+    the stages opened inside it, so the stage times add up to the wall
+    time they cover. Requests and parses are recorded from any thread.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.stages = {}
+        self.work = {}
+        self.latencies = []
+        self.statuses = {}
+        self.counters = {}
+        self.lock = Lock()
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name):
+        frame = [time.perf_counter(), 0.0]  # start, time spent in nested stages
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed - frame[1]
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+    def record_request(self, seconds, status):
+        """One HTTP request: its latency and status code (or exception name)"""
+        with self.lock:
+            self.latencies.append(seconds)
+            key = str(status)
+            self.statuses[key] = self.statuses.get(key, 0) + 1
+
+    def record_work(self, name, seconds):
+        """Time spent in work that runs in parallel with the stages (e.g. HTML parsing)"""
+        with self.lock:
+            total, count = self.work.get(name, (0.0, 0))
+            self.work[name] = (total + seconds, count + 1)
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self):
+        """The run as a JSON-serialisable dict"""
+        latencies = sorted(self.latencies)
+        histogram = {}
+        below = 0
+        for bound in LATENCY_BUCKETS:
+            upto = bisect.bisect_right(latencies, bound)
+            histogram[f'le_{bound:g}'] = upto - below
+            below = upto
+        histogram['inf'] = len(latencies) - below
+        page_fetch = self.stages.get('page fetch', 0.0)
+        return {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'wall_seconds': round(time.time() - self.started, 3),
+            'stages': {name: round(seconds, 3) for name, seconds in self.stages.items()},
+            'work': {
+                name: {'seconds': round(total, 3), 'count': count,
+                       'mean_ms': round(1000 * total / count, 3) if count else None}
+                for name, (total, count) in self.work.items()
+            },
+            'requests': {
+                'count': len(latencies),
+                'per_second': round(len(latencies) / page_fetch, 2) if page_fetch else None,
+                'statuses': dict(sorted(self.statuses.items())),
+                'latency_ms': {
+                    name: round(1000 * value, 1) if value is not None else None
+                    for name, value in [
+                        ('p50', percentile(latencies, 50)),
+                        ('p95', percentile(latencies, 95)),
+                        ('p99', percentile(latencies, 99)),
+                        ('max', latencies[-1] if latencies else None),
+                        ('mean', sum(latencies) / len(latencies) if latencies else None),
+                    ]
+                },
+                'latency_histogram': histogram,
+            },
+            'counters': dict(self.counters),
+        }
+
+    def print_summary(self, report=None):
+        report = report or self.report()
+        print(f"\nMetrics ({report['wall_seconds']:.1f}s wall):")
+        for name, seconds in report['stages'].items():
+            print(f"  {name:14s} {seconds:8.2f}s")
+        for name, work in report['work'].items():
+            print(f"  {name:14s} {work['seconds']:8.2f}s over {work['count']} items "
+                  f"({work['mean_ms']} ms each, overlaps page fetch)")
+        requests = report['requests']
+        if requests['count']:
+            latency = requests['latency_ms']
+            print(f"  requests: {requests['count']} ({requests['per_second']}/s), "
+                  f"latency p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms")
+            print("  statuses: " + ', '.join(f"{status}: {n}" for status, n in requests['statuses'].items()))
+
+    def write(self, path, extra=None):
+        report = self.report()
+        report.update(extra or {})
+        write_atomic(path, json.dumps(report, indent=2) + '\n')
+        return report
+
+_active = None
+
+def enable():
+    """Start collecting metrics for this process and return the collector"""
+    global _active
+    _active = Metrics()
+    return _active
+
+def active():
+    return _active
+
+def stage(name):
+    return _active.stage(name) if _active is not None else nullcontext()
+
+_END = object()
+
+def timed_iter(iterable, name):
+    """Yield from iterable, charging the time spent producing items to a stage"""
+    if _active is None:
+        yield from iterable
+        return
+    iterator = iter(iterable)
+    while True:
+        with _active.stage(name):
+            item = next(iterator, _END)
+        if item is _END:
+            return
+        yield item
+
+def timed_call(name, fn, *args):
+    """Call fn(*args), recording its duration as parallel work under `name`"""
+    if _active is None:
+        return fn(*args)
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        _active.record_work(name, time.perf_counter() - start)
+
+def record_request(seconds, status):
+    if _active is not None:
+        _active.record_request(seconds, status)
+
+def record_work(name, seconds):
+    if _active is not None:
+        _active.record_work(name, seconds)
+
+def count(name, value=1):
+    if _active is not None:
+        _active.count(name, value)
+
+def _format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s" if minutes else f"{seconds}s"
+
+class Progress:
+    """Thread-safe 'Processed N/M pages...' counter with live throughput and ETA"""
+
+    def __init__(self, total, every=100, label='pages'):
+        self.total = total
+        self.every = every
+        self.label = label
+        self.done = 0
+        self.started = time.perf_counter()
+        self.lock = Lock()
+
+    def tick(self):
+        with self.lock:
+            self.done += 1
+            if self.done % self.every:
+                return
+            elapsed = time.perf_counter() - self.started
+            rate = self.done / elapsed if elapsed else 0.0
+            eta = (self.total - self.done) / rate if rate else 0.0
+            print(f"  Processed {self.done}/{self.total} {self.label}... "
+                  f"({rate:.1f} {self.label}/s, ETA {_format_duration(eta)})")
+
+def default_report_path(name):
+    return f"{DEFAULT_METRICS_DIR}/{name}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+
+@contextmanager
+def hooks(profile_path=None, trace_memory=False, top=15):
+    """Optionally run a block under cProfile and/or tracemalloc
+
+    Yields a dict that is filled with what the hooks found once the block
+    exits ('profile': stats path, 'memory': peak and top allocation sites),
+    ready to be merged into the metrics report. cProfile only sees the
+    main thread; the async engine runs there, worker threads do not.
+    """
+    results = {}
+    profiler = None
+    if trace_memory:
+        tracemalloc.start()
+    if profile_path:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield results
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if trace_memory:
+            # Snapshot before the profiler's own report allocates anything
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results['memory'] = {
+                'peak_mib': round(peak / 2 ** 20, 2),
+                'top': [
+                    {'where': str(stat.traceback[0]), 'kib': round(stat.size / 1024, 1), 'count': stat.count}
+                    for stat in snapshot.statistics('lineno')[:top]
+                ],
+            }
+            print(f"\nPeak traced memory: {results['memory']['peak_mib']} MiB")
+        if profiler is not None:
+            os.makedirs(os.path.dirname(profile_path) or '.', exist_ok=True)
+            profiler.dump_stats(profile_path)
+            print(f"\nProfile written to {profile_path} (top {top} by cumulative time):")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+            results['profile'] = profile_path
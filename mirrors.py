@@ -0,0 +1,110 @@
+import re
+import cf_client
+
+# "(Div. 1)", "(Div. 2 Only)", "(unofficial online mirror, Div. 1)" ...
+ROUND_SUFFIX_RE = re.compile(r'\s*\([^()]*\b(?:div\.?\s*\d|mirror)[^()]*\)', re.IGNORECASE)
+NAME_RE = re.compile(r'\W+')
+
+def problem_id(problem):
+    return str(problem['contestId']) + problem['index']
+
+def normalize_name(name):
+    return NAME_RE.sub(' ', name.casefold()).strip()
+
+def contest_rounds(contests):
+    """Map contest id -> round key for contests that share a round (Div.1/Div.2 pairs)
+
+    Contests whose names only differ in a division or mirror suffix (or
+    the lack of one) belong to one round, keyed by its lowest contest id.
+    Contests that are alone in their round are left out.
+    """
+    by_round = {}
+    suffixed = set()
+    for contest in contests:
+        name = contest['name'].strip()
+        base = ROUND_SUFFIX_RE.sub('', name).strip()
+        by_round.setdefault(base, []).append(contest['id'])
+        if base != name:
+            suffixed.add(base)
+    return {
+        contest_id: min(ids)
+        for base, ids in by_round.items() if len(ids) > 1 and base in suffixed
+        for contest_id in ids
+    }
+
+def load_contest_rounds():
+    """Round keys from the contest.list API, or None when it is unavailable"""
+    try:
+        data = cf_client.get_api('contest.list')
+    except Exception as e:
+        print(f"contest.list unavailable ({e}), pairing mirrors by adjacent contest ids")
+        return None
+    if data.get('status') != 'OK':
+        print("contest.list unavailable, pairing mirrors by adjacent contest ids")
+        return None
+    return contest_rounds(data['result'])
+
+def _adjacent_clusters(problems):
+    """Split same-name problems into runs of consecutive contest ids"""
+    clusters = []
+    for problem in sorted(problems, key=lambda p: p['contestId']):
+        if clusters and problem['contestId'] - clusters[-1][-1]['contestId'] <= 1:
+            clusters[-1].append(problem)
+        else:
+            clusters.append([problem])
+    return clusters
+
+def group_mirrors(problems, rounds=None):
+    """Groups of problems that are copies of one statement in paired contests
+
+    Problems match when their normalized names are equal and their contests
+    belong to the same round (`rounds` from contest_rounds) or, without
+    round data, have adjacent ids. A group must span at least two contests
+    with one problem each, so subproblems such as 513G1/513G2 (same name,
+    same contest, different limits) are never merged.
+    """
+    by_name = {}
+    for problem in problems:
+        by_name.setdefault(normalize_name(problem['name']), []).append(problem)
+
+    groups = []
+    for same_name in by_name.values():
+        if len(same_name) < 2:
+            continue
+        if rounds is None:
+            clusters = _adjacent_clusters(same_name)
+        else:
+            by_round = {}
+            for problem in same_name:
+                by_round.setdefault(rounds.get(problem['contestId'], ('contest', problem['contestId'])),
+                                    []).append(problem)
+            clusters = by_round.values()
+        for cluster in clusters:
+            contests = {p['contestId'] for p in cluster}
+            if len(cluster) > 1 and len(contests) == len(cluster):
+                groups.append(cluster)
+    return groups
+
+def dedupe_mirrors(problems, solved_counts, rounds=None):
+    """Keep one representative per mirror group, preserving order
+
+    The representative is the copy solved most often. Returns the
+    representatives plus {representative problemId: [alias problemIds]}.
+    """
+    aliases = {}
+    dropped = set()
+    for group in group_mirrors(problems, rounds):
+        group.sort(key=lambda p: (-solved_counts.get(problem_id(p), 0), problem_id(p)))
+        aliases[problem_id(group[0])] = sorted(problem_id(p) for p in group[1:])
+        dropped.update(problem_id(p) for p in group[1:])
+    if aliases:
+        print(f"Merged {len(dropped)} Div.1/Div.2 mirror copies into {len(aliases)} problems")
+    return [p for p in problems if problem_id(p) not in dropped], aliases
+
+def attach_aliases(problems, aliases, solved_counts):
+    """Record aliases on output problems and count solves under every copy"""
+    for problem in problems:
+        alias_ids = aliases.get(problem['problemId'])
+        if alias_ids:
+            problem['aliases'] = alias_ids
+            problem['solveCount'] += sum(solved_counts.get(alias, 0) for alias in alias_ids)
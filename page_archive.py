@@ -0,0 +1,361 @@
+import argparse
+import concurrent.futures
+import functools
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+import dataset_builder
+import metrics
+import statement_extractor
+from journal import write_atomic
+from length_cache import LengthCache, DEFAULT_CACHE_PATH
+
+DEFAULT_ARCHIVE_DIR = '.cache/pages'
+INDEX_MAGIC = b'CFPAGES1'
+# key ('p1927F' problem page, 'c1927' contest page), sha256 of the HTML,
+# pack offset, compressed length, raw length
+RECORD = struct.Struct('<24s32sQII')
+KEY_SIZE = 24
+# zlib preset dictionary: the start of the first archived page. Codeforces
+# pages open with the same ~20 KiB of <head> and menus, which every later
+# page then compresses against.
+DICT_SIZE = 32 * 1024
+COMPRESS_LEVEL = 6
+
+def problem_key(problem_id):
+    return 'p' + problem_id
+
+def contest_key(contest_id):
+    return f'c{contest_id}'
+
+def compress_page(data, zdict=None):
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zdict=zdict) if zdict else zlib.compressobj(COMPRESS_LEVEL)
+    return compressor.compress(data) + compressor.flush()
+
+def decompress_page(blob, zdict=None):
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return decompressor.decompress(blob) + decompressor.flush()
+
+def _paths(directory):
+    return {name: os.path.join(directory, f'pages.{name}') for name in ('pack', 'idx', 'log', 'dict')}
+
+def _read_bytes(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+def _unpack(record):
+    key, digest, offset, size, raw_size = record
+    return key.rstrip(b'\0').decode('ascii'), digest, offset, size, raw_size
+
+def _read_log(path, pack_size):
+    """{key: record} from the append log, skipping a torn last record and
+    records whose blob never fully reached the pack (a crash mid-run)"""
+    data = _read_bytes(path) or b''
+    entries = {}
+    for start in range(0, len(data) - RECORD.size + 1, RECORD.size):
+        record = _unpack(RECORD.unpack_from(data, start))
+        if record[2] + record[3] <= pack_size:
+            entries[record[0]] = record
+    return entries
+
+class PageArchive:
+    """Append-only, compressed, content-addressed archive of fetched pages
+
+    Files in `directory`:
+    - pages.pack: zlib blobs (with a shared preset dictionary, pages.dict),
+      one per distinct HTML, so refetching an unchanged page stores nothing
+    - pages.idx: fixed-size records sorted by key, read through mmap
+    - pages.log: records added since the index was last written; close()
+      merges them into pages.idx. After a crash the log is still valid and
+      is merged the next time the archive is opened.
+    put() is thread-safe; only one process should write at a time.
+    """
+
+    def __init__(self, directory=DEFAULT_ARCHIVE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.paths = _paths(directory)
+        self.lock = threading.Lock()
+        self.zdict = _read_bytes(self.paths['dict'])
+        self.pack_size = os.path.getsize(self.paths['pack']) if os.path.exists(self.paths['pack']) else 0
+
+        with ArchiveReader(directory) as reader:
+            self.entries = {record[0]: record for record in reader.records()}
+        self.blobs = {digest: (offset, size, raw_size) for _, digest, offset, size, raw_size in self.entries.values()}
+        self._write_index()
+
+        self.pack = open(self.paths['pack'], 'ab')
+        self.log = open(self.paths['log'], 'ab')
+        self.added = 0
+        self.stored_bytes = 0
+
+    def _write_index(self):
+        records = [RECORD.pack(key.encode('ascii'), *rest) for key, *rest in sorted(self.entries.values())]
+        write_atomic(self.paths['idx'], INDEX_MAGIC + b''.join(records))
+        if os.path.exists(self.paths['log']):
+            os.remove(self.paths['log'])
+
+    def put(self, key, html):
+        """Store the HTML of one page under key (see problem_key / contest_key)"""
+        if len(key.encode('ascii')) > KEY_SIZE:
+            raise ValueError(f'archive key too long: {key}')
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).digest()
+        with self.lock:
+            if self.zdict is None:
+                self.zdict = data[:DICT_SIZE]
+                write_atomic(self.paths['dict'], self.zdict)
+            known = self.entries.get(key)
+            if known is not None and known[1] == digest:
+                return
+            stored = digest in self.blobs
+        # Compress outside the lock so other fetch threads keep going
+        blob = None if stored else compress_page(data, self.zdict)
+
+        with self.lock:
+            if digest not in self.blobs:
+                self.pack.write(blob)
+                self.pack.flush()
+                self.blobs[digest] = (self.pack_size, len(blob), len(data))
+                self.pack_size += len(blob)
+                self.stored_bytes += len(blob)
+            record = (key, digest, *self.blobs[digest])
+            self.log.write(RECORD.pack(key.encode('ascii'), *record[1:]))
+            self.log.flush()
+            self.entries[key] = record
+            self.added += 1
+
+    def put_problem(self, problem_id, html):
+        self.put(problem_key(problem_id), html)
+
+    def put_contest(self, contest_id, html):
+        self.put(contest_key(contest_id), html)
+
+    def close(self):
+        with self.lock:
+            self.pack.close()
+            self.log.close()
+            self._write_index()
+        if self.added:
+            print(f"Archived {self.added} pages ({self.stored_bytes / 1024:.0f} KiB new compressed data) "
+                  f"in {os.path.dirname(self.paths['pack'])}")
+
+class ArchiveReader:
+    """Read-only view of a PageArchive: the index and pack are memory-mapped
+    and get() binary-searches the sorted index, so opening is instant and
+    nothing is loaded up front. Records still in the log (a fetch running
+    or interrupted) are read too."""
+
+    def __init__(self, directory=DEFAULT_ARCHIVE_DIR):
+        self.paths = _paths(directory)
+        self.zdict = _read_bytes(self.paths['dict'])
+        self._files = []
+        self.index = self._map(self.paths['idx'])
+        self.pack = self._map(self.paths['pack'])
+        if self.index is not None and self.index[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise ValueError(f"{self.paths['idx']} is not a page archive index")
+        index_size = len(self.index) - len(INDEX_MAGIC) if self.index is not None else 0
+        self.count = index_size // RECORD.size
+        self.pending = _read_log(self.paths['log'], len(self.pack) if self.pack is not None else 0)
+
+    def _map(self, path):
+        if not os.path.exists(path) or not os.path.getsize(path):
+            return None
+        f = open(path, 'rb')
+        self._files.append(f)
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _record_at(self, i):
+        return _unpack(RECORD.unpack_from(self.index, len(INDEX_MAGIC) + i * RECORD.size))
+
+    def _key_at(self, i):
+        start = len(INDEX_MAGIC) + i * RECORD.size
+        return self.index[start:start + KEY_SIZE].rstrip(b'\0').decode('ascii')
+
+    def find(self, key):
+        """(key, sha256, offset, compressed length, raw length), or None"""
+        if key in self.pending:
+            return self.pending[key]
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._key_at(low) == key:
+            return self._record_at(low)
+        return None
+
+    def read(self, offset, size):
+        return decompress_page(self.pack[offset:offset + size], self.zdict).decode('utf-8')
+
+    def get(self, key):
+        """The archived HTML for key, or None"""
+        record = self.find(key)
+        return self.read(record[2], record[3]) if record is not None else None
+
+    def records(self):
+        """Every record in key order, log entries replacing indexed ones"""
+        merged = {self._key_at(i): i for i in range(self.count)}
+        merged.update(self.pending)
+        for key in sorted(merged):
+            value = merged[key]
+            yield self._record_at(value) if isinstance(value, int) else value
+
+    def __len__(self):
+        return sum(1 for _ in self.records())
+
+    def close(self):
+        for view in (self.index, self.pack):
+            if view is not None:
+                view.close()
+        for f in self._files:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Archive opened once per re-extract worker process
+_worker_archive = None
+
+def _init_worker(directory):
+    global _worker_archive
+    _worker_archive = ArchiveReader(directory)
+
+def extract_batch(batch, extractor):
+    """Measure a batch of archived (key, offset, compressed length) pages (process pool worker)"""
+    results = []
+    for key, offset, size in batch:
+        html = _worker_archive.read(offset, size)
+        if key.startswith('c'):
+            results.append((key, statement_extractor.statement_lengths_by_index(html, extractor)))
+        else:
+            results.append((key, statement_extractor.statement_length(html, extractor)))
+    return results
+
+def re_extract(directory=DEFAULT_ARCHIVE_DIR, extractor=statement_extractor.DEFAULT_BACKEND,
+               workers=None, batch_size=32):
+    """Measure every archived page again with a process pool, without the network
+
+    Workers map the pack themselves, so only offsets travel to them.
+    Problem pages take precedence over contest pages, as in fetch_problems.
+    Returns ({problemId: length}, number of pages read).
+    """
+    with ArchiveReader(directory) as reader:
+        jobs = [(key, offset, size) for key, _, offset, size, _ in reader.records()]
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+    progress = metrics.Progress(len(batches), every=max(1, len(batches) // 10), label='batches')
+
+    from_contests = {}
+    from_problems = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                initargs=(directory,)) as executor:
+        for results in executor.map(functools.partial(extract_batch, extractor=extractor), batches):
+            for key, value in results:
+                if key.startswith('c'):
+                    from_contests.update({key[1:] + index: length for index, length in value.items()})
+                elif value:
+                    from_problems[key[1:]] = value
+            progress.tick()
+    return {**from_contests, **from_problems}, len(jobs)
+
+def apply_lengths(problems, lengths):
+    """Set new lengths on dataset records (a representative's length covers
+    its mirror aliases) and return how many changed"""
+    changed = 0
+    for problem in problems:
+        length = lengths.get(problem['problemId'])
+        if length is None:
+            length = next((lengths[a] for a in problem.get('aliases', ()) if a in lengths), None)
+        if length is not None and length != problem['length']:
+            problem['length'] = length
+            changed += 1
+    return changed
+
+def print_stats(directory):
+    with ArchiveReader(directory) as reader:
+        records = list(reader.records())
+        packed = len(reader.pack) if reader.pack is not None else 0
+    distinct = {record[1]: record for record in records}
+    raw = sum(record[4] for record in distinct.values())
+    live = sum(record[3] for record in distinct.values())
+    problems = sum(1 for record in records if record[0].startswith('p'))
+    print(f"{directory}: {problems} problem pages, {len(records) - problems} contest pages, "
+          f"{len(distinct)} distinct")
+    print(f"  {raw / 1048576:.1f} MiB of HTML stored in {live / 1048576:.1f} MiB "
+          f"({raw / live if live else 0:.1f}x); pack file {packed / 1048576:.1f} MiB")
+
+def run_re_extract(args):
+    start = time.perf_counter()
+    lengths, pages = re_extract(args.archive_dir, args.extractor, args.workers)
+    seconds = time.perf_counter() - start
+    print(f"Measured {len(lengths)} problems from {pages} archived pages in {seconds:.1f}s "
+          f"({pages / seconds if seconds else 0:.0f} pages/s, {args.extractor} extractor)")
+
+    if args.update_cache:
+        cache = LengthCache(args.cache_path)
+        try:
+            cache.put_many(lengths)
+        finally:
+            cache.close()
+        print(f"Stored {len(lengths)} lengths in {args.cache_path}")
+
+    if args.dataset:
+        problems = dataset_builder.load_problems_js(args.dataset)
+        changed = apply_lengths(problems, lengths)
+        missing = [p['problemId'] for p in problems if p['problemId'] not in lengths
+                   and not any(a in lengths for a in p.get('aliases', ()))]
+        print(f"{changed} of {len(problems)} lengths in {args.dataset} changed")
+        if missing:
+            print(f"  {len(missing)} problems have no archived page and keep their length, "
+                  f"e.g. {', '.join(missing[:5])}")
+        if args.write:
+            dataset_builder.sort_problems(problems)
+            write_atomic(args.dataset, dataset_builder.render_problems_js(
+                problems, dataset_builder.header_lines(problems), args.format))
+            print(f"Written {len(problems)} problems to {args.dataset}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Inspect the archive of fetched pages, or measure '
+                                                 'every archived page again without the network')
+    parser.add_argument('--archive-dir', default=DEFAULT_ARCHIVE_DIR,
+                        help=f'page archive written by fetch_problems.py --archive (default: {DEFAULT_ARCHIVE_DIR})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('stats', help='page counts and compression ratio')
+
+    extract = commands.add_parser('re-extract', help='rerun a statement extractor over every archived page')
+    extract.add_argument('--extractor', choices=sorted(statement_extractor.BACKENDS),
+                         default=statement_extractor.DEFAULT_BACKEND,
+                         help=f'statement length extractor (default: {statement_extractor.DEFAULT_BACKEND})')
+    extract.add_argument('--workers', type=int, help='parser processes (default: one per core)')
+    extract.add_argument('--update-cache', action='store_true',
+                         help='store the new lengths in the length cache, so the next fetch uses them')
+    extract.add_argument('--cache-path', default=DEFAULT_CACHE_PATH,
+                         help=f'statement length cache (default: {DEFAULT_CACHE_PATH})')
+    extract.add_argument('--dataset', default='src/problems.js',
+                         help='problems.js to compare the new lengths against (default: src/problems.js)')
+    extract.add_argument('--write', action='store_true',
+                         help='rewrite --dataset with the new lengths, re-sorted')
+    extract.add_argument('--format', choices=dataset_builder.OUTPUT_FORMATS, default='json',
+                         help='problems.js layout for --write (default: json)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.command == 'stats':
+        print_stats(args.archive_dir)
+    else:
+        run_re_extract(args)
+
+if __name__ == "__main__":
+    main()
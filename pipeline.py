@@ -0,0 +1,172 @@
+import concurrent.futures
+import os
+import queue
+import threading
+import time
+import cf_client
+import fetch_errors
+import metrics
+from rate_limiter import TokenBucket
+
+_DONE = object()
+
+def _timed_parse(parse, html):
+    """Run in a worker process: parse one page and report the CPU time spent"""
+    start = time.process_time()
+    value = parse(html)
+    return value, time.process_time() - start
+
+class StageStats:
+    """Counters for one pipeline stage"""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0     # seconds spent doing useful work
+        self.blocked = 0.0  # seconds spent waiting on a neighbouring stage
+        self.lock = threading.Lock()
+
+    def add(self, busy=0.0, blocked=0.0, items=0):
+        with self.lock:
+            self.items += items
+            self.busy += busy
+            self.blocked += blocked
+
+    def blocked_share(self, wall, waiters):
+        return 100 * self.blocked / (wall * waiters) if wall else 0
+
+    def report(self, wall, workers, waiters=None):
+        capacity = wall * workers
+        rate = self.items / wall if wall else 0
+        busy = 100 * self.busy / capacity if capacity else 0
+        blocked = self.blocked_share(wall, waiters or workers)
+        print(f"  {self.name:8s} {self.items:6d} items  {rate:8.1f}/s  "
+              f"busy {busy:5.1f}%  blocked {blocked:5.1f}%  ({workers} workers)")
+
+def run_pipeline(jobs, parse, io_workers=16, parse_workers=None, rate=10.0,
+                 queue_size=64, timeout=15, on_result=None, bucket=None, on_page=None):
+    """Fetch and parse pages in separate stages
+
+    jobs is a list of (key, url). I/O threads download pages over the shared
+    cf_client session (rate-limited by one token bucket) and push raw HTML
+    into a bounded queue; a process pool runs `parse` (which must be
+    picklable) on every core; the caller's thread collects the results.
+    The bounded queue plus a cap on in-flight parse tasks give backpressure,
+    so memory stays flat however fast the network is.
+    on_result(key, value) is called from the collector as each page finishes,
+    and on_page(key, html) from the I/O threads for every page that came back 200.
+    A shared `bucket` may be passed instead of `rate`; it is told about
+    every success and 429/503.
+
+    Returns {key: parse(html)}, with a FetchFailure for pages that failed.
+    """
+    parse_workers = parse_workers or os.cpu_count() or 1
+    bucket = bucket or TokenBucket(rate)
+    job_queue = queue.Queue()
+    html_queue = queue.Queue(maxsize=queue_size)
+    result_queue = queue.Queue()
+    in_flight = threading.BoundedSemaphore(parse_workers * 2)
+
+    io_stats = StageStats('fetch')
+    parse_stats = StageStats('parse')
+    collect_stats = StageStats('collect')
+
+    for job in jobs:
+        job_queue.put(job)
+
+    def io_worker():
+        while True:
+            try:
+                key, url = job_queue.get_nowait()
+            except queue.Empty:
+                return
+            bucket.acquire()
+            start = time.perf_counter()
+            html = None
+            failure = None
+            try:
+                response = cf_client.get(url, timeout=timeout)
+                if response.status_code == 200:
+                    html = response.text
+                    bucket.on_success()
+                else:
+                    failure = fetch_errors.from_status(response.status_code)
+            except Exception as e:
+                failure = fetch_errors.from_exception(e)
+            fetched = time.perf_counter()
+            metrics.record_request(fetched - start, response.status_code if failure is None
+                                   else failure.status or failure.reason)
+
+            if html is None:
+                if failure.throttled:
+                    bucket.on_throttle()
+                result_queue.put((key, failure))
+            else:
+                fetch_errors.call_page_hook(on_page, key, html)
+                html_queue.put((key, html))  # blocks while parsers are behind
+            io_stats.add(busy=fetched - start, blocked=time.perf_counter() - fetched, items=1)
+
+    def dispatcher(executor):
+        while True:
+            start = time.perf_counter()
+            item = html_queue.get()  # waiting here means the network is behind
+            if item is _DONE:
+                return
+            parse_stats.add(blocked=time.perf_counter() - start)
+            in_flight.acquire()
+
+            key, html = item
+            future = executor.submit(_timed_parse, parse, html)
+
+            def done(future, key=key):
+                in_flight.release()
+                try:
+                    value, cpu = future.result()
+                except Exception as e:
+                    print(f"  Error parsing {key}: {str(e)}")
+                    value, cpu = 0, 0.0
+                value = value or fetch_errors.NO_STATEMENT
+                parse_stats.add(busy=cpu, items=1)
+                metrics.record_work('html parse', cpu)
+                result_queue.put((key, value))
+
+            future.add_done_callback(done)
+
+    start_time = time.perf_counter()
+    results = {}
+    progress = metrics.Progress(len(jobs))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=parse_workers) as executor:
+        io_threads = [threading.Thread(target=io_worker, daemon=True) for _ in range(io_workers)]
+        for thread in io_threads:
+            thread.start()
+        dispatch_thread = threading.Thread(target=dispatcher, args=(executor,), daemon=True)
+        dispatch_thread.start()
+
+        while len(results) < len(jobs):
+            wait_start = time.perf_counter()
+            key, value = result_queue.get()
+            collected = time.perf_counter()
+            results[key] = value
+            if on_result is not None:
+                on_result(key, value)
+            collect_stats.add(busy=time.perf_counter() - collected,
+                              blocked=collected - wait_start, items=1)
+            progress.tick()
+
+        for thread in io_threads:
+            thread.join()
+        html_queue.put(_DONE)
+        dispatch_thread.join()
+
+    wall = time.perf_counter() - start_time
+    print(f"\nPipeline stages ({wall:.1f}s wall):")
+    io_stats.report(wall, io_workers)
+    parse_stats.report(wall, parse_workers, waiters=1)
+    collect_stats.report(wall, 1)
+    if io_stats.blocked_share(wall, io_workers) > parse_stats.blocked_share(wall, 1):
+        print("  Bottleneck: parsing (fetchers waited on a full queue)")
+    else:
+        print("  Bottleneck: network (parsers waited for pages)")
+
+    return results
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from threading import Lock
+
+class TokenBucket:
+    """Global request-rate limiter shared by every worker
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    Each acquire reserves one token; when the bucket is empty the caller
+    waits exactly as long as it takes for its reserved token to refill, so
+    the overall rate holds no matter how many workers are in flight.
+    Safe to share between threads and between coroutines on one loop.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = Lock()
+
+    def _reserve(self):
+        """Take one token and return how long the caller must wait for it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        """Block the calling thread until a token is available"""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Wait (without blocking the event loop) until a token is available"""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_success(self):
+        """Feedback hook: a request went through (fixed-rate bucket ignores it)"""
+
+    def on_throttle(self):
+        """Feedback hook: the server asked us to slow down (429/503)"""
+
+class AdaptiveTokenBucket(TokenBucket):
+    """Token bucket whose rate follows the server's throttling (AIMD)
+
+    Every successful request nudges the rate up additively (about
+    `increase` requests/second per second of traffic) until it is back at
+    `max_rate`; every 429/503 halves it, at most once per `cooldown`
+    seconds so one burst of rejections counts as a single signal.
+    """
+
+    def __init__(self, max_rate, min_rate=0.5, increase=0.5, decrease=0.5, cooldown=2.0):
+        super().__init__(max_rate)
+        self.max_rate = float(max_rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.last_decrease = 0.0
+        self.throttled = 0
+
+    def _set_rate(self, rate):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = min(self.tokens, self.capacity)
+
+    def on_success(self):
+        with self.lock:
+            if self.rate < self.max_rate:
+                self._set_rate(min(self.max_rate, self.rate + self.increase / self.rate))
+
+    def on_throttle(self):
+        with self.lock:
+            self.throttled += 1
+            now = time.monotonic()
+            if now - self.last_decrease < self.cooldown:
+                return
+            self.last_decrease = now
+            self._set_rate(max(self.min_rate, self.rate * self.decrease))
+        print(f"  Throttled by server, slowing down to {self.rate:.1f} requests/s")
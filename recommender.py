@@ -0,0 +1,222 @@
+import argparse
+import base64
+import time
+import numpy as np
+import dataset_builder
+from compare_handles import load_solved
+from journal import write_atomic
+from solved_proxy import DEFAULT_DATASET, DEFAULT_MIN_INTERVAL, DEFAULT_STORE_PATH, SolvedStore
+
+DEFAULT_NEIGHBOURS_PATH = dataset_builder.DEFAULT_NEIGHBOURS_PATH
+NEIGHBOURS_VERSION = 1
+DEFAULT_K = 16
+# Similarity block held in memory at once (rows x all problems, float32)
+BLOCK_BYTES = 64 * 1024 * 1024
+# Relative weight of each feature group in the cosine similarity
+TAG_WEIGHT = 1.0
+RATING_WEIGHT = 0.6
+SOLVE_COUNT_WEIGHT = 0.3
+LENGTH_WEIGHT = 0.2
+# Recommendations centre on a little above the ratings a handle usually solves
+TARGET_PERCENTILE = 80
+TARGET_STEP = 100
+RATING_SPREAD = 250
+
+def _standardize(values):
+    values = np.asarray(values, dtype=np.float32)
+    spread = values.std()
+    return (values - values.mean()) / spread if spread else np.zeros_like(values)
+
+def feature_matrix(problems):
+    """Unit-length float32 rows, one per problem, so a dot product is a cosine similarity
+
+    Columns: tags multi-hot (scaled by 1/sqrt(tag count), so problems with
+    many tags do not dominate), then standardized rating, log solveCount
+    and log length, each scaled by its *_WEIGHT.
+    """
+    tags = sorted({tag for p in problems for tag in p['tags']})
+    tag_ids = {tag: i for i, tag in enumerate(tags)}
+    features = np.zeros((len(problems), len(tags) + 3), dtype=np.float32)
+    for row, problem in enumerate(problems):
+        if problem['tags']:
+            columns = [tag_ids[tag] for tag in problem['tags']]
+            features[row, columns] = TAG_WEIGHT / np.sqrt(len(columns))
+    features[:, -3] = RATING_WEIGHT * _standardize([p['rating'] for p in problems])
+    features[:, -2] = SOLVE_COUNT_WEIGHT * _standardize(np.log1p([p['solveCount'] for p in problems]))
+    features[:, -1] = LENGTH_WEIGHT * _standardize(np.log1p([p['length'] for p in problems]))
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    return features / np.where(norms > 0, norms, 1)
+
+def top_k_neighbours(features, k=DEFAULT_K, block_bytes=BLOCK_BYTES):
+    """(rows, weights): each problem's k most similar other problems, most similar first
+
+    Similarities are computed one block of rows at a time (a float32 matmul
+    against every problem), so memory stays at `block_bytes` instead of the
+    full n x n matrix. Ties are broken by row, so results are reproducible.
+    """
+    count = len(features)
+    k = min(k, count - 1)
+    if k < 1:  # a single problem has no neighbours
+        return np.empty((count, 0), dtype=np.int32), np.empty((count, 0), dtype=np.float32)
+    block_size = max(1, block_bytes // (4 * count))
+    rows = np.empty((count, k), dtype=np.int32)
+    weights = np.empty((count, k), dtype=np.float32)
+    for start in range(0, count, block_size):
+        similarity = features[start:start + block_size] @ features.T
+        local = np.arange(len(similarity))
+        similarity[local, start + local] = -np.inf  # a problem is not its own neighbour
+        candidates = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(similarity, candidates, axis=1)
+        order = np.lexsort((candidates, -scores), axis=1)
+        rows[start:start + block_size] = np.take_along_axis(candidates, order, axis=1)
+        weights[start:start + block_size] = np.take_along_axis(scores, order, axis=1)
+    return rows, weights
+
+def quantize_weights(weights):
+    """Similarities as stored in problemNeighbours.js: uint8 steps of 1/255"""
+    return np.rint(np.clip(weights, 0, 1) * 255).astype(np.uint8)
+
+def dequantize_weights(levels):
+    """float32 similarities from uint8 levels, as decodeNeighbours computes them"""
+    return levels.astype(np.float32) / np.float32(255)
+
+def target_rating(ratings, solved_rows):
+    """Where to aim: a step above the TARGET_PERCENTILE of solved ratings
+
+    Linear interpolation written out as in src/recommendations.js (not
+    np.percentile, whose float steps differ), so both get the same value.
+    """
+    values = sorted(float(ratings[row]) for row in solved_rows)
+    position = (len(values) - 1) * TARGET_PERCENTILE / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low) + TARGET_STEP
+
+def rating_damping(ratings, target):
+    """float32 factors exp(-((rating - target) / RATING_SPREAD)^2); rounding
+    to float32 hides last-bit differences between exp implementations"""
+    distance = (np.asarray(ratings, dtype=np.float64) - target) / RATING_SPREAD
+    return np.exp(-distance * distance).astype(np.float32)
+
+def recommend(rows, weights, ratings, solved_rows, count=20):
+    """(problem rows, scores) of the best unsolved problems for one solved set
+
+    Each solved problem votes for its precomputed neighbours with their
+    similarity (one bincount over len(solved) x k entries), and votes are
+    damped away from target_rating. Cost grows with the solved set, not
+    with the dataset squared. Similarities are used at the uint8 precision
+    the app gets, and every step matches recommendRows in
+    src/recommendations.js, so both rank identically.
+    """
+    solved_rows = np.asarray(sorted(solved_rows), dtype=np.int64)
+    if not solved_rows.size or not rows.shape[1]:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    votes = dequantize_weights(quantize_weights(weights[solved_rows]))
+    scores = np.bincount(rows[solved_rows].ravel(), weights=votes.ravel().astype(np.float64),
+                         minlength=len(rows))
+    scores[solved_rows] = 0
+    scores *= rating_damping(ratings, target_rating(ratings, solved_rows))
+    candidates = np.flatnonzero(scores > 0)
+    best = candidates[np.lexsort((candidates, -scores[candidates]))[:count]]
+    return best, scores[best]
+
+def explain(rows, weights, solved_rows, row):
+    """The solved problem that voted most for `row`, or None"""
+    solved_rows = np.asarray(sorted(solved_rows), dtype=np.int64)
+    votes = np.where(rows[solved_rows] == row, weights[solved_rows], -np.inf).max(axis=1)
+    return int(solved_rows[votes.argmax()]) if np.isfinite(votes.max()) else None
+
+def _encode_array(array):
+    return base64.b64encode(np.ascontiguousarray(array).astype(array.dtype.newbyteorder('<')).tobytes()).decode('ascii')
+
+def neighbours_json(problems, rows, weights):
+    """Neighbour lists for the app: row ids as little-endian uint16 (uint32
+    above 65,535 problems) and similarities quantized to uint8, both base64"""
+    dtype = np.uint16 if len(problems) <= 0xffff else np.uint32
+    return {
+        'version': NEIGHBOURS_VERSION,
+        'dataset': dataset_builder.dataset_fingerprint(problems),
+        'count': len(problems),
+        'k': rows.shape[1],
+        'rowBytes': np.dtype(dtype).itemsize,
+        'rows': _encode_array(rows.astype(dtype)),
+        'weights': _encode_array(quantize_weights(weights)),
+    }
+
+def render_neighbours_js(data):
+    """Source of src/problemNeighbours.js (rank with src/recommendations.js)"""
+    return ('// Top-k similar problems for src/problems.js, generated by recommender.py\n'
+            f'export const problemNeighbours = JSON.parse({dataset_builder._js_string(dataset_builder._dump_json(data))});\n')
+
+def write_neighbours(problems, path=DEFAULT_NEIGHBOURS_PATH, k=DEFAULT_K):
+    """Precompute neighbours for `problems` (in problems.js order) and write them as a JS module"""
+    start = time.perf_counter()
+    rows, weights = top_k_neighbours(feature_matrix(problems), k)
+    seconds = time.perf_counter() - start
+    source = render_neighbours_js(neighbours_json(problems, rows, weights))
+    write_atomic(path, source)
+    print(f"Written {rows.shape[1]} neighbours per problem to {path} "
+          f"({len(source.encode('utf-8')) / 1024:.0f} KiB, computed in {seconds:.2f}s)")
+    return rows, weights
+
+def print_recommendations(handle, problems, rows, weights, solved_rows, count):
+    if not solved_rows:
+        print(f"\n{handle}: no solved problems in the dataset, nothing to go on")
+        return
+    ratings = np.array([p['rating'] for p in problems], dtype=np.float32)
+    start = time.perf_counter()
+    best, scores = recommend(rows, weights, ratings, solved_rows, count)
+    seconds = time.perf_counter() - start
+    print(f"\n{handle}: {len(solved_rows)} solved, aiming at ~{target_rating(ratings, sorted(solved_rows)):.0f} "
+          f"(ranked in {seconds * 1000:.1f} ms)")
+    for row, score in zip(best, scores):
+        problem = problems[row]
+        because = explain(rows, weights, solved_rows, row)
+        like = f", like {problems[because]['problemId']}" if because is not None else ''
+        print(f"  {problem['problemId']:>7s} {problem['rating']:5d}  {problem['name'][:40]:40s} "
+              f"score {score:.2f}{like}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Precompute similar problems and recommend what to solve next')
+    parser.add_argument('--dataset', default=DEFAULT_DATASET,
+                        help=f'problems.js to work on (default: {DEFAULT_DATASET})')
+    parser.add_argument('-k', type=int, default=DEFAULT_K,
+                        help=f'neighbours kept per problem (default: {DEFAULT_K})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='write the neighbour lists the app ranks with')
+    build.add_argument('--output', default=DEFAULT_NEIGHBOURS_PATH,
+                       help=f'JS module to write (default: {DEFAULT_NEIGHBOURS_PATH})')
+
+    rank = commands.add_parser('recommend', help='rank unsolved problems for handles')
+    rank.add_argument('handles', nargs='+', help='Codeforces handles')
+    rank.add_argument('--count', type=int, default=20, help='problems to list per handle (default: 20)')
+    rank.add_argument('--store-path', default=DEFAULT_STORE_PATH,
+                      help=f'solved-set store shared with solved_proxy.py (default: {DEFAULT_STORE_PATH})')
+    rank.add_argument('--offline', action='store_true',
+                      help='use stored solved sets only, without calling Codeforces')
+    rank.add_argument('--min-interval', type=float, default=DEFAULT_MIN_INTERVAL,
+                      help=f'reuse solved sets checked this many seconds ago (default: {DEFAULT_MIN_INTERVAL})')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    problems = dataset_builder.load_problems_js(args.dataset)
+    if args.command == 'build':
+        write_neighbours(problems, args.output, args.k)
+        return
+
+    store = SolvedStore(args.store_path)
+    try:
+        handles, solved_sets = load_solved(args.handles, store, args.dataset, args.offline, args.min_interval)
+    finally:
+        store.close()
+
+    rows, weights = top_k_neighbours(feature_matrix(problems), args.k)
+    problem_rows = dataset_builder.problem_rows(problems)
+    for handle, solved in zip(handles, solved_sets):
+        solved_rows = {problem_rows[p] for p in solved if p in problem_rows}
+        print_recommendations(handle, problems, rows, weights, solved_rows, args.count)
+
+if __name__ == "__main__":
+    main()
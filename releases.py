@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import dataset_builder
+from journal import write_atomic
+
+DEFAULT_RELEASE_DIR = dataset_builder.DEFAULT_RELEASE_DIR
+RELEASE_FORMAT = 1
+# Field order of the records apply_delta rebuilds (the order build_problem writes)
+RECORD_FIELDS = ['name', 'rating', 'tags', 'solveCount', 'length', 'link', 'problemId', 'aliases']
+
+def _id_key(problem_id):
+    contest_id, index = dataset_builder.PROBLEM_ID_RE.match(problem_id).groups()
+    return int(contest_id), index
+
+def _dump(data):
+    return (json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+
+def diff_problems(old, new):
+    """Delta turning dataset `old` into `new`, keyed by problemId
+
+    - added: full records (without link) of new problems
+    - removed: problemIds that disappeared
+    - changed: per field, the problemIds whose value changed and their new
+      values (None removes the field), e.g. most refreshes only touch
+      solveCount, stored as {'solveCount': {'ids': [...], 'values': [...]}}
+    Everything is sorted, so the same two datasets give the same bytes.
+    """
+    old_records = {p['problemId']: dataset_builder.release_record(p) for p in old}
+    new_records = {p['problemId']: dataset_builder.release_record(p) for p in new}
+    changed = {}
+    for problem_id in sorted(old_records.keys() & new_records.keys(), key=_id_key):
+        before, after = old_records[problem_id], new_records[problem_id]
+        for field in sorted(before.keys() | after.keys()):
+            if before.get(field) != after.get(field):
+                column = changed.setdefault(field, {'ids': [], 'values': []})
+                column['ids'].append(problem_id)
+                column['values'].append(after.get(field))
+    return {
+        'format': RELEASE_FORMAT,
+        'from': dataset_builder.dataset_version(old),
+        'to': dataset_builder.dataset_version(new),
+        'count': len(new),
+        'added': [new_records[i] for i in sorted(new_records.keys() - old_records.keys(), key=_id_key)],
+        'removed': sorted(old_records.keys() - new_records.keys(), key=_id_key),
+        'changed': dict(sorted(changed.items())),
+    }
+
+def apply_delta(problems, delta):
+    """Apply a diff_problems delta and return the new dataset in dataset order
+
+    Raises ValueError if the result does not hash to the delta's target
+    version (e.g. it was applied to the wrong base).
+    """
+    records = {p['problemId']: dataset_builder.release_record(p) for p in problems}
+    for problem_id in delta['removed']:
+        del records[problem_id]
+    for field, column in delta['changed'].items():
+        for problem_id, value in zip(column['ids'], column['values']):
+            if value is None:
+                records[problem_id].pop(field, None)
+            else:
+                records[problem_id][field] = value
+    for record in delta['added']:
+        records[record['problemId']] = dict(record)
+
+    result = []
+    for record in records.values():
+        record['link'] = dataset_builder.problem_link(record['problemId'])
+        result.append({field: record[field] for field in RECORD_FIELDS if field in record})
+    dataset_builder.sort_problems(result)
+    if dataset_builder.dataset_version(result) != delta['to']:
+        raise ValueError(f"delta {delta['from']} -> {delta['to']} did not reproduce {delta['to']}")
+    return result
+
+def load_manifest(release_dir=DEFAULT_RELEASE_DIR):
+    path = os.path.join(release_dir, 'releases.json')
+    if not os.path.exists(path):
+        return {'format': RELEASE_FORMAT, 'latest': None, 'releases': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _read_json(release_dir, name):
+    with open(os.path.join(release_dir, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_snapshot(release_dir, version):
+    return dataset_builder.decode_compact(_read_json(release_dir, f'snapshot-{version}.json'))
+
+def write_release(problems, release_dir=DEFAULT_RELEASE_DIR, keep_snapshots=1):
+    """Publish `problems` as a content-hashed release with a delta from the previous one
+
+    Writes snapshot-<version>.json (compact encoding),
+    delta-<previous>-<version>.json and releases.json, which lists every
+    release with its parent, snapshot, delta and sizes. Nothing is written
+    when the data matches the latest release. Deltas are kept for every
+    release; only the newest `keep_snapshots` snapshots are kept.
+    Returns the manifest.
+    """
+    manifest = load_manifest(release_dir)
+    version = dataset_builder.dataset_version(problems)
+    parent = manifest['latest']
+    if version == parent:
+        print(f"Dataset unchanged, release {version} is current")
+        return manifest
+
+    snapshot = _dump(dataset_builder.encode_compact(problems))
+    entry = {'version': version, 'parent': parent, 'count': len(problems),
+             'snapshot': f'snapshot-{version}.json', 'snapshotBytes': len(snapshot),
+             'delta': None, 'deltaBytes': None, 'summary': None}
+    write_atomic(os.path.join(release_dir, entry['snapshot']), snapshot)
+
+    previous = None
+    if parent is not None and os.path.exists(os.path.join(release_dir, f'snapshot-{parent}.json')):
+        previous = load_snapshot(release_dir, parent)
+    if previous is not None:
+        delta = diff_problems(previous, problems)
+        apply_delta(previous, delta)  # refuse to publish a delta that does not replay
+        data = _dump(delta)
+        entry.update(delta=f'delta-{parent}-{version}.json', deltaBytes=len(data), summary={
+            'added': len(delta['added']),
+            'removed': len(delta['removed']),
+            'changed': {field: len(column['ids']) for field, column in delta['changed'].items()},
+        })
+        write_atomic(os.path.join(release_dir, entry['delta']), data)
+    elif parent is not None:
+        print(f"Snapshot of {parent} is missing, publishing {version} without a delta")
+
+    manifest['releases'].append(entry)
+    manifest['latest'] = version
+    for old in manifest['releases'][:-keep_snapshots]:
+        if old['snapshot'] is not None:
+            path = os.path.join(release_dir, old['snapshot'])
+            if os.path.exists(path):
+                os.remove(path)
+            old['snapshot'] = None
+    write_atomic(os.path.join(release_dir, 'releases.json'), json.dumps(manifest, indent=2) + '\n')
+
+    if entry['delta']:
+        summary = entry['summary']
+        print(f"Release {version}: +{summary['added']} -{summary['removed']} "
+              f"~{sum(summary['changed'].values())} field changes, delta {entry['deltaBytes'] / 1024:.1f} KiB "
+              f"vs {entry['snapshotBytes'] / 1024:.0f} KiB snapshot")
+    else:
+        print(f"Release {version}: first snapshot, {entry['snapshotBytes'] / 1024:.0f} KiB")
+    return manifest
+
+def delta_chain(manifest, version):
+    """Delta files leading from `version` to the latest release, or None if there is no path"""
+    by_parent = {entry['parent']: entry for entry in manifest['releases'] if entry['parent'] is not None}
+    chain = []
+    while version != manifest['latest']:
+        entry = by_parent.get(version)
+        if entry is None or entry['delta'] is None:
+            return None
+        chain.append(entry['delta'])
+        version = entry['version']
+    return chain
+
+def update_to_latest(problems, release_dir=DEFAULT_RELEASE_DIR):
+    """Bring a dataset to the latest release by replaying deltas (or from the latest snapshot)"""
+    manifest = load_manifest(release_dir)
+    if manifest['latest'] is None:
+        raise ValueError(f'no releases in {release_dir}')
+    chain = delta_chain(manifest, dataset_builder.dataset_version(problems))
+    if chain is None:
+        print(f"No delta path from this dataset, loading snapshot {manifest['latest']}")
+        return load_snapshot(release_dir, manifest['latest'])
+    for name in chain:
+        problems = apply_delta(problems, _read_json(release_dir, name))
+    print(f"Applied {len(chain)} deltas, now at release {manifest['latest']}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description='Update problems.js to the latest dataset release')
+    parser.add_argument('--dataset', default='src/problems.js', help='problems.js to update in place')
+    parser.add_argument('--release-dir', default=DEFAULT_RELEASE_DIR,
+                        help=f'release directory (default: {DEFAULT_RELEASE_DIR})')
+    parser.add_argument('--format', choices=dataset_builder.OUTPUT_FORMATS, default='json',
+                        help='problems.js layout to write (default: json)')
+    args = parser.parse_args()
+
+    problems = update_to_latest(dataset_builder.load_problems_js(args.dataset), args.release_dir)
+    version = dataset_builder.dataset_version(problems)
+    content = dataset_builder.render_problems_js(problems, dataset_builder.header_lines(problems), args.format)
+    write_atomic(args.dataset, content)
+    print(f"Written {len(problems)} problems to {args.dataset} (release {version})")
+
+if __name__ == "__main__":
+    main()
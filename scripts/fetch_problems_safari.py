@@ -1,39 +1,33 @@
-import requests
-import json
+import argparse
+import os
+import sys
 import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.safari.options import Options as SafariOptions
 
+# Shared Codeforces client lives in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cf_client
+import dataset_builder
+import mirrors
+from journal import Journal, write_atomic
+
+DEFAULT_JOURNAL_PATH = '.cache/safari_journal.ndjson'
+
 def fetch_codeforces_problems():
     """Fetch all problems from Codeforces API"""
     print("Fetching problems from Codeforces API...")
-    url = "https://codeforces.com/api/problemset.problems"
     
-    response = requests.get(url, timeout=30)
-    data = response.json()
-    
-    if data['status'] != 'OK':
-        print("Error: API returned non-OK status")
+    try:
+        rated, problem_stats = cf_client.load_rated_problems(1600, 3000)
+    except cf_client.APIError as e:
+        print(f"Error: API returned non-OK status ({e})")
         return []
     
     problems = []
-    problem_stats = {}
-    
-    # Create a mapping of problem ID to statistics
-    for stat in data['result']['problemStatistics']:
-        problem_id = str(stat['contestId']) + stat['index']
-        problem_stats[problem_id] = stat
-    
-    # Filter problems first
-    for problem in data['result']['problems']:
-        if 'rating' not in problem:
-            continue
-        
+    for problem in rated:
         rating = problem['rating']
-        if rating < 1600 or rating > 3000:
-            continue
-        
         contest_id = problem['contestId']
         index = problem['index']
         problem_id = str(contest_id) + index
@@ -52,10 +46,61 @@ def fetch_codeforces_problems():
         })
     
     print(f"Found {len(problems)} problems (rating 1600-3000)")
+    
+    # Measure one copy of each Div.1/Div.2 mirror pair
+    solved_counts = {p['problemId']: p['solveCount'] for p in problems}
+    problems, aliases = mirrors.dedupe_mirrors(problems, solved_counts, mirrors.load_contest_rounds())
+    mirrors.attach_aliases(problems, aliases, solved_counts)
     return problems
 
-def fetch_lengths_with_safari(problems):
-    """Fetch problem lengths using Safari"""
+def fill_lengths_by_contest(driver, problems, journal=None):
+    """Measure statements from one /contest/{id}/problems page per contest
+
+    Sets 'length' on every problem found there and returns how many were
+    filled; the rest are left at 0 for the per-problem pass.
+    """
+    contests = {}
+    for problem in problems:
+        if problem['length'] == 0:
+            contests.setdefault(problem['contestId'], []).append(problem)
+    
+    print(f"Fetching {len(contests)} contest pages for {len(problems)} problems...")
+    filled = 0
+    for i, (contest_id, contest_problems) in enumerate(contests.items()):
+        try:
+            driver.get(cf_client.contest_problems_url(contest_id))
+            time.sleep(1)
+            
+            lengths = {}
+            for holder in driver.find_elements(By.CLASS_NAME, 'problemindexholder'):
+                index = holder.get_attribute('problemindex')
+                statements = holder.find_elements(By.CLASS_NAME, 'problem-statement')
+                if index and statements:
+                    lengths[index] = len(statements[0].text)
+            
+            for problem in contest_problems:
+                if lengths.get(problem['index'], 0) > 0:
+                    problem['length'] = lengths[problem['index']]
+                    filled += 1
+                    if journal is not None:
+                        journal.record(problem['problemId'], problem['length'])
+        except Exception as e:
+            print(f"  Contest {contest_id} failed: {str(e)}")
+        
+        if (i + 1) % 50 == 0:
+            print(f"  Processed {i + 1}/{len(contests)} contests ({filled} problems measured)")
+    
+    print(f"Contest pages measured {filled} problems, "
+          f"{len(problems) - filled} fall back to problem pages\n")
+    return filled
+
+def fetch_lengths_with_safari(problems, by_contest=False, journal=None):
+    """Fetch problem lengths using Safari
+
+    If a Journal is given, problems it already holds are skipped and every
+    newly measured problem is appended to it as soon as it is done.
+    Returns None if Safari cannot be started.
+    """
     print("\nSetting up Safari browser...")
     print("NOTE: You may need to enable 'Allow Remote Automation' in Safari's Develop menu")
     print("Safari > Develop > Allow Remote Automation\n")
@@ -68,7 +113,7 @@ def fetch_lengths_with_safari(problems):
         print("1. Open Safari")
         print("2. Enable Develop menu: Safari > Settings > Advanced > Show Develop menu")
         print("3. Enable: Develop > Allow Remote Automation")
-        return problems
+        return None
     
     print(f"Fetching lengths for {len(problems)} problems...")
     print("This will take approximately 20-30 minutes...\n")
@@ -76,9 +121,23 @@ def fetch_lengths_with_safari(problems):
     successful = 0
     failed = 0
     
+    if journal is not None:
+        completed = journal.completed()
+        for problem in problems:
+            if problem['problemId'] in completed:
+                problem['length'] = completed[problem['problemId']]['length']
+                successful += 1
+        if completed:
+            print(f"Resuming: {successful} problems already in the journal")
+    
+    if by_contest:
+        successful += fill_lengths_by_contest(driver, problems, journal)
+    
     for i, problem in enumerate(problems):
+        if problem['length'] > 0:
+            continue
         try:
-            url = f"https://codeforces.com/contest/{problem['contestId']}/problem/{problem['index']}"
+            url = cf_client.contest_problem_url(problem['contestId'], problem['index'])
             driver.get(url)
             
             # Wait for page to load
@@ -101,6 +160,9 @@ def fetch_lengths_with_safari(problems):
                     problem['length'] = 0
                     failed += 1
             
+            if journal is not None:
+                journal.record(problem['problemId'], problem['length'])
+            
             # Progress update
             if (i + 1) % 100 == 0:
                 print(f"  Processed {i + 1}/{len(problems)} problems (Success: {successful}, Failed: {failed})")
@@ -129,23 +191,29 @@ def fetch_lengths_with_safari(problems):
 
 def save_problems(problems):
     """Save problems to problems.js file"""
-    # Sort by length
-    problems.sort(key=lambda x: x['length'])
+    # Sort by length (ties by problemId, so the order is reproducible)
+    dataset_builder.sort_problems(problems)
     
     output_path = 'src/problems.js'
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('// Problem data extracted from Codeforces\n')
-        f.write(f'// Last updated: {__import__("datetime").datetime.now().strftime("%Y-%m-%d %H:%M:%S")}\n')
-        f.write('// Total problems: ' + str(len(problems)) + '\n')
-        f.write('export const problems = ')
-        f.write(json.dumps(problems, indent=2, ensure_ascii=False))
-        f.write(';\n')
+    write_atomic(output_path, dataset_builder.render_problems_js(
+        problems, dataset_builder.header_lines(problems, 'Problem data extracted from Codeforces')))
     
     print(f"\n✅ Successfully written {len(problems)} problems to {output_path}")
     print(f"   Problems sorted by length (ascending)")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Fetch Codeforces problem lengths with Safari')
+    parser.add_argument('--by-contest', action='store_true',
+                        help='load one /contest/{id}/problems page per contest, '
+                             'falling back to problem pages where it fails')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue an interrupted run, skipping problems already in the journal')
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    
     print("=" * 60)
     print("Codeforces Problem Fetcher (Safari)")
     print("=" * 60)
@@ -157,8 +225,14 @@ def main():
         print("No problems fetched. Exiting.")
         return
     
+    journal = Journal(DEFAULT_JOURNAL_PATH, resume=args.resume)
+    
     # Fetch lengths using Safari
-    problems = fetch_lengths_with_safari(problems)
+    problems = fetch_lengths_with_safari(problems, args.by_contest, journal)
+    
+    if problems is None:
+        print("Safari did not start; nothing written and the journal is kept. Exiting.")
+        return
     
     if not problems:
         print("No problem lengths fetched. Exiting.")
@@ -166,6 +240,7 @@ def main():
     
     # Save to file
     save_problems(problems)
+    journal.discard()
     
     print("\n" + "=" * 60)
     print("✅ Update complete!")
@@ -1,41 +1,39 @@
-import requests
-import json
-import time
+import argparse
+import os
+import queue
+import sys
+from threading import Lock, Thread
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
 
+# Shared Codeforces client lives in the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cf_client
+import dataset_builder
+import mirrors
+from journal import Journal, write_atomic
+
+DEFAULT_JOURNAL_PATH = '.cache/selenium_journal.ndjson'
+
 def fetch_codeforces_problems():
     """Fetch all problems from Codeforces API"""
     print("Fetching problems from Codeforces API...")
-    url = "https://codeforces.com/api/problemset.problems"
-    
-    response = requests.get(url, timeout=30)
-    data = response.json()
     
-    if data['status'] != 'OK':
-        print("Error: API returned non-OK status")
+    try:
+        rated, problem_stats = cf_client.load_rated_problems(1600, 3000)
+    except cf_client.APIError as e:
+        print(f"Error: API returned non-OK status ({e})")
         return []
     
     problems = []
-    problem_stats = {}
-    
-    # Create a mapping of problem ID to statistics
-    for stat in data['result']['problemStatistics']:
-        problem_id = str(stat['contestId']) + stat['index']
-        problem_stats[problem_id] = stat
-    
-    # Filter problems first
-    for problem in data['result']['problems']:
-        if 'rating' not in problem:
-            continue
-        
+    for problem in rated:
         rating = problem['rating']
-        if rating < 1600 or rating > 3000:
-            continue
-        
         contest_id = problem['contestId']
         index = problem['index']
         problem_id = str(contest_id) + index
@@ -54,13 +52,18 @@ def fetch_codeforces_problems():
         })
     
     print(f"Found {len(problems)} problems (rating 1600-3000)")
+    
+    # Measure one copy of each Div.1/Div.2 mirror pair
+    solved_counts = {p['problemId']: p['solveCount'] for p in problems}
+    problems, aliases = mirrors.dedupe_mirrors(problems, solved_counts, mirrors.load_contest_rounds())
+    mirrors.attach_aliases(problems, aliases, solved_counts)
     return problems
 
-def fetch_lengths_with_selenium(problems):
-    """Fetch problem lengths using Selenium"""
-    print("\nSetting up Chrome browser...")
-    
-    # Setup Chrome options
+STATEMENT_SELECTOR = '.problem-statement, .problemindexholder'
+MAX_ATTEMPTS = 3  # per item, counting attempts lost to a crashed driver
+
+def make_driver(driver_path):
+    """Start one headless Chrome that returns as soon as the DOM is ready"""
     chrome_options = Options()
     chrome_options.add_argument('--headless')  # Run in background
     chrome_options.add_argument('--no-sandbox')
@@ -68,51 +71,204 @@ def fetch_lengths_with_selenium(problems):
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
+    # Don't wait for images, fonts and ads; the statement is in the DOM
+    chrome_options.page_load_strategy = 'eager'
+    return webdriver.Chrome(service=Service(driver_path), options=chrome_options)
+
+def driver_alive(driver):
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+def measure_problem(driver, problem, wait):
+    """Load one problem page and set its length; returns True on success"""
+    url = cf_client.contest_problem_url(problem['contestId'], problem['index'])
+    driver.get(url)
+    WebDriverWait(driver, wait).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, STATEMENT_SELECTOR))
+    )
+    
+    # Find problem statement, falling back to the alternative selector
+    statements = driver.find_elements(By.CLASS_NAME, 'problem-statement')
+    if not statements:
+        statements = driver.find_elements(By.CLASS_NAME, 'problemindexholder')
+    if not statements:
+        return False
+    
+    problem['length'] = len(statements[0].text)
+    return problem['length'] > 0
+
+def measure_contest(driver, contest_problems, wait):
+    """Load a /contest/{id}/problems page and set the length of every problem on it"""
+    driver.get(cf_client.contest_problems_url(contest_problems[0]['contestId']))
+    WebDriverWait(driver, wait).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, '.problemindexholder .problem-statement'))
+    )
+    
+    lengths = {}
+    for holder in driver.find_elements(By.CLASS_NAME, 'problemindexholder'):
+        index = holder.get_attribute('problemindex')
+        statements = holder.find_elements(By.CLASS_NAME, 'problem-statement')
+        if index and statements:
+            lengths[index] = len(statements[0].text)
+    
+    for problem in contest_problems:
+        if lengths.get(problem['index'], 0) > 0:
+            problem['length'] = lengths[problem['index']]
+    return any(p['length'] > 0 for p in contest_problems)
+
+def run_driver_pool(items, visit, workers, driver_path, label, wait=15, on_done=None):
+    """Run visit(driver, item, wait) over items on a pool of headless drivers
+
+    Workers share one queue. If a driver crashes mid-item (whatever the
+    error, e.g. a refused connection once chromedriver is gone) it is
+    restarted and the item goes back on the queue, so nothing is lost.
+    Items still queued when the last worker gives up count as failed.
+    on_done(item) is called once each item is finished.
+    Returns (successful, failed) item counts.
+    """
+    work = queue.Queue()
+    for item in items:
+        work.put((item, 0))
+    
+    counts = {'successful': 0, 'failed': 0, 'restarts': 0, 'workers': workers}
+    lock = Lock()
     
-    # Setup ChromeDriver with webdriver-manager
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    def record(item, ok):
+        if on_done is not None:
+            on_done(item)
+        with lock:
+            counts['successful' if ok else 'failed'] += 1
+            done = counts['successful'] + counts['failed']
+            if done % 100 == 0:
+                print(f"  Processed {done}/{len(items)} {label} "
+                      f"(Success: {counts['successful']}, Failed: {counts['failed']})")
     
-    print(f"Fetching lengths for {len(problems)} problems...")
-    print("This will take approximately 20-30 minutes...\n")
+    def drain():
+        """Count everything left in the queue as failed (no browser is left to run it)"""
+        left = 0
+        while True:
+            try:
+                item, _ = work.get_nowait()
+            except queue.Empty:
+                break
+            record(item, False)
+            left += 1
+        if left:
+            print(f"  No browser left for {left} {label}, counted as failed")
     
-    successful = 0
-    failed = 0
+    def worker():
+        try:
+            run_worker()
+        finally:
+            with lock:
+                counts['workers'] -= 1
+                last = counts['workers'] == 0
+            if last:
+                drain()
     
-    for i, problem in enumerate(problems):
+    def run_worker():
         try:
-            url = f"https://codeforces.com/contest/{problem['contestId']}/problem/{problem['index']}"
-            driver.get(url)
-            
-            # Wait for problem statement to load
-            time.sleep(0.5)  # Small delay to let page load
+            driver = make_driver(driver_path)
+        except Exception as e:
+            print(f"  Could not start a browser: {str(e)}")
+            return
+        
+        while True:
+            try:
+                item, attempts = work.get_nowait()
+            except queue.Empty:
+                break
             
-            # Find problem statement
             try:
-                problem_statement = driver.find_element(By.CLASS_NAME, 'problem-statement')
-                text = problem_statement.text
-                problem['length'] = len(text)
-                successful += 1
-            except:
-                # Try alternative selector
-                try:
-                    problem_statement = driver.find_element(By.CLASS_NAME, 'problemindexholder')
-                    text = problem_statement.text
-                    problem['length'] = len(text)
-                    successful += 1
-                except:
-                    problem['length'] = 0
-                    failed += 1
+                ok = visit(driver, item, wait)
+            except TimeoutException:
+                ok = False
+            except Exception:
+                if driver_alive(driver):
+                    ok = False
+                else:
+                    # Driver crashed: replace it and hand the item back
+                    with lock:
+                        counts['restarts'] += 1
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+                    if attempts + 1 < MAX_ATTEMPTS:
+                        work.put((item, attempts + 1))
+                    else:
+                        record(item, False)
+                    try:
+                        driver = make_driver(driver_path)
+                    except Exception as e:
+                        print(f"  Could not restart browser: {str(e)}")
+                        return
+                    continue
             
-            # Progress update
-            if (i + 1) % 100 == 0:
-                print(f"  Processed {i + 1}/{len(problems)} problems (Success: {successful}, Failed: {failed})")
+            record(item, ok)
         
-        except Exception as e:
-            problem['length'] = 0
-            failed += 1
+        driver.quit()
+    
+    threads = [Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    if counts['restarts']:
+        print(f"  Restarted {counts['restarts']} crashed browser(s)")
+    return counts['successful'], counts['failed']
+
+def journal_problems(journal, problems):
+    for problem in problems:
+        journal.record(problem['problemId'], problem['length'])
+
+def fetch_lengths_with_selenium(problems, by_contest=False, workers=4, journal=None):
+    """Fetch problem lengths using a pool of headless Chrome instances
+
+    If a Journal is given, problems it already holds are skipped and every
+    newly measured problem is appended to it as soon as it is done.
+    """
+    on_problem_done = on_contest_done = None
+    if journal is not None:
+        completed = journal.completed()
+        for problem in problems:
+            if problem['problemId'] in completed:
+                problem['length'] = completed[problem['problemId']]['length']
+        if completed:
+            print(f"\nResuming: {len(completed)} problems already in the journal")
+        on_problem_done = lambda problem: journal_problems(journal, [problem])
+        on_contest_done = lambda contest_problems: journal_problems(
+            journal, [p for p in contest_problems if p['length'] > 0])
+    
+    print("\nSetting up Chrome browsers...")
+    
+    # Setup ChromeDriver with webdriver-manager (shared by every browser)
+    driver_path = ChromeDriverManager().install()
+    
+    print(f"Fetching lengths for {len(problems)} problems with {workers} browsers...")
     
-    driver.quit()
+    if by_contest:
+        contests = {}
+        for problem in problems:
+            if problem['length'] == 0:
+                contests.setdefault(problem['contestId'], []).append(problem)
+        print(f"Fetching {len(contests)} contest pages for {len(problems)} problems...")
+        run_driver_pool(list(contests.values()), measure_contest, workers, driver_path, 'contests',
+                        on_done=on_contest_done)
+        filled = sum(1 for p in problems if p['length'] > 0)
+        print(f"Contest pages measured {filled} problems, "
+              f"{len(problems) - filled} fall back to problem pages\n")
+    
+    remaining = [p for p in problems if p['length'] == 0]
+    run_driver_pool(remaining, measure_problem, workers, driver_path, 'problems',
+                    on_done=on_problem_done)
+    
+    successful = sum(1 for p in problems if p['length'] > 0)
+    failed = len(problems) - successful
     
     print(f"\n✅ Fetching complete!")
     print(f"  Successful: {successful}")
@@ -130,23 +286,31 @@ def fetch_lengths_with_selenium(problems):
 
 def save_problems(problems):
     """Save problems to problems.js file"""
-    # Sort by length
-    problems.sort(key=lambda x: x['length'])
+    # Sort by length (ties by problemId, so the order is reproducible)
+    dataset_builder.sort_problems(problems)
     
     output_path = 'src/problems.js'
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write('// Problem data extracted from Codeforces\n')
-        f.write(f'// Last updated: {__import__("datetime").datetime.now().strftime("%Y-%m-%d %H:%M:%S")}\n')
-        f.write('// Total problems: ' + str(len(problems)) + '\n')
-        f.write('export const problems = ')
-        f.write(json.dumps(problems, indent=2, ensure_ascii=False))
-        f.write(';\n')
+    write_atomic(output_path, dataset_builder.render_problems_js(
+        problems, dataset_builder.header_lines(problems, 'Problem data extracted from Codeforces')))
     
     print(f"\n✅ Successfully written {len(problems)} problems to {output_path}")
     print(f"   Problems sorted by length (ascending)")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Fetch Codeforces problem lengths with Selenium')
+    parser.add_argument('--by-contest', action='store_true',
+                        help='load one /contest/{id}/problems page per contest, '
+                             'falling back to problem pages where it fails')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue an interrupted run, skipping problems already in the journal')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='number of headless browsers to run in parallel (default: 4)')
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    
     print("=" * 60)
     print("Codeforces Problem Fetcher (Selenium)")
     print("=" * 60)
@@ -158,11 +322,14 @@ def main():
         print("No problems fetched. Exiting.")
         return
     
+    journal = Journal(DEFAULT_JOURNAL_PATH, resume=args.resume)
+    
     # Fetch lengths using Selenium
-    problems = fetch_lengths_with_selenium(problems)
+    problems = fetch_lengths_with_selenium(problems, args.by_contest, args.workers, journal)
     
     # Save to file
     save_problems(problems)
+    journal.discard()
     
     print("\n" + "=" * 60)
     print("✅ Update complete!")
@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from urllib.parse import parse_qs, urlsplit
+import cf_client
+import dataset_builder
+from rate_limiter import TokenBucket
+
+DEFAULT_STORE_PATH = '.cache/solved.sqlite'
+DEFAULT_DATASET = 'src/problems.js'
+DEFAULT_PORT = 8787
+DEFAULT_MIN_INTERVAL = 60  # seconds a handle's stored set is served without asking Codeforces
+FIRST_PAGE = 100  # a repeat check usually finds all of its new submissions here
+MAX_PAGE = 10000
+PENDING_VERDICTS = {None, 'TESTING'}
+
+class SolvedStore:
+    """On-disk solved sets keyed by handle, with the submission id each is complete up to"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = Lock()
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS handles ('
+            ' handle TEXT PRIMARY KEY,'
+            ' watermark INTEGER NOT NULL,'
+            ' checked_at REAL NOT NULL)'
+        )
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS solved ('
+            ' handle TEXT NOT NULL,'
+            ' problem_id TEXT NOT NULL,'
+            ' PRIMARY KEY (handle, problem_id)) WITHOUT ROWID'
+        )
+        self.conn.commit()
+
+    def state(self, handle):
+        """(watermark, checked_at) for a handle; (0, None) if it was never checked"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT watermark, checked_at FROM handles WHERE handle = ?', (handle,)
+            ).fetchone()
+        return row or (0, None)
+
+    def solved(self, handle):
+        with self.lock:
+            return {problem_id for (problem_id,) in self.conn.execute(
+                'SELECT problem_id FROM solved WHERE handle = ?', (handle,)
+            )}
+
+    def update(self, handle, watermark, new_solved):
+        """Add newly solved problemIds and move the handle's watermark"""
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO solved (handle, problem_id) VALUES (?, ?)',
+                [(handle, problem_id) for problem_id in new_solved]
+            )
+            self.conn.execute(
+                'INSERT OR REPLACE INTO handles (handle, watermark, checked_at) VALUES (?, ?, ?)',
+                (handle, watermark, time.time())
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+def fetch_new_submissions(handle, watermark=0, bucket=None, timeout=30):
+    """Page through user.status (newest first) until reaching `watermark`
+
+    Returns every submission with an id above the watermark. A repeat
+    check starts with a FIRST_PAGE-sized page and only grows the page size
+    (10x per page, up to MAX_PAGE) if all of it was new; a first check
+    starts at MAX_PAGE. Submissions that arrive while paging shift the
+    pages, which can repeat an item but never skip one.
+    """
+    submissions = []
+    start = 1
+    count = FIRST_PAGE if watermark else MAX_PAGE
+    while True:
+        if bucket is not None:
+            bucket.acquire()
+        response = cf_client.get(cf_client.api_url('user.status'), timeout=timeout,
+                                 params={'handle': handle, 'from': start, 'count': count})
+        try:
+            data = response.json()
+        except ValueError:
+            raise cf_client.APIError(f'user.status answered HTTP {response.status_code}')
+        if data.get('status') != 'OK':
+            raise cf_client.APIError(data.get('comment') or f'user.status answered HTTP {response.status_code}')
+
+        page = data['result']
+        for submission in page:
+            if submission['id'] <= watermark:
+                return submissions
+            submissions.append(submission)
+        if len(page) < count:
+            return submissions
+        start += count
+        count = min(count * 10, MAX_PAGE)
+
+def advance_watermark(watermark, submissions):
+    """Highest submission id below which every submission has a final verdict
+
+    A submission still in the queue may turn into an accept later, so the
+    watermark stops just short of the oldest one and it is fetched again
+    on the next check.
+    """
+    pending = [s['id'] for s in submissions if s.get('verdict') in PENDING_VERDICTS]
+    if pending:
+        return max(watermark, min(pending) - 1)
+    return max([watermark] + [s['id'] for s in submissions])
+
+def solved_problem_ids(submissions):
+    return {
+        str(s['problem']['contestId']) + s['problem']['index']
+        for s in submissions
+        if s.get('verdict') == 'OK' and s['problem'].get('contestId')
+    }
+
+class SolvedService:
+    """Incremental solved sets for the app, answered from the store when possible
+
+    Only submissions newer than a handle's watermark are downloaded, and a
+    handle checked less than `min_interval` seconds ago is answered from
+    the store without calling Codeforces at all. Results are either the
+    solved problemIds or a bitset over the rows of problems.js (a solve
+    under a mirror alias sets the row of its representative); the dataset
+    is reloaded whenever problems.js changes on disk.
+    """
+
+    def __init__(self, store, dataset_path=DEFAULT_DATASET, min_interval=DEFAULT_MIN_INTERVAL,
+                 bucket=None):
+        self.store = store
+        self.dataset_path = dataset_path
+        self.min_interval = min_interval
+        self.bucket = bucket or TokenBucket(cf_client.API_RATE, cf_client.API_BURST)
+        self.lock = Lock()
+        self.handle_locks = {}
+        self.dataset_mtime = None
+        self.positions = {}
+        self.count = 0
+        self.fingerprint = None
+
+    def _dataset(self):
+        """(positions, count, fingerprint) of the current problems.js"""
+        with self.lock:
+            mtime = os.stat(self.dataset_path).st_mtime
+            if mtime != self.dataset_mtime:
+                problems = dataset_builder.load_problems_js(self.dataset_path)
+                self.positions = dataset_builder.problem_rows(problems)
+                self.count = len(problems)
+                self.fingerprint = dataset_builder.dataset_fingerprint(problems)
+                self.dataset_mtime = mtime
+            return self.positions, self.count, self.fingerprint
+
+    def _handle_lock(self, handle):
+        with self.lock:
+            return self.handle_locks.setdefault(handle, Lock())
+
+    def refresh(self, handle, force=False):
+        """Bring a handle's stored set up to date; returns (solved set, new submissions or None)"""
+        key = handle.casefold()
+        with self._handle_lock(key):
+            watermark, checked_at = self.store.state(key)
+            if not force and checked_at is not None and time.time() - checked_at < self.min_interval:
+                return self.store.solved(key), None
+            submissions = fetch_new_submissions(handle, watermark, self.bucket)
+            self.store.update(key, advance_watermark(watermark, submissions), solved_problem_ids(submissions))
+            return self.store.solved(key), len(submissions)
+
+    def check(self, handle, output_format='list', dataset=None, force=False):
+        """JSON-ready answer for one handle
+
+        'list' returns the sorted solved problemIds. 'bitset' returns them as
+        a bitset over problems.js rows (encode_bitset layout), unless the
+        caller's dataset fingerprint differs from the proxy's, in which case
+        the list is returned instead.
+        """
+        start = time.perf_counter()
+        solved, new = self.refresh(handle, force)
+        result = {'handle': handle, 'count': len(solved), 'newSubmissions': new}
+        positions, count, fingerprint = self._dataset()
+        if output_format == 'bitset' and dataset in (None, fingerprint):
+            bits = 0
+            for problem_id in solved:
+                row = positions.get(problem_id)
+                if row is not None:
+                    bits |= 1 << row
+            result.update(dataset=fingerprint, rows=count, bits=dataset_builder.encode_bitset(bits, count))
+        else:
+            result['solved'] = sorted(solved)
+        result['ms'] = round(1000 * (time.perf_counter() - start), 1)
+        return result
+
+class SolvedProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != '/solved':
+            self._send_json(404, {'error': 'not found'})
+            return
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        handle = query.get('handle', '').strip()
+        if not handle:
+            self._send_json(400, {'error': 'missing handle'})
+            return
+        try:
+            result = self.server.service.check(handle, query.get('format', 'list'), query.get('dataset'),
+                                               force=query.get('refresh') == '1')
+        except cf_client.APIError as e:
+            self._send_json(502, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(502, {'error': f'Error fetching data from Codeforces API ({type(e).__name__})'})
+            return
+        self._send_json(200, result)
+        if self.server.verbose:
+            print(f"  {handle}: {result['count']} solved, {result['newSubmissions']} new submissions, "
+                  f"{result['ms']} ms")
+
+    def _send_json(self, status, data):
+        body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Local proxy that keeps per-handle solved sets and only downloads new submissions')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--store-path', default=DEFAULT_STORE_PATH,
+                        help=f'SQLite store of solved sets (default: {DEFAULT_STORE_PATH})')
+    parser.add_argument('--dataset', default=DEFAULT_DATASET,
+                        help=f'problems.js that bitsets are aligned to (default: {DEFAULT_DATASET})')
+    parser.add_argument('--min-interval', type=float, default=DEFAULT_MIN_INTERVAL,
+                        help='serve a handle checked this many seconds ago from the store '
+                             f'(default: {DEFAULT_MIN_INTERVAL}; refresh=1 in the request overrides)')
+    parser.add_argument('--api-rate', type=float, default=cf_client.API_RATE,
+                        help=f'Codeforces API calls per second '
+                             f'(default: {cf_client.API_RATE}, bursts of {cf_client.API_BURST})')
+    parser.add_argument('--base-url', default=cf_client.BASE_URL,
+                        help='Codeforces base URL (default: %(default)s, or $CF_BASE_URL)')
+    parser.add_argument('--quiet', action='store_true', help='do not log each check')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    cf_client.BASE_URL = args.base_url.rstrip('/')
+    store = SolvedStore(args.store_path)
+    server = ThreadingHTTPServer((args.host, args.port), SolvedProxyHandler)
+    server.daemon_threads = True
+    server.service = SolvedService(store, args.dataset, args.min_interval,
+                                   TokenBucket(args.api_rate, cf_client.API_BURST))
+    server.verbose = not args.quiet
+    print(f"Solved proxy listening on http://{args.host}:{server.server_address[1]}")
+    print(f"  start the app with VITE_SOLVED_PROXY=http://{args.host}:{server.server_address[1]} npm run dev")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,40 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useMemo } from 'react';
 import { problems } from './problems.js';
+import { datasetFingerprint } from './problemsCodec.js';
+import { bitsetPositions, createFilterIndex, decodeBitset, matchPositions } from './filterIndex.js';
+import { createSearchIndex, scanPositions, searchPositions } from './problemSearch.js';
+import { decodeNeighbours, recommendRows } from './recommendations.js';
 
 const ITEMS_PER_PAGE = 120;
 const RATINGS = [1600, 1700, 1800, 1900, 2000, 2100, 2200, 2300, 2400, 2500, 2600, 2700, 2800, 2900, 3000];
 
+// Optional local solved-set proxy (python solved_proxy.py), e.g.
+// VITE_SOLVED_PROXY=http://127.0.0.1:8787 npm run dev
+const SOLVED_PROXY = import.meta.env.VITE_SOLVED_PROXY;
+const DATASET_FINGERPRINT = datasetFingerprint(problems);
+
+// Filter index written by `python fetch_problems.py --index`; without it the
+// rating and tag filters fall back to scanning every problem
+const { problemIndex } = Object.values(import.meta.glob('./problemIndex.js', { eager: true }))[0] || {};
+const FILTER_INDEX = problemIndex && problemIndex.dataset === DATASET_FINGERPRINT
+  ? createFilterIndex(problemIndex)
+  : null;
+
+// All unique tags, sorted (the index already holds them)
+const ALL_TAGS = FILTER_INDEX ? FILTER_INDEX.tags : [...new Set(problems.flatMap(p => p.tags))].sort();
+
+// Search index written by `python fetch_problems.py --search-index`; without
+// it the search box falls back to scanning every problem
+const { searchIndex } = Object.values(import.meta.glob('./searchIndex.js', { eager: true }))[0] || {};
+const SEARCH_INDEX = searchIndex && searchIndex.dataset === DATASET_FINGERPRINT
+  ? createSearchIndex(searchIndex)
+  : null;
+
+// Neighbour lists written by `python recommender.py build`, loaded on demand
+const loadNeighbours = Object.values(import.meta.glob('./problemNeighbours.js'))[0];
+const RATINGS_BY_ROW = problems.map(p => p.rating);
+const TRY_NEXT_COUNT = 10;
+
 // Color palette for users
 const USER_COLORS = [
   '#10b981', // green
@@ -24,9 +55,11 @@ function App() {
   const [newHandle, setNewHandle] = useState('');
   const [selectedRating, setSelectedRating] = useState();
   const [selectedTags, setSelectedTags] = useState([]);
+  const [searchQuery, setSearchQuery] = useState('');
   const [currentPage, setCurrentPage] = useState(1);
   const [loading, setLoading] = useState(false);
   const [visitCount, setVisitCount] = useState(0);
+  const [neighbours, setNeighbours] = useState(null);
 
   // Track page visits globally using API
   useEffect(() => {
@@ -49,7 +82,45 @@ function App() {
     updateVisitCount();
   }, []);
 
+  useEffect(() => {
+    if (!loadNeighbours) return;
+    loadNeighbours().then(({ problemNeighbours }) => {
+      if (problemNeighbours.dataset === DATASET_FINGERPRINT) {
+        setNeighbours(decodeNeighbours(problemNeighbours));
+      }
+    });
+  }, []);
+
+  // Only new submissions are downloaded by the proxy; solves come back as a
+  // bitset over problems.js rows, or as problemIds if its dataset differs
+  const fetchSolvedFromProxy = async (handle) => {
+    const params = new URLSearchParams({
+      handle: handle.trim(),
+      format: 'bitset',
+      dataset: DATASET_FINGERPRINT,
+    });
+    const response = await fetch(`${SOLVED_PROXY}/solved?${params}`);
+    const data = await response.json();
+
+    if (!response.ok) {
+      return { success: false, error: data.error || 'Failed to fetch user data' };
+    }
+    const solved = new Set(data.solved || []);
+    if (data.bits) {
+      bitsetPositions(decodeBitset(data.bits)).forEach(row => solved.add(problems[row].problemId));
+    }
+    return { success: true, solved };
+  };
+
   const fetchSolvedForUser = async (handle) => {
+    if (SOLVED_PROXY) {
+      try {
+        return await fetchSolvedFromProxy(handle);
+      } catch (error) {
+        console.warn('Solved proxy unavailable, asking Codeforces directly', error);
+      }
+    }
+
     try {
       const response = await fetch(
         `https://codeforces.com/api/user.status?handle=${handle.trim()}&from=1&count=10000`
@@ -139,21 +210,24 @@ function App() {
     }
   };
 
-  // Extract all unique tags from problems
-  const allTags = [...new Set(problems.flatMap(p => p.tags))].sort();
+  // Problems matching the search box by name, ID or tag
+  const searchMatches = useMemo(() => {
+    if (!searchQuery.trim()) return null;
+    const positions = SEARCH_INDEX
+      ? searchPositions(SEARCH_INDEX, searchQuery)
+      : scanPositions(problems, searchQuery);
+    return new Set(positions.map(i => problems[i]));
+  }, [searchQuery]);
 
-  // Filter problems by rating and tags
-  const filteredProblems = problems.filter((p) => {
-    // Filter by rating
-    if (selectedRating && p.rating !== selectedRating) return false;
-    
-    // Filter by tags (problem must have ALL selected tags)
-    if (selectedTags.length > 0) {
-      return selectedTags.every(tag => p.tags.includes(tag));
-    }
-    
-    return true;
-  });
+  // Filter problems by rating and tags (a problem must have ALL selected
+  // tags) with the index's bitsets, or a scan without it, then by search
+  const filteredProblems = useMemo(() => {
+    const matches = FILTER_INDEX
+      ? matchPositions(FILTER_INDEX, { rating: selectedRating || null, tags: selectedTags }).map(i => problems[i])
+      : problems.filter(p => (!selectedRating || p.rating === selectedRating) &&
+          selectedTags.every(tag => p.tags.includes(tag)));
+    return searchMatches ? matches.filter(p => searchMatches.has(p)) : matches;
+  }, [searchMatches, selectedRating, selectedTags]);
 
   // Pagination
   const totalPages = Math.ceil(filteredProblems.length / ITEMS_PER_PAGE);
@@ -161,10 +235,10 @@ function App() {
   const endIndex = startIndex + ITEMS_PER_PAGE;
   const currentProblems = filteredProblems.slice(startIndex, endIndex);
 
-  // Reset to page 1 when rating or tags change
+  // Reset to page 1 when the search, rating or tags change
   useEffect(() => {
     setCurrentPage(1);
-  }, [selectedRating, selectedTags]);
+  }, [searchQuery, selectedRating, selectedTags]);
 
   // Auto-fetch on component mount with default handles
   useEffect(() => {
@@ -173,14 +247,30 @@ function App() {
     }
   }, []); // Empty dependency array means run once on mount
 
+  // A solve under a Div.1/Div.2 mirror copy counts for the merged problem
+  const hasSolved = (user, problem) => {
+    return user.solved.has(problem.problemId) ||
+      (problem.aliases || []).some(alias => user.solved.has(alias));
+  };
+
+  // Unsolved problems similar to what the first user has solved
+  const tryNext = useMemo(() => {
+    if (!neighbours || users[0].solved.size === 0) return [];
+    const solvedRows = [];
+    problems.forEach((problem, row) => {
+      if (hasSolved(users[0], problem)) solvedRows.push(row);
+    });
+    return recommendRows(neighbours, RATINGS_BY_ROW, solvedRows, TRY_NEXT_COUNT).map(row => problems[row]);
+  }, [neighbours, users[0].solved]);
+
   // Get users who solved a problem
-  const getSolvedByUsers = (problemId) => {
-    return users.filter(u => u.solved.has(problemId));
+  const getSolvedByUsers = (problem) => {
+    return users.filter(u => hasSolved(u, problem));
   };
 
   // Determine row style based on who solved it
-  const getRowStyle = (problemId) => {
-    const solvers = users.filter(u => u.solved.has(problemId));
+  const getRowStyle = (problem) => {
+    const solvers = getSolvedByUsers(problem);
     
     if (solvers.length === 0) return {};
     if (solvers.length === 1) {
@@ -201,11 +291,11 @@ function App() {
   // Calculate solve counts for current filtered problems
   const userStats = users.map(user => ({
     ...user,
-    solveCount: filteredProblems.filter(p => user.solved.has(p.problemId)).length
+    solveCount: filteredProblems.filter(p => hasSolved(user, p)).length
   }));
   
   const totalUniqueSolved = new Set(
-    filteredProblems.filter(p => users.some(u => u.solved.has(p.problemId))).map(p => p.problemId)
+    filteredProblems.filter(p => users.some(u => hasSolved(u, p))).map(p => p.problemId)
   ).size;
 
   return (
@@ -282,10 +372,39 @@ function App() {
               </div>
             </div>
           )}
+
+          {tryNext.length > 0 && (
+            <div className="try-next">
+              <span className="try-next-title">Try next for {users[0].handle}:</span>
+              {tryNext.map(problem => (
+                <a
+                  key={problem.problemId}
+                  href={problem.link}
+                  target="_blank"
+                  rel="noopener noreferrer"
+                  className="tag-chip"
+                  title={`${problem.rating} · ${problem.tags.join(', ')}`}
+                >
+                  {problem.problemId} {problem.name}
+                </a>
+              ))}
+            </div>
+          )}
         </div>
       </header>
 
       <div className="filters">
+        <div className="filter-section">
+          <h3 className="filter-title">Search</h3>
+          <input
+            type="search"
+            placeholder="Problem name, ID or tag..."
+            value={searchQuery}
+            onChange={(e) => setSearchQuery(e.target.value)}
+            className="search-input"
+          />
+        </div>
+
         <div className="filter-section">
           <h3 className="filter-title">Rating</h3>
           <div className="rating-buttons">
@@ -320,7 +439,7 @@ function App() {
             )}
           </h3>
           <div className="tag-buttons">
-            {allTags.map((tag) => (
+            {ALL_TAGS.map((tag) => (
               <button
                 key={tag}
                 className={selectedTags.includes(tag) ? 'tag-chip active' : 'tag-chip'}
@@ -370,11 +489,11 @@ function App() {
             {currentProblems.map((problem, index) => (
               <tr
                 key={index}
-                style={getRowStyle(problem.problemId)}
+                style={getRowStyle(problem)}
               >
                 <td>
                   <div className="problem-name-cell">
-                    {getSolvedByUsers(problem.problemId).map(user => (
+                    {getSolvedByUsers(problem).map(user => (
                       <span 
                         key={user.id} 
                         className="solved-indicator"
@@ -0,0 +1,61 @@
+// Query helper for the filter index written by dataset_builder.py
+// (python fetch_problems.py --index). Positions refer to the order of
+// src/problems.js, so `problems[i]` is the problem behind bit i.
+
+export function decodeBitset(base64) {
+  const binary = atob(base64);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+  return new Uint32Array(bytes.buffer);
+}
+
+// Decode every bitset once; the result is reused for all queries
+export function createFilterIndex(index) {
+  const words = Math.ceil(index.count / 32);
+  const tagBits = new Map(index.tags.map((tag, i) => [tag, decodeBitset(index.tagBits[i])]));
+  const ratingBits = new Map(index.ratings.map((rating, i) => [rating, decodeBitset(index.ratingBits[i])]));
+  return { count: index.count, words, tags: index.tags, tagBits, ratingBits, order: index.order };
+}
+
+// Bitset of the problems with this rating (if any) and every selected tag
+export function matchBits(filterIndex, { rating = null, tags = [] } = {}) {
+  const bits = new Uint32Array(filterIndex.words).fill(0xffffffff);
+  const tail = filterIndex.count % 32;
+  if (tail) bits[bits.length - 1] = (1 << tail) - 1;
+
+  const sets = tags.map(tag => filterIndex.tagBits.get(tag));
+  if (rating !== null) sets.push(filterIndex.ratingBits.get(rating));
+  for (const set of sets) {
+    if (!set) return bits.fill(0);
+    for (let w = 0; w < bits.length; w++) bits[w] &= set[w];
+  }
+  return bits;
+}
+
+// Matching positions, ascending (problems.js order) or following one of the
+// precomputed orders ('length', 'solveCount', 'rating'; reverse for descending)
+export function matchPositions(filterIndex, query, orderBy = null) {
+  const bits = matchBits(filterIndex, query);
+  const positions = [];
+  if (orderBy) {
+    for (const i of filterIndex.order[orderBy]) {
+      if (bits[i >>> 5] & (1 << (i & 31))) positions.push(i);
+    }
+    return positions;
+  }
+  return bitsetPositions(bits);
+}
+
+// Ascending positions of the set bits of a decoded bitset
+export function bitsetPositions(bits) {
+  const positions = [];
+  for (let w = 0; w < bits.length; w++) {
+    let word = bits[w];
+    while (word) {
+      const low = word & -word;
+      positions.push(w * 32 + 31 - Math.clz32(low));
+      word ^= low;
+    }
+  }
+  return positions;
+}
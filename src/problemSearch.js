@@ -0,0 +1,125 @@
+// Query helper for the search index written by dataset_builder.py
+// (python fetch_problems.py --search-index). Positions refer to the order
+// of src/problems.js, so `problems[i]` is the problem behind position i.
+
+// Lowercase, strip accents, split into [0-9a-z] runs (search_tokens in dataset_builder.py)
+export function searchTokens(text) {
+  return text.toLowerCase().normalize('NFKD').replace(/\p{M}/gu, '').match(/[0-9a-z]+/g) || [];
+}
+
+function problemTokens(problem) {
+  return searchTokens([problem.name, problem.problemId, ...(problem.aliases || []), ...problem.tags].join(' '));
+}
+
+function trigrams(token) {
+  const grams = new Set();
+  for (let i = 0; i + 3 <= token.length; i++) grams.add(token.slice(i, i + 3));
+  return [...grams];
+}
+
+// Ascending positions from base64 varint-coded gaps (encode_postings)
+export function decodePostings(base64) {
+  const binary = atob(base64);
+  const positions = [];
+  let position = 0;
+  let gap = 0;
+  let shift = 0;
+  for (let i = 0; i < binary.length; i++) {
+    const byte = binary.charCodeAt(i);
+    gap += (byte & 0x7f) * 2 ** shift;
+    shift += 7;
+    if (byte < 0x80) {
+      position += gap;
+      positions.push(position);
+      gap = 0;
+      shift = 0;
+    }
+  }
+  return Int32Array.from(positions);
+}
+
+// Lists stay encoded until a query needs them, then are cached
+export function createSearchIndex(index) {
+  const trigramSlots = new Map(index.trigrams.map((gram, i) => [gram, i]));
+  const postings = new Map();
+  const trigramTokens = new Map();
+  return {
+    count: index.count,
+    tokens: index.tokens,
+    postings(tokenId) {
+      if (!postings.has(tokenId)) postings.set(tokenId, decodePostings(index.postings[tokenId]));
+      return postings.get(tokenId);
+    },
+    trigramTokens(gram) {
+      if (!trigramTokens.has(gram)) {
+        const slot = trigramSlots.get(gram);
+        trigramTokens.set(gram, slot === undefined ? new Int32Array(0) : decodePostings(index.trigramTokens[slot]));
+      }
+      return trigramTokens.get(gram);
+    },
+  };
+}
+
+function intersect(a, b) {
+  const out = [];
+  for (let i = 0, j = 0; i < a.length && j < b.length;) {
+    if (a[i] < b[j]) i++;
+    else if (a[i] > b[j]) j++;
+    else { out.push(a[i]); i++; j++; }
+  }
+  return out;
+}
+
+// Vocabulary ids of the tokens a term matches: containing it (3+ characters,
+// e.g. 'perm' -> 'permutation', '1927' -> '1927f') or starting with it
+function termTokens(searchIndex, term) {
+  const { tokens } = searchIndex;
+  const ids = [];
+  if (term.length < 3) {
+    let low = 0;
+    let high = tokens.length;
+    while (low < high) {
+      const middle = (low + high) >>> 1;
+      if (tokens[middle] < term) low = middle + 1;
+      else high = middle;
+    }
+    for (let i = low; i < tokens.length && tokens[i].startsWith(term); i++) ids.push(i);
+    return ids;
+  }
+  const lists = trigrams(term).map(searchIndex.trigramTokens).sort((a, b) => a.length - b.length);
+  // A token may hold the trigrams apart, so check the token itself
+  return lists.slice(1).reduce(intersect, Array.from(lists[0])).filter(id => tokens[id].includes(term));
+}
+
+// Ascending positions of the problems matching every term of the query
+export function searchPositions(searchIndex, query) {
+  const terms = [...new Set(searchTokens(query))].sort((a, b) => b.length - a.length);
+  if (!terms.length) return Array.from({ length: searchIndex.count }, (_, i) => i);
+
+  let matches = null;
+  for (const term of terms) {
+    // Union of the tokens' postings: short terms can match hundreds of tokens
+    const found = new Uint8Array(searchIndex.count);
+    for (const id of termTokens(searchIndex, term)) {
+      for (const position of searchIndex.postings(id)) found[position] = 1;
+    }
+    const positions = [];
+    for (let i = 0; i < found.length; i++) if (found[i]) positions.push(i);
+    matches = matches === null ? positions : intersect(matches, positions);
+    if (!matches.length) break;
+  }
+  return matches;
+}
+
+// The same answer by checking every problem, for when no index was built
+export function scanPositions(problems, query) {
+  const terms = [...new Set(searchTokens(query))];
+  const positions = [];
+  problems.forEach((problem, i) => {
+    const tokens = problemTokens(problem);
+    if (terms.every(term => tokens.some(t => (term.length < 3 ? t.startsWith(term) : t.includes(term))))) {
+      positions.push(i);
+    }
+  });
+  return positions;
+}
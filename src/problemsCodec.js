@@ -0,0 +1,48 @@
+// Decoder for the compact columnar dataset written by dataset_builder.py
+// (python fetch_problems.py --format compact).
+
+export function problemLink(problemId) {
+  const split = problemId.search(/\D/);
+  const contestId = problemId.slice(0, split);
+  const index = problemId.slice(split);
+  return `https://codeforces.com/contest/${contestId}/problem/${index}`;
+}
+
+// Rebuild the same problem objects the plain problems.js array contains
+export function decodeProblems(data) {
+  const { tags, name, rating, tagIds, solveCount, length, problemId } = data;
+  const problems = new Array(problemId.length);
+
+  for (let i = 0; i < problemId.length; i++) {
+    problems[i] = {
+      name: name[i],
+      rating: rating[i],
+      tags: tagIds[i].map(id => tags[id]),
+      solveCount: solveCount[i],
+      length: length[i],
+      link: problemLink(problemId[i]),
+      problemId: problemId[i],
+    };
+  }
+
+  // Div.1/Div.2 mirror copies, stored sparsely as { row: [problemIds] }
+  for (const [row, aliases] of Object.entries(data.aliases || {})) {
+    problems[row].aliases = aliases;
+  }
+
+  return problems;
+}
+
+// 32-bit FNV-1a of the comma-joined problemIds (dataset_fingerprint in
+// dataset_builder.py), used to check that a bitset from solved_proxy.py
+// was built against this problems.js
+export function datasetFingerprint(problems) {
+  let hash = 0x811c9dc5;
+  for (let i = 0; i < problems.length; i++) {
+    const id = (i ? ',' : '') + problems[i].problemId;
+    for (let j = 0; j < id.length; j++) {
+      hash = Math.imul(hash ^ id.charCodeAt(j), 0x01000193);
+    }
+  }
+  return (hash >>> 0).toString(16).padStart(8, '0');
+}
@@ -0,0 +1,56 @@
+// "Try next" ranking over the neighbour lists written by recommender.py
+// (python recommender.py build). Rows refer to the order of src/problems.js.
+
+// Mirrors TARGET_PERCENTILE / TARGET_STEP / RATING_SPREAD in recommender.py
+const TARGET_PERCENTILE = 80;
+const TARGET_STEP = 100;
+const RATING_SPREAD = 250;
+
+function decodeBytes(base64) {
+  const binary = atob(base64);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+  return bytes;
+}
+
+// { count, k, rows, weights }: row ids as a typed array, weights in 0..1
+export function decodeNeighbours(data) {
+  const rowBytes = decodeBytes(data.rows);
+  const rows = data.rowBytes === 2 ? new Uint16Array(rowBytes.buffer) : new Uint32Array(rowBytes.buffer);
+  const weights = Float32Array.from(decodeBytes(data.weights), w => w / 255);
+  return { dataset: data.dataset, count: data.count, k: data.k, rows, weights };
+}
+
+// Linear interpolation, written exactly like target_rating in recommender.py
+function percentile(values, q) {
+  const sorted = Float64Array.from(values).sort();
+  const position = (sorted.length - 1) * q / 100;
+  const low = Math.floor(position);
+  const high = Math.min(low + 1, sorted.length - 1);
+  return sorted[low] + (sorted[high] - sorted[low]) * (position - low);
+}
+
+// Unsolved rows ranked for one solved set: each solved problem votes for its
+// neighbours with their similarity, damped away from a rating a step above
+// what the handle usually solves. Same steps in the same order as recommend()
+// in recommender.py, so both give the same ranking
+export function recommendRows(neighbours, ratings, solvedRows, count = 20) {
+  if (!solvedRows.length) return [];
+  const { k, rows, weights } = neighbours;
+  const solved = [...solvedRows].sort((a, b) => a - b);
+  const scores = new Float64Array(neighbours.count);
+  for (const row of solved) {
+    for (let j = row * k; j < row * k + k; j++) scores[rows[j]] += weights[j];
+  }
+  for (const row of solved) scores[row] = 0;
+  const target = percentile(solved.map(row => ratings[row]), TARGET_PERCENTILE) + TARGET_STEP;
+
+  const candidates = [];
+  for (let row = 0; row < scores.length; row++) {
+    const distance = (ratings[row] - target) / RATING_SPREAD;
+    scores[row] *= Math.fround(Math.exp(-distance * distance));  // float32, like rating_damping
+    if (scores[row] > 0) candidates.push(row);
+  }
+  candidates.sort((a, b) => scores[b] - scores[a] || a - b);
+  return candidates.slice(0, count);
+}
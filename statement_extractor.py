@@ -0,0 +1,213 @@
+import html as html_lib
+import re
+from html.entities import html5
+
+MIN_STATEMENT_LENGTH = 100  # Valid problem statement should be at least 100 chars
+DEFAULT_BACKEND = 'stream'
+
+# ---------------------------------------------------------------------------
+# Reference backend: full BeautifulSoup parse
+# ---------------------------------------------------------------------------
+
+def bs4_text_length(html):
+    """Length of the statement text using BeautifulSoup (reference backend)"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Try multiple selectors
+    problem_statement = soup.find('div', class_='problem-statement')
+
+    if not problem_statement:
+        # Try alternate selector
+        problem_statement = soup.find('div', {'class': 'problemindexholder'})
+
+    if not problem_statement:
+        return 0
+
+    # Get text content and calculate length
+    return len(problem_statement.get_text(separator=' ', strip=True))
+
+def bs4_text_lengths_by_index(html):
+    """Statement lengths per problem index on a /contest/{id}/problems page"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    lengths = {}
+    for holder in soup.find_all('div', class_='problemindexholder'):
+        index = holder.get('problemindex')
+        problem_statement = holder.find('div', class_='problem-statement')
+        if index and problem_statement:
+            lengths[index] = len(problem_statement.get_text(separator=' ', strip=True))
+    return lengths
+
+# ---------------------------------------------------------------------------
+# Fast backend: targeted scan that stops when the statement div closes
+# ---------------------------------------------------------------------------
+
+# Opening <div> tags, skipping over comments and script/style bodies
+DIV_OPEN_RE = re.compile(
+    r'<!--.*?-->'
+    r'|<(script|style)(?=[\s>])[^>]*>.*?</\1\s*>'
+    r'|<div(?=[\s/>])((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+    re.I | re.S
+)
+ATTR_RE_TEMPLATE = r'(?:^|\s){}\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))'
+CLASS_ATTR_RE = re.compile(ATTR_RE_TEMPLATE.format('class'), re.I)
+PROBLEMINDEX_ATTR_RE = re.compile(ATTR_RE_TEMPLATE.format('problemindex'), re.I)
+
+# Markup tokens in the order html.parser would recognise them. Everything
+# between two tokens is character data.
+TOKEN_RE = re.compile(
+    r'<!--.*?-->'
+    r'|<!\[CDATA\[(?P<cdata>.*?)\]\]>'
+    r'|<![^>]*>'
+    r'|<\?[^>]*>'
+    r'|<(?P<end>/?)(?P<tag>[a-zA-Z][^\s/>]*)(?P<attrs>(?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+    re.S
+)
+REF_RE = re.compile(r'&(?:#([0-9]+|[xX][0-9a-fA-F]+);?|([a-zA-Z][-.a-zA-Z0-9]*);?)')
+RAW_TEXT_END_RE = {
+    'script': re.compile(r'</script\s*>', re.I),
+    'style': re.compile(r'</style\s*>', re.I),
+}
+
+def _replace_ref(match):
+    if match.group(1) is not None:
+        return html_lib.unescape('&#' + match.group(1) + ';')
+    name = match.group(2)
+    character = html5.get(name + ';')
+    if character is None:
+        return '&' + name
+    return character
+
+def _unescape(text):
+    if '&' not in text:
+        return text
+    return REF_RE.sub(_replace_ref, text)
+
+def _attr_value(attr_re, attrs):
+    match = attr_re.search(attrs)
+    if not match:
+        return None
+    return next(g for g in match.groups() if g is not None)
+
+def _find_divs(html, class_name, start=0):
+    """Yield (position, attrs) of every <div> whose class list contains class_name"""
+    for match in DIV_OPEN_RE.finditer(html, start):
+        attrs = match.group(2)
+        if attrs is None or class_name not in attrs:
+            continue
+        value = _attr_value(CLASS_ATTR_RE, attrs)
+        if value is not None and (value == class_name or class_name in value.split()):
+            yield match.start(), attrs
+
+def _find_div(html, class_name, start=0):
+    """Position of the first <div> whose class list contains class_name"""
+    for position, _ in _find_divs(html, class_name, start):
+        return position
+    return -1
+
+def _div_text_strings(html, start):
+    """Yield the stripped, non-empty text strings inside the div at `start`
+
+    Mirrors BeautifulSoup's get_text(strip=True): comments, declarations and
+    processing instructions split strings but contribute no text, CDATA
+    counts as its own string, and script/style/template content is skipped.
+    """
+    depth = 0
+    template_depth = 0
+    pos = start
+    while True:
+        match = TOKEN_RE.search(html, pos)
+        end = match.start() if match else len(html)
+        if depth > 0 and template_depth == 0 and end > pos:
+            text = _unescape(html[pos:end]).strip()
+            if text:
+                yield text
+        if not match:
+            return
+        pos = match.end()
+
+        tag = match.group('tag')
+        if tag is None:
+            cdata = match.group('cdata')
+            if cdata is not None and depth > 0 and template_depth == 0:
+                cdata = cdata.strip()
+                if cdata:
+                    yield cdata
+            continue
+
+        tag = tag.lower()
+        closing = match.group('end') == '/'
+        self_closing = match.group('attrs').rstrip().endswith('/')
+
+        if tag == 'div':
+            if closing:
+                depth -= 1
+                if depth == 0:
+                    return
+            elif not self_closing:
+                depth += 1
+        elif tag == 'template' and not self_closing:
+            template_depth = max(0, template_depth + (-1 if closing else 1))
+        elif tag in RAW_TEXT_END_RE and not closing and not self_closing:
+            # Raw text element: its content is never markup, skip to the end tag
+            raw_end = RAW_TEXT_END_RE[tag].search(html, pos)
+            pos = raw_end.end() if raw_end else len(html)
+
+def _text_length(html, start):
+    strings = list(_div_text_strings(html, start))
+    if not strings:
+        return 0
+    return sum(len(s) for s in strings) + len(strings) - 1
+
+def stream_text_length(html):
+    """Length of the statement text using the targeted scanner"""
+    start = _find_div(html, 'problem-statement')
+    if start < 0:
+        start = _find_div(html, 'problemindexholder')
+    if start < 0:
+        return 0
+    return _text_length(html, start)
+
+def stream_text_lengths_by_index(html):
+    """Statement lengths per problem index on a /contest/{id}/problems page"""
+    holders = list(_find_divs(html, 'problemindexholder'))
+    lengths = {}
+    for i, (position, attrs) in enumerate(holders):
+        index = _attr_value(PROBLEMINDEX_ATTR_RE, attrs)
+        if not index:
+            continue
+        start = _find_div(html, 'problem-statement', position)
+        # The statement must sit inside this holder, not a later one
+        if start < 0 or (i + 1 < len(holders) and start > holders[i + 1][0]):
+            continue
+        lengths[index] = _text_length(html, start)
+    return lengths
+
+# ---------------------------------------------------------------------------
+# Backend registry
+# ---------------------------------------------------------------------------
+
+BACKENDS = {
+    'bs4': bs4_text_length,
+    'stream': stream_text_length,
+}
+
+CONTEST_BACKENDS = {
+    'bs4': bs4_text_lengths_by_index,
+    'stream': stream_text_lengths_by_index,
+}
+
+def statement_length(html, backend=DEFAULT_BACKEND):
+    """Return the statement length found in a problem page, or 0"""
+    length = BACKENDS[backend](html)
+    if length > MIN_STATEMENT_LENGTH:
+        return length
+    return 0
+
+def statement_lengths_by_index(html, backend=DEFAULT_BACKEND):
+    """Return {problem index: length} for every valid statement on a contest page"""
+    lengths = CONTEST_BACKENDS[backend](html)
+    return {index: length for index, length in lengths.items() if length > MIN_STATEMENT_LENGTH}